@@ -0,0 +1,503 @@
+"""
+Benchmark the throughput of the Sirius message parsers.
+
+Generates synthetic message lines for every message type in MESSAGE_TYPES,
+with the topics of a protocol config mixed at the rates of a typical
+deployment, and measures lines/s, MB/s and the Python memory high-water mark
+of:
+
+    parser:<MessageType>      each message parser on lines of its own type
+    parse_message_lines       the compiled protocol on the mixed lines
+    run_parse_messages:<backend>
+                              the full task from a message file to CSV tables
+
+Results are written as JSON. If a baseline JSON from an earlier run is given,
+the throughput of every benchmark is compared against it, and the script
+exits with an error if any benchmark is slower than the tolerance allows.
+
+Usage:
+    uv run python scripts/python/benchmark_message_parsers.py \\
+        --lines 200000 \\
+        --output /tmp/benchmark_message_parsers.json \\
+        --baseline /tmp/benchmark_message_parsers_previous.json
+"""
+
+import gc
+import json
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+import tomllib
+import tracemalloc
+
+from collections.abc import Callable
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+import click
+
+from afft.sirius import get_message_parser, parse_message_lines
+from afft.sirius.concrete_messages import MESSAGE_TYPES
+from afft.tasks.parse_messages import (
+    ParseBackend,
+    ParseMessageCommand,
+    run_parse_messages,
+)
+from afft.utils.log import logger
+
+
+_DEFAULT_CONFIG: Path = (
+    Path(__file__).parents[2] / "config" / "protocol" / "protocol_v1.toml"
+)
+
+# Epoch seconds of the first generated line
+_START_TIME: float = 1271816876.0
+
+# Relative rates of the topics of a typical deployment. Topics that are not
+# listed here occur at a rate of one.
+_TOPIC_RATES: dict[str, float] = {
+    "RDI": 3.0,
+    "ODOMETRY": 2.0,
+}
+
+# Topics that are logged but not in the protocol, so that the mix includes
+# lines that are skipped by the parser
+_UNSUBSCRIBED_TOPICS: list[str] = ["ODOMETRY", "CMD_STATE", "NAV_STATUS"]
+
+
+def _number(rng: random.Random, scale: float = 100.0, digits: int = 3) -> str:
+    return f"{rng.uniform(-scale, scale):.{digits}f}"
+
+
+def _unsigned(rng: random.Random, scale: float = 100.0, digits: int = 3) -> str:
+    return f"{rng.uniform(0.0, scale):.{digits}f}"
+
+
+def _image_capture(rng: random.Random, timestamp: float) -> str:
+    return (
+        f"[{timestamp - 0.01:.6f}] "
+        f"PR_20100421_{rng.randrange(1000000):06d}_LC16.tif "
+        f"exp: {rng.randrange(500, 5000)}"
+    )
+
+
+def _ctd(rng: random.Random, timestamp: float) -> str:
+    return (
+        f"cond:{_number(rng)} temp:{_number(rng)} sal:{_number(rng)} "
+        f"pres:{_number(rng)} sos:{_number(rng)}"
+    )
+
+
+def _ecopuck(rng: random.Random, timestamp: float) -> str:
+    return (
+        f"chlor:{_number(rng)} bcksct:{_number(rng)} cdom:{_number(rng)} "
+        f"temp:{_number(rng)}"
+    )
+
+
+def _parosci(rng: random.Random, timestamp: float) -> str:
+    return _unsigned(rng, digits=4)
+
+
+def _teledyne_dvl(rng: random.Random, timestamp: float) -> str:
+    return (
+        f"alt:{_number(rng)} r1:{_number(rng, digits=2)} "
+        f"r2:{_number(rng, digits=2)} r3:{_number(rng, digits=2)} "
+        f"r4:{_number(rng, digits=2)} h:{_number(rng)} p:{_number(rng, 10, 1)} "
+        f"r:{_number(rng)} vx:{_number(rng)} vy:{_number(rng, digits=2)} "
+        f"vz:{_number(rng)} nx:{_number(rng, digits=2)} "
+        f"ny:{_number(rng, digits=2)} nz:{_number(rng, digits=1)} "
+        f"COG:{_number(rng)} SOG:{_number(rng, digits=1)} "
+        f"bt_status:{rng.randrange(4)} h_true:{_number(rng, digits=1)} "
+        f"p_gimbal:{_number(rng, digits=1)} sv:{_number(rng)}"
+    )
+
+
+def _tracklink_modem(rng: random.Random, timestamp: float) -> str:
+    return (
+        f"time:{_unsigned(rng, 86400.0)} Lat:{_number(rng, 90.0, 6)} "
+        f"Lon:{_number(rng, 180.0, 6)} hdg:{_number(rng)} roll:{_number(rng)} "
+        f"pitch:{_number(rng)} bear:{_number(rng)} rng:{_unsigned(rng, 500.0)}"
+    )
+
+
+def _evologics_modem(rng: random.Random, timestamp: float) -> str:
+    return (
+        f"target_lat:{_number(rng)} target_lon:{_number(rng)} "
+        f"target_depth:{_number(rng)} accuracy:{_number(rng)} "
+        f"ship_lat:{_number(rng)} ship_lon:{_unsigned(rng)} "
+        f"ship_roll:{_number(rng)} ship_pitch:{_number(rng)} "
+        f"ship_heading:{_unsigned(rng)} target_x:{_number(rng)} "
+        f"target_y:{_number(rng)} target_z:{_number(rng)}"
+    )
+
+
+def _micron_sonar(rng: random.Random, timestamp: float) -> str:
+    return (
+        f"ProfRng:{_number(rng)} PseudoAlt:{_number(rng)} "
+        f"PseudoFwdDistance:{_number(rng)} Angle:{_number(rng)} Rest 1 2 3"
+    )
+
+
+def _bins(rng: random.Random, count: int) -> str:
+    return " ".join(str(rng.randrange(256)) for _ in range(count))
+
+
+def _micron_trace(rng: random.Random, timestamp: float) -> str:
+    return (
+        f"Angle:{_unsigned(rng, 360.0)} Range:{_unsigned(rng, 50.0)} "
+        f"Gain:{_unsigned(rng, 1.0)} Bins:{_bins(rng, 200)}"
+    )
+
+
+def _micron_sector(rng: random.Random, timestamp: float) -> str:
+    return (
+        f"Start:{_unsigned(rng, 180.0)} End:{_unsigned(rng, 360.0)} "
+        f"Range:{_unsigned(rng, 50.0)} Gain:{_unsigned(rng, 1.0)} "
+        f"Traces:8 Bins:{_bins(rng, 8 * 200)}"
+    )
+
+
+def _obstacle_avoidance_sonar(rng: random.Random, timestamp: float) -> str:
+    return (
+        f"ProfRng:{_number(rng)} PseudoAlt:{_number(rng)} "
+        f"PseudoFwdDistance:{_number(rng)} extra 1 2"
+    )
+
+
+def _gps_gsv(rng: random.Random, timestamp: float) -> str:
+    return f"SV:{rng.randrange(4, 16)}"
+
+
+def _gps_rmc(rng: random.Random, timestamp: float) -> str:
+    return (
+        f"Lat:{_unsigned(rng, 90.0)} {rng.choice('NS')} "
+        f"Lon:{_unsigned(rng, 180.0)} {rng.choice('EW')} "
+        f"Bad: {rng.randrange(4)} {rng.choice('AV')} Spd:{_number(rng)} "
+        f"Crs:{_number(rng)} Mg:{_number(rng)}"
+    )
+
+
+def _battery(rng: random.Random, timestamp: float) -> str:
+    return (
+        f"TimeLeft: {rng.randrange(2000)} PercentCharge: {rng.randrange(101)} "
+        f"Current: {_number(rng)} Voltage: {_number(rng)} "
+        f"Power: {_number(rng)} Charging: {rng.randrange(2)}"
+    )
+
+
+def _thruster(rng: random.Random, timestamp: float) -> str:
+    return (
+        f"RPM:{_number(rng)} A:{_number(rng)} V:{_number(rng)} T:{_number(rng)}"
+    )
+
+
+def _unsubscribed(rng: random.Random, timestamp: float) -> str:
+    return (
+        f"x:{_number(rng)} y:{_number(rng)} z:{_number(rng)} "
+        f"state:{rng.randrange(8)}"
+    )
+
+
+type BodyGenerator = Callable[[random.Random, float], str]
+
+# Generators of the line bodies after the topic and timestamp, per message type
+_BODY_GENERATORS: dict[str, BodyGenerator] = {
+    "ImageCaptureMessage": _image_capture,
+    "SeabirdCTDMessage": _ctd,
+    "AanderaaCTDMessage": _ctd,
+    "EcopuckMessage": _ecopuck,
+    "ParosciPressureMessage": _parosci,
+    "TeledyneDVLMessage": _teledyne_dvl,
+    "TrackLinkModemMessage": _tracklink_modem,
+    "EvologicsModemMessage": _evologics_modem,
+    "MicronSonarMessage": _micron_sonar,
+    "MicronTraceMessage": _micron_trace,
+    "MicronSectorMessage": _micron_sector,
+    "OASonarMessage": _obstacle_avoidance_sonar,
+    "GpsGsvMessage": _gps_gsv,
+    "GpsRmcMessage": _gps_rmc,
+    "BatteryMessage": _battery,
+    "ThrusterMessage": _thruster,
+}
+
+
+def generate_lines(
+    topic_types: dict[str, str], count: int, seed: int
+) -> list[str]:
+    """Generates message lines with topics drawn at their deployment rates,
+    including topics that are not in the protocol."""
+    rng: random.Random = random.Random(seed)
+    generators: dict[str, BodyGenerator] = {
+        topic: _BODY_GENERATORS[message_type]
+        for topic, message_type in topic_types.items()
+    }
+    for topic in _UNSUBSCRIBED_TOPICS:
+        generators.setdefault(topic, _unsubscribed)
+
+    topics: list[str] = list(generators)
+    weights: list[float] = [_TOPIC_RATES.get(topic, 1.0) for topic in topics]
+
+    lines: list[str] = list()
+    timestamp: float = _START_TIME
+    for topic in rng.choices(topics, weights, k=count):
+        timestamp += rng.uniform(0.0, 0.01)
+        body: str = generators[topic](rng, timestamp)
+        lines.append(f"{topic}: {timestamp:.6f} {body}")
+
+    return lines
+
+
+def generate_type_lines(
+    message_type: str, topic: str, count: int, seed: int
+) -> list[str]:
+    """Generates message lines of a single message type and topic."""
+    rng: random.Random = random.Random(seed)
+    generator: BodyGenerator = _BODY_GENERATORS[message_type]
+    return [
+        f"{topic}: {_START_TIME + index * 0.01:.6f} "
+        f"{generator(rng, _START_TIME + index * 0.01)}"
+        for index in range(count)
+    ]
+
+
+def _measure(
+    name: str,
+    lines: list[str],
+    function: Callable[[], Any],
+    repeats: int,
+) -> dict[str, Any]:
+    """Measures the best time of a function over repeats, and the Python
+    memory high-water mark of one more run under tracemalloc."""
+    seconds: float = float("inf")
+    for _ in range(repeats):
+        gc.collect()
+        start: float = time.perf_counter()
+        function()
+        seconds = min(seconds, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    result: Any = function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    megabytes: float = sum(len(line) + 1 for line in lines) / 1e6
+    measurement: dict[str, Any] = {
+        "name": name,
+        "lines": len(lines),
+        "megabytes": megabytes,
+        "seconds": seconds,
+        "lines_per_second": len(lines) / seconds,
+        "megabytes_per_second": megabytes / seconds,
+        "peak_python_bytes": peak,
+    }
+
+    if isinstance(result, list):
+        measurement["parsed"] = sum(message is not None for message in result)
+
+    logger.info(
+        f"{name}: {measurement['lines_per_second']:,.0f} lines/s, "
+        f"{measurement['megabytes_per_second']:.1f} MB/s, "
+        f"peak {peak / 1e6:.1f} MB"
+    )
+    return measurement
+
+
+def benchmark_parsers(
+    topic_types: dict[str, str], count: int, seed: int, repeats: int
+) -> list[dict[str, Any]]:
+    """Benchmarks every message parser on lines of its own message type, with
+    the first topic of the message type in the protocol."""
+    topics: dict[str, str] = dict()
+    for topic, message_type in topic_types.items():
+        topics.setdefault(message_type, topic)
+
+    measurements: list[dict[str, Any]] = list()
+    for message_type in MESSAGE_TYPES:
+        parser = get_message_parser(message_type)
+        assert parser is not None, f"missing parser: {message_type.__name__}"
+
+        topic: str | None = topics.get(message_type.__name__)
+        if topic is None:
+            logger.warning(
+                f"message type is not in the protocol: {message_type.__name__}"
+            )
+            continue
+
+        lines: list[str] = generate_type_lines(
+            message_type.__name__, topic, count, seed
+        )
+        measurement: dict[str, Any] = _measure(
+            f"parser:{message_type.__name__}",
+            lines,
+            lambda: [parser(line) for line in lines],
+            repeats,
+        )
+        if measurement["parsed"] != len(lines):
+            raise ValueError(
+                f"generated lines do not parse: {message_type.__name__}"
+            )
+        measurements.append(measurement)
+
+    return measurements
+
+
+def benchmark_protocol(
+    lines: list[str], topic_types: dict[str, str], repeats: int
+) -> dict[str, Any]:
+    """Benchmarks parsing of the mixed lines with the compiled protocol."""
+    return _measure(
+        "parse_message_lines",
+        lines,
+        lambda: parse_message_lines(lines, topic_types),
+        repeats,
+    )
+
+
+def benchmark_task(
+    lines: list[str], config_file: Path, backend: ParseBackend, repeats: int
+) -> dict[str, Any]:
+    """Benchmarks the parse messages task from a message file to CSV tables,
+    without the table cache."""
+    with tempfile.TemporaryDirectory() as directory:
+        source_file: Path = Path(directory) / "benchmark.RAW.auv"
+        output_dir: Path = Path(directory) / "tables"
+        output_dir.mkdir()
+        source_file.write_text("".join(f"{line}\n" for line in lines))
+
+        command: ParseMessageCommand = ParseMessageCommand(
+            source_file=source_file,
+            config_file=config_file,
+            output_dir=output_dir,
+            backend=backend,
+            use_cache=False,
+        )
+        return _measure(
+            f"run_parse_messages:{backend}",
+            lines,
+            lambda: run_parse_messages(command),
+            repeats,
+        )
+
+
+def compare_results(
+    results: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Returns the names of the benchmarks whose throughput is below the
+    baseline throughput by more than the tolerance."""
+    previous: dict[str, float] = {
+        measurement["name"]: measurement["lines_per_second"]
+        for measurement in baseline["benchmarks"]
+    }
+
+    regressions: list[str] = list()
+    for measurement in results["benchmarks"]:
+        reference: float | None = previous.get(measurement["name"])
+        if reference is None:
+            continue
+        ratio: float = measurement["lines_per_second"] / reference
+        logger.info(f"{measurement['name']}: {ratio:.2f}x baseline")
+        if ratio < 1.0 - tolerance:
+            regressions.append(measurement["name"])
+
+    return regressions
+
+
+@click.command()
+@click.option(
+    "--config",
+    "config_file",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=_DEFAULT_CONFIG,
+    show_default=True,
+    help="Protocol config with the topics of the message mix.",
+)
+@click.option("--lines", "count", type=int, default=100000, show_default=True)
+@click.option("--parser-lines", type=int, default=20000, show_default=True)
+@click.option("--repeats", type=int, default=3, show_default=True)
+@click.option("--seed", type=int, default=0, show_default=True)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=Path("benchmark_message_parsers.json"),
+    show_default=True,
+)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="Results of an earlier run to compare against.",
+)
+@click.option(
+    "--tolerance",
+    type=float,
+    default=0.1,
+    show_default=True,
+    help="Allowed fraction of throughput loss against the baseline.",
+)
+def main(
+    config_file: Path,
+    count: int,
+    parser_lines: int,
+    repeats: int,
+    seed: int,
+    output: Path,
+    baseline: Path | None,
+    tolerance: float,
+) -> None:
+    with open(config_file, "rb") as filehandle:
+        topic_types: dict[str, str] = tomllib.load(filehandle)["message_maps"]
+
+    missing: set[str] = {
+        message_type.__name__ for message_type in MESSAGE_TYPES
+    } - set(_BODY_GENERATORS)
+    if missing:
+        raise click.ClickException(
+            f"missing line generators: {sorted(missing)}"
+        )
+
+    lines: list[str] = generate_lines(topic_types, count, seed)
+
+    benchmarks: list[dict[str, Any]] = benchmark_parsers(
+        topic_types, parser_lines, seed, repeats
+    )
+    benchmarks.append(benchmark_protocol(lines, topic_types, repeats))
+    benchmarks.extend(
+        benchmark_task(lines, config_file, backend, repeats)
+        for backend in ParseBackend
+    )
+
+    results: dict[str, Any] = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "version": metadata.version("afft"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": str(config_file),
+        "seed": seed,
+        "repeats": repeats,
+        # Kilobytes on Linux
+        "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "benchmarks": benchmarks,
+    }
+
+    output.write_text(json.dumps(results, indent=2))
+    logger.info(f"Wrote benchmark results -> {output}")
+
+    if baseline is not None:
+        regressions: list[str] = compare_results(
+            results, json.loads(baseline.read_text()), tolerance
+        )
+        if regressions:
+            raise click.ClickException(
+                f"throughput regressions: {', '.join(regressions)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,25 @@
 """Actions for database CLI commands."""
 
+from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
-import pandas as pd
 import polars as pl
-import sqlalchemy as sqla
-from tqdm import tqdm
 
 import afft.database as db
 import afft.io as io
 import afft.tasks.database_tasks as dbtasks
-from afft.env import requireenv
 
-from afft.tasks.ingest_tables import IngestTablesCommand, run_ingest_tables
+from afft.tasks.export_tables import (
+    ExportTableResult,
+    ExportTablesCommand,
+    run_export_tables,
+)
+from afft.tasks.ingest_tables import (
+    IngestTableResult,
+    IngestTablesCommand,
+    run_ingest_tables,
+)
 from afft.utils.log import logger
 
 
@@ -22,6 +28,7 @@ def dispatch_table_join(
     host: str,
     port: int,
     config_path: str | Path,
+    driver: str = "postgresql",
 ) -> None:
     """Load join configs and execute each join against the database."""
     config: dict[str, Any] = io.read_config(Path(config_path))
@@ -32,17 +39,7 @@ def dispatch_table_join(
         dbtasks.JoinTableConfig(**task) for task in tasks
     ]
 
-    engine: db.Engine | str = db.create_engine(
-        database=database,
-        host=host,
-        port=port,
-        username=requireenv("PG_USERNAME"),
-        password=requireenv("PG_PASSWORD"),
-    )
-
-    assert isinstance(engine, db.Engine), (
-        f"error when creating database engine: {engine}"
-    )
+    engine: db.Engine = db.connect_database(database, host, port, driver)
 
     results: dict[str, pl.DataFrame] = {
         config.label: dbtasks.join_database_tables(
@@ -65,43 +62,37 @@ def dispatch_table_export(
     port: int,
     output_dir: str | Path,
     tables: tuple[str, ...] = (),
-) -> None:
-    """Export database tables to CSV files in output_dir.
+    driver: str = "postgresql",
+    output_format: str = "csv",
+    columns: tuple[str, ...] = (),
+    start: datetime | None = None,
+    end: datetime | None = None,
+    time_column: str = "timestamp",
+    chunk_rows: int = db.READ_CHUNK_ROWS,
+    jobs: int = 1,
+) -> list[ExportTableResult]:
+    """Export database tables to CSV, Parquet or Arrow files in output_dir.
 
     Exports all tables when tables is empty, otherwise only the named ones.
+    Tables are streamed in chunks of rows, with the columns and the time
+    range selected by the database.
     """
-    engine: db.Engine | str = db.create_engine(
+    command = ExportTablesCommand(
+        output_dir=Path(output_dir),
         database=database,
         host=host,
         port=port,
-        username=requireenv("PG_USERNAME"),
-        password=requireenv("PG_PASSWORD"),
+        driver=driver,
+        tables=tables,
+        output_format=io.TableFormat(output_format),
+        columns=columns,
+        start=start,
+        end=end,
+        time_column=time_column,
+        chunk_rows=chunk_rows,
+        jobs=jobs,
     )
-
-    assert isinstance(engine, db.Engine), (
-        f"error when creating database engine: {engine}"
-    )
-
-    output_dir = Path(output_dir)
-    if not output_dir.is_dir():
-        raise ValueError(f"output directory does not exist: {output_dir}")
-
-    inspector = sqla.inspect(engine)
-    available: list[str] = inspector.get_table_names()
-
-    targets = list(tables) if tables else available
-
-    unknown = [t for t in targets if t not in available]
-    if unknown:
-        raise ValueError(f"tables not found in database: {unknown}")
-
-    width = max(len(t) for t in targets)
-    progress = tqdm(targets, unit="table")
-    for table in progress:
-        progress.set_description(table.ljust(width))
-        df: pd.DataFrame = pd.read_sql_table(table, con=engine)
-        dest = output_dir / f"{table}.csv"
-        df.to_csv(dest, index=False)
+    return run_export_tables(command)
 
 
 def dispatch_table_ingest(
@@ -113,19 +104,23 @@ def dispatch_table_ingest(
     overwrite: bool = False,
     verbose: bool = False,
     timestamp_columns: tuple[str, ...] = ("timestamp",),
-) -> None:
+    driver: str = "postgresql",
+    jobs: int = 1,
+) -> list[IngestTableResult]:
     """Ingest all files matching pattern in source_dir as database tables."""
     command = IngestTablesCommand(
         source_dir=Path(source_dir),
         database=database,
         host=host,
         port=port,
+        driver=driver,
         pattern=pattern,
         overwrite=overwrite,
         verbose=verbose,
         timestamp_columns=timestamp_columns,
+        jobs=jobs,
     )
-    run_ingest_tables(command)
+    return run_ingest_tables(command)
 
 
 def dispatch_table_write(
@@ -135,6 +130,7 @@ def dispatch_table_write(
     port: int,
     name: str | None = None,
     overwrite: bool = False,
+    driver: str = "postgresql",
 ) -> None:
     """Write a CSV file to a database table."""
     source = Path(source)
@@ -142,23 +138,15 @@ def dispatch_table_write(
     if not name:
         name = source.stem
 
-    if_table_exists = "replace" if overwrite else "fail"
+    if_exists: Literal["fail", "replace"] = "replace" if overwrite else "fail"
 
     data_frame: pl.DataFrame = pl.read_csv(source)
 
-    engine: db.Engine | str = db.create_engine(
-        database=database,
-        host=host,
-        port=port,
-        username=requireenv("PG_USERNAME"),
-        password=requireenv("PG_PASSWORD"),
-    )
-    assert isinstance(engine, db.Engine), (
-        f"error when creating database engine: {engine}"
+    engine: db.Engine = db.connect_database(database, host, port, driver)
+    result: db.LoadResult = db.load_database_table(
+        engine, name, data_frame.to_pandas(), if_exists
     )
-    db.write_database_table(
-        engine,
-        table=name,
-        data=data_frame,
-        if_table_exists=if_table_exists,
+    logger.info(
+        f"Wrote {result.rows} rows to {name} "
+        f"({result.rows_per_second:,.0f} rows/s)"
     )
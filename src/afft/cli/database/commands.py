@@ -2,8 +2,11 @@
 CLI commands for working with databases.
 """
 
+from datetime import datetime
+
 import click
 
+from ..options import driver_option
 from .actions import (
     dispatch_table_export,
     dispatch_table_ingest,
@@ -24,9 +27,12 @@ def database_group(context: click.Context) -> None:
 @click.argument("host", type=str)
 @click.argument("port", type=int)
 @click.argument("config_path", type=click.Path(exists=True))
-def table_join(database: str, host: str, port: int, config_path: str) -> None:
+@driver_option
+def table_join(
+    database: str, host: str, port: int, config_path: str, driver: str
+) -> None:
     """Join tables in the database."""
-    dispatch_table_join(database, host, port, config_path)
+    dispatch_table_join(database, host, port, config_path, driver)
 
 
 @database_group.command()
@@ -41,15 +47,91 @@ def table_join(database: str, host: str, port: int, config_path: str) -> None:
     multiple=True,
     help="table to export (repeatable); omit to export all tables",
 )
+@driver_option
+@click.option(
+    "--output-format",
+    type=click.Choice(["csv", "parquet", "arrow"], case_sensitive=False),
+    default="csv",
+    show_default=True,
+    help="file format of the exported tables",
+)
+@click.option(
+    "--column",
+    "columns",
+    type=str,
+    multiple=True,
+    help="column to export (repeatable); omit to export all columns",
+)
+@click.option(
+    "--start",
+    type=click.DateTime(formats=["%Y%m%d_%H%M%S"]),
+    default=None,
+    help="start of time interval (YYYYMMDD_HHmmSS, inclusive)",
+)
+@click.option(
+    "--end",
+    type=click.DateTime(formats=["%Y%m%d_%H%M%S"]),
+    default=None,
+    help="end of time interval (YYYYMMDD_HHmmSS, inclusive)",
+)
+@click.option(
+    "--time-column",
+    type=str,
+    default="timestamp",
+    show_default=True,
+    help="column of the time interval",
+)
+@click.option(
+    "--chunk-rows",
+    type=click.IntRange(min=1),
+    default=100_000,
+    show_default=True,
+    help="number of rows that are read and written at a time",
+)
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="number of tables that are exported concurrently",
+)
 def table_export(
     database: str,
     host: str,
     port: int,
     output_dir: str,
     tables: tuple[str, ...],
+    driver: str,
+    output_format: str,
+    columns: tuple[str, ...],
+    start: datetime | None,
+    end: datetime | None,
+    time_column: str,
+    chunk_rows: int,
+    jobs: int,
 ) -> None:
-    """Export database tables to CSV files in OUTPUT_DIR."""
-    dispatch_table_export(database, host, port, output_dir, tables)
+    """Export database tables to files in OUTPUT_DIR."""
+    results = dispatch_table_export(
+        database,
+        host,
+        port,
+        output_dir,
+        tables,
+        driver,
+        output_format,
+        columns,
+        start,
+        end,
+        time_column,
+        chunk_rows,
+        jobs,
+    )
+
+    failures: int = sum(result.error is not None for result in results)
+    if failures:
+        raise click.ClickException(
+            f"failed to export {failures} of {len(results)} tables"
+        )
 
 
 @database_group.command()
@@ -85,6 +167,14 @@ def table_export(
     show_default=True,
     help="column(s) to parse as datetime (repeatable)",
 )
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="number of tables that are ingested concurrently",
+)
+@driver_option
 def table_ingest(
     database: str,
     host: str,
@@ -94,9 +184,11 @@ def table_ingest(
     overwrite: bool,
     verbose: bool,
     timestamp_columns: tuple[str, ...],
+    driver: str,
+    jobs: int,
 ) -> None:
     """Ingest files from SOURCE_DIR as database tables."""
-    dispatch_table_ingest(
+    results = dispatch_table_ingest(
         source_dir,
         database,
         host,
@@ -105,8 +197,16 @@ def table_ingest(
         overwrite,
         verbose,
         timestamp_columns,
+        driver,
+        jobs,
     )
 
+    failures: int = sum(result.error is not None for result in results)
+    if failures:
+        raise click.ClickException(
+            f"failed to ingest {failures} of {len(results)} tables"
+        )
+
 
 @database_group.command()
 @click.argument("source", type=click.Path(exists=True))
@@ -122,6 +222,7 @@ def table_ingest(
     default=False,
     help="overwrite existing database",
 )
+@driver_option
 def table_write(
     source: str,
     database: str,
@@ -129,6 +230,7 @@ def table_write(
     port: int,
     name: str | None,
     overwrite: bool,
+    driver: str,
 ) -> None:
     """Write a table to a database."""
-    dispatch_table_write(source, database, host, port, name, overwrite)
+    dispatch_table_write(source, database, host, port, name, overwrite, driver)
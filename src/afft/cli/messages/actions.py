@@ -1,8 +1,19 @@
 """Actions for message processing CLI commands."""
 
+from datetime import datetime
 from pathlib import Path
 
-from afft.tasks.parse_messages import ParseMessageCommand, run_parse_messages
+from afft.io import TableFormat
+from afft.tasks.parse_messages import (
+    IndexMessageCommand,
+    ParseBackend,
+    ParseDeploymentResult,
+    ParseDeploymentsCommand,
+    ParseMessageCommand,
+    run_index_messages,
+    run_parse_deployments,
+    run_parse_messages,
+)
 
 
 def dispatch_parse_messages(
@@ -13,6 +24,22 @@ def dispatch_parse_messages(
     port: int | None = None,
     prefix: str | None = None,
     output_dir: str | Path | None = None,
+    output_format: str = "csv",
+    output_jobs: int = 4,
+    batch_size: int | None = None,
+    backend: str = "objects",
+    workers: int = 1,
+    topics: tuple[str, ...] = (),
+    start: datetime | None = None,
+    end: datetime | None = None,
+    use_cache: bool = True,
+    follow: bool = False,
+    poll_interval: float = 0.25,
+    idle_timeout: float | None = None,
+    checkpoint: str | Path | None = None,
+    merge_files: tuple[str | Path, ...] = (),
+    metrics_file: str | Path | None = None,
+    driver: str = "postgresql",
 ) -> None:
     command = ParseMessageCommand(
         source_file=Path(source),
@@ -20,7 +47,65 @@ def dispatch_parse_messages(
         database=database,
         host=host,
         port=port,
+        driver=driver,
         prefix=prefix,
         output_dir=Path(output_dir) if output_dir else None,
+        output_format=TableFormat(output_format),
+        output_jobs=output_jobs,
+        batch_size=batch_size,
+        backend=ParseBackend(backend),
+        workers=workers,
+        topics=tuple(topics),
+        start=start,
+        end=end,
+        use_cache=use_cache,
+        follow=follow,
+        poll_interval=poll_interval,
+        idle_timeout=idle_timeout,
+        checkpoint_file=Path(checkpoint) if checkpoint else None,
+        merge_files=tuple(Path(path) for path in merge_files),
+        metrics_file=Path(metrics_file) if metrics_file else None,
     )
     run_parse_messages(command)
+
+
+def dispatch_parse_deployments(
+    source: str | Path,
+    config: str | Path,
+    pattern: str = "*_messages.txt",
+    database: str | None = None,
+    host: str | None = None,
+    port: int | None = None,
+    output_dir: str | Path | None = None,
+    output_format: str = "csv",
+    output_jobs: int = 4,
+    backend: str = "objects",
+    jobs: int = 1,
+    use_cache: bool = True,
+    driver: str = "postgresql",
+) -> list[ParseDeploymentResult]:
+    command = ParseDeploymentsCommand(
+        source=Path(source),
+        config_file=Path(config),
+        pattern=pattern,
+        database=database,
+        host=host,
+        port=port,
+        driver=driver,
+        output_dir=Path(output_dir) if output_dir else None,
+        output_format=TableFormat(output_format),
+        output_jobs=output_jobs,
+        backend=ParseBackend(backend),
+        jobs=jobs,
+        use_cache=use_cache,
+    )
+    return run_parse_deployments(command)
+
+
+def dispatch_index_messages(
+    source: str | Path, bucket_seconds: float = 60.0
+) -> None:
+    command = IndexMessageCommand(
+        source_file=Path(source), bucket_seconds=bucket_seconds
+    )
+    run_index_messages(command)
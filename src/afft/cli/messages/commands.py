@@ -2,9 +2,31 @@
 CLI commands for processing AUV messages, including parsing from the native AUV format.
 """
 
+from datetime import datetime
+
 import click
 
-from .actions import dispatch_parse_messages
+from ..options import driver_option
+from .actions import (
+    dispatch_index_messages,
+    dispatch_parse_deployments,
+    dispatch_parse_messages,
+)
+
+_TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+
+def _parse_timestamp(
+    _ctx: click.Context, _param: click.Parameter, value: str | None
+) -> datetime | None:
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value, _TIMESTAMP_FORMAT)
+    except ValueError:
+        raise click.BadParameter(
+            f"expected format YYYYMMDD_HHmmSS, got {value!r}"
+        )
 
 
 @click.group()
@@ -20,6 +42,7 @@ def message_group(context: click.Context) -> None:
 @click.option("--database", type=str, help="destination database")
 @click.option("--host", type=str, help="destination host")
 @click.option("--port", type=int, help="destination port")
+@driver_option
 @click.option(
     "--prefix", type=str, help="common prefix for exported message groups"
 )
@@ -27,7 +50,117 @@ def message_group(context: click.Context) -> None:
     "--output-dir",
     type=click.Path(file_okay=False),
     default=None,
-    help="export parsed tables as CSV files to this directory",
+    help="export parsed tables as files to this directory",
+)
+@click.option(
+    "--output-format",
+    type=click.Choice(["csv", "parquet", "arrow"], case_sensitive=False),
+    default="csv",
+    show_default=True,
+    help="file format of the exported tables",
+)
+@click.option(
+    "--output-jobs",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="number of tables that are exported or written to the database "
+    "concurrently",
+)
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="stream the source and write tables in batches of this many "
+    "messages per topic, to bound memory usage",
+)
+@click.option(
+    "--backend",
+    type=click.Choice(["objects", "columnar", "polars"], case_sensitive=False),
+    default="objects",
+    show_default=True,
+    help="parse into message objects, directly into typed columns, or "
+    "with vectorized polars expressions",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="number of processes that parse chunks of the source in parallel",
+)
+@click.option(
+    "--topic",
+    "topics",
+    type=str,
+    multiple=True,
+    help="topic to parse (repeatable), read through the source index; "
+    "omit to parse all topics",
+)
+@click.option(
+    "--start",
+    type=str,
+    default=None,
+    callback=_parse_timestamp,
+    help="start of time interval in UTC (YYYYMMDD_HHmmSS, inclusive), "
+    "read through the source index",
+)
+@click.option(
+    "--end",
+    type=str,
+    default=None,
+    callback=_parse_timestamp,
+    help="end of time interval in UTC (YYYYMMDD_HHmmSS, inclusive), "
+    "read through the source index",
+)
+@click.option(
+    "--no-cache",
+    "no_cache",
+    is_flag=True,
+    default=False,
+    help="parse the source even if its parsed tables are cached",
+)
+@click.option(
+    "--follow",
+    is_flag=True,
+    default=False,
+    help="tail the source and append the messages of new lines to the "
+    "tables, resuming from a checkpoint",
+)
+@click.option(
+    "--poll-interval",
+    type=click.FloatRange(min=0.0, min_open=True),
+    default=0.25,
+    show_default=True,
+    help="seconds between polls of the source when following",
+)
+@click.option(
+    "--idle-timeout",
+    type=click.FloatRange(min=0.0, min_open=True),
+    default=None,
+    help="stop following after this many seconds without new lines",
+)
+@click.option(
+    "--checkpoint",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="checkpoint file of the follow offset [default: next to the CSV "
+    "files, or the source]",
+)
+@click.option(
+    "--merge",
+    "merge_files",
+    type=click.Path(exists=True, dir_okay=False),
+    multiple=True,
+    help="another message file of the deployment (repeatable), merged with "
+    "the source in time order",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="write the lines, failures, bytes and parse time of every topic to "
+    "this JSON or CSV file",
 )
 def parse_messages(
     source: str,
@@ -37,8 +170,158 @@ def parse_messages(
     port: int | None = None,
     prefix: str | None = None,
     output_dir: str | None = None,
+    output_format: str = "csv",
+    output_jobs: int = 4,
+    batch_size: int | None = None,
+    backend: str = "objects",
+    workers: int = 1,
+    topics: tuple[str, ...] = (),
+    start: datetime | None = None,
+    end: datetime | None = None,
+    no_cache: bool = False,
+    follow: bool = False,
+    poll_interval: float = 0.25,
+    idle_timeout: float | None = None,
+    checkpoint: str | None = None,
+    merge_files: tuple[str, ...] = (),
+    metrics_file: str | None = None,
+    driver: str = "postgresql",
 ) -> None:
     """CLI action for ingesting messages into a destination."""
     dispatch_parse_messages(
-        source, config, database, host, port, prefix, output_dir
+        source,
+        config,
+        database,
+        host,
+        port,
+        prefix,
+        output_dir,
+        output_format,
+        output_jobs,
+        batch_size,
+        backend,
+        workers,
+        topics,
+        start,
+        end,
+        not no_cache,
+        follow,
+        poll_interval,
+        idle_timeout,
+        checkpoint,
+        merge_files,
+        metrics_file,
+        driver,
+    )
+
+
+@message_group.command()
+@click.argument("source", type=click.Path(exists=True))
+@click.argument("config", type=click.Path(exists=True))
+@click.option(
+    "--pattern",
+    type=str,
+    default="*_messages.txt",
+    show_default=True,
+    help="glob pattern to select message files if SOURCE is a directory",
+)
+@click.option("--database", type=str, help="destination database")
+@click.option("--host", type=str, help="destination host")
+@click.option("--port", type=int, help="destination port")
+@driver_option
+@click.option(
+    "--output-dir",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="export parsed tables as files to this directory",
+)
+@click.option(
+    "--output-format",
+    type=click.Choice(["csv", "parquet", "arrow"], case_sensitive=False),
+    default="csv",
+    show_default=True,
+    help="file format of the exported tables",
+)
+@click.option(
+    "--output-jobs",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="number of tables that are exported or written to the database "
+    "concurrently",
+)
+@click.option(
+    "--backend",
+    type=click.Choice(["objects", "columnar"], case_sensitive=False),
+    default="objects",
+    show_default=True,
+    help="parse into message objects, or directly into typed columns",
+)
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="number of processes that parse deployments in parallel",
+)
+@click.option(
+    "--no-cache",
+    "no_cache",
+    is_flag=True,
+    default=False,
+    help="parse the sources even if their parsed tables are cached",
+)
+def parse_deployments(
+    source: str,
+    config: str,
+    pattern: str = "*_messages.txt",
+    database: str | None = None,
+    host: str | None = None,
+    port: int | None = None,
+    output_dir: str | None = None,
+    output_format: str = "csv",
+    output_jobs: int = 4,
+    backend: str = "objects",
+    jobs: int = 1,
+    no_cache: bool = False,
+    driver: str = "postgresql",
+) -> None:
+    """CLI action for parsing the message files of many deployments. SOURCE
+    is a directory of message files, or a deployment list with a message
+    file and an optional table prefix per line. Tables are prefixed with the
+    message file name without suffixes and "_messages" by default."""
+    results = dispatch_parse_deployments(
+        source,
+        config,
+        pattern,
+        database,
+        host,
+        port,
+        output_dir,
+        output_format,
+        output_jobs,
+        backend,
+        jobs,
+        not no_cache,
+        driver,
     )
+
+    failures: int = sum(result.error is not None for result in results)
+    if failures:
+        raise click.ClickException(
+            f"failed to parse {failures} of {len(results)} deployments"
+        )
+
+
+@message_group.command()
+@click.argument("source", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--bucket-seconds",
+    type=click.FloatRange(min=0.0, min_open=True),
+    default=60.0,
+    show_default=True,
+    help="width of the time buckets of the index",
+)
+def index_messages(source: str, bucket_seconds: float = 60.0) -> None:
+    """CLI action for indexing the topics and times of a message file."""
+    dispatch_index_messages(source, bucket_seconds)
@@ -0,0 +1,13 @@
+"""Options that are shared by the commands of several CLI groups."""
+
+import click
+
+
+driver_option = click.option(
+    "--driver",
+    type=str,
+    default="postgresql",
+    show_default=True,
+    help="database driver, e.g. sqlite to use the file given as database, "
+    "in which case host and port are ignored",
+)
@@ -1,8 +1,21 @@
 """Package for SQL related IO functionality."""
 
 from .engine import Engine as Engine
+from .engine import EngineOptions as EngineOptions
+from .engine import connect_database as connect_database
 from .engine import create_engine as create_engine
+from .engine import create_engine_url as create_engine_url
+from .engine import dispose_engines as dispose_engines
+from .engine import get_engine as get_engine
+from .engine import is_file_backend as is_file_backend
+from .readers import READ_CHUNK_ROWS as READ_CHUNK_ROWS
+from .readers import iter_database_table as iter_database_table
 from .readers import read_database_table as read_database_table
+from .readers import select_database_table as select_database_table
+from .writers import COPY_CHUNK_ROWS as COPY_CHUNK_ROWS
+from .writers import LoadResult as LoadResult
+from .writers import load_database_table as load_database_table
+from .writers import supports_copy as supports_copy
 from .writers import write_database_table as write_database_table
 
 __all__ = []
@@ -1,32 +1,197 @@
 """Module for SQL database endpoints."""
 
+import os
+import threading
+
+from dataclasses import dataclass
+from typing import Any
+
 import sqlalchemy as sqla
 
+from afft.env import getenv
+
 
 Engine = sqla.Engine
 
 
-USER_KEY: str = "DB_USER"
-PASSWORD_KEY: str = "DB_PASSWORD"
+USER_KEY: str = "PG_USERNAME"
+PASSWORD_KEY: str = "PG_PASSWORD"
 
+# Former names of the credential variables, which are read if the current
+# names are not set
+LEGACY_USER_KEY: str = "DB_USER"
+LEGACY_PASSWORD_KEY: str = "DB_PASSWORD"
 
-def create_engine(
+# Backends that store a database in a local file, which is given as the
+# database name, and that do not use a host, port or credentials
+FILE_BACKENDS: frozenset[str] = frozenset({"sqlite"})
+
+
+@dataclass(slots=True, frozen=True)
+class EngineOptions:
+    """Class representing the connection pool and statement cache options of
+    an engine. The statement cache size is the size of the compiled query
+    cache, and of the prepared statement cache of SQLite connections."""
+
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_pre_ping: bool = True
+    statement_cache_size: int = 500
+
+
+# Engines of the process by URL and options, so that tasks that connect to
+# the same database reuse the connections of its pool
+_ENGINES: dict[tuple[str, EngineOptions], Engine] = dict()
+_ENGINES_LOCK: threading.Lock = threading.Lock()
+_ENGINES_PID: int = os.getpid()
+
+
+def _require_credential(key: str, legacy_key: str) -> str:
+    """Returns the value of a credential variable, or of its former name if
+    only that is set, or raises KeyError if neither is set."""
+    value: str | None = getenv(key, getenv(legacy_key))
+    if value is None:
+        raise KeyError(f"missing environment variable: {key}")
+    return value
+
+
+def is_file_backend(drivername: str) -> bool:
+    """Returns true if the driver is of a backend that stores a database in
+    a local file, e.g. sqlite or sqlite+pysqlite."""
+    return drivername.partition("+")[0] in FILE_BACKENDS
+
+
+def create_engine_url(
     database: str,
-    host: str,
-    port: int,
-    username: str,
-    password: str,
+    host: str | None = None,
+    port: int | None = None,
+    username: str | None = None,
+    password: str | None = None,
     drivername: str = "postgresql",
-) -> Engine | str:
-    """Creates an engine for a SQL database."""
+) -> sqla.URL:
+    """Creates the URL of a database. The database of a file backend is the
+    path of its file, and the host, port and credentials are ignored."""
+    if is_file_backend(drivername):
+        return sqla.URL.create(drivername=drivername, database=database)
+
+    return sqla.URL.create(
+        database=database,
+        host=host,
+        port=port,
+        username=username,
+        password=password,
+        drivername=drivername,
+    )
+
+
+def _get_engine_arguments(
+    url: sqla.URL, options: EngineOptions
+) -> dict[str, Any]:
+    """Returns the create engine arguments of the options for a URL."""
+    arguments: dict[str, Any] = {
+        "pool_pre_ping": options.pool_pre_ping,
+        "query_cache_size": options.statement_cache_size,
+    }
 
-    url: sqla.engine.URL = sqla.engine.URL.create(
+    # In-memory SQLite databases are kept in a connection per thread, which
+    # is not a sized pool
+    if url.get_backend_name() == "sqlite":
+        arguments["connect_args"] = {
+            "cached_statements": options.statement_cache_size
+        }
+        if url.database in (None, "", ":memory:"):
+            return arguments
+
+    arguments["pool_size"] = options.pool_size
+    arguments["max_overflow"] = options.max_overflow
+    return arguments
+
+
+def get_engine(
+    url: str | sqla.URL, options: EngineOptions = EngineOptions()
+) -> Engine:
+    """Returns the engine of a URL from the registry of the process, and
+    creates and registers the engine if it does not exist. Engines that are
+    inherited by a forked process are replaced, since their connections are
+    shared with the parent."""
+    global _ENGINES_PID
+
+    url = sqla.make_url(url)
+    key: tuple[str, EngineOptions] = (
+        url.render_as_string(hide_password=False),
+        options,
+    )
+
+    with _ENGINES_LOCK:
+        if _ENGINES_PID != os.getpid():
+            for inherited in _ENGINES.values():
+                inherited.dispose(close=False)
+            _ENGINES.clear()
+            _ENGINES_PID = os.getpid()
+
+        engine: Engine | None = _ENGINES.get(key)
+        if engine is None:
+            engine = sqla.create_engine(
+                url, **_get_engine_arguments(url, options)
+            )
+            _ENGINES[key] = engine
+
+    return engine
+
+
+def dispose_engines() -> None:
+    """Closes the connections of the registered engines, and clears the
+    registry."""
+    with _ENGINES_LOCK:
+        for engine in _ENGINES.values():
+            engine.dispose()
+        _ENGINES.clear()
+
+
+def create_engine(
+    database: str,
+    host: str | None,
+    port: int | None,
+    username: str | None,
+    password: str | None,
+    drivername: str = "postgresql",
+    options: EngineOptions = EngineOptions(),
+) -> Engine:
+    """Returns the registered engine for a SQL database."""
+    url: sqla.URL = create_engine_url(
         database=database,
         host=host,
         port=port,
         username=username,
         password=password,
-        drivername="postgresql",
+        drivername=drivername,
     )
+    return get_engine(url, options)
+
+
+def connect_database(
+    database: str,
+    host: str | None = None,
+    port: int | None = None,
+    drivername: str = "postgresql",
+    options: EngineOptions = EngineOptions(),
+) -> Engine:
+    """Returns the registered engine for a SQL database, with the credentials
+    from the environment. File backends need no host, port or credentials."""
+    if is_file_backend(drivername):
+        return create_engine(
+            database, None, None, None, None, drivername, options
+        )
+
+    if host is None or port is None:
+        raise ValueError(f"host and port are required for: {drivername}")
 
-    return sqla.create_engine(url)
+    return create_engine(
+        database=database,
+        host=host,
+        port=port,
+        username=_require_credential(USER_KEY, LEGACY_USER_KEY),
+        password=_require_credential(PASSWORD_KEY, LEGACY_PASSWORD_KEY),
+        drivername=drivername,
+        options=options,
+    )
@@ -1,8 +1,15 @@
 """Module for reading data from a database."""
 
-from typing import Any
+import json
 
+from collections.abc import Callable, Iterator, Sequence
+from datetime import datetime
+from typing import Any, Optional
+
+import pandas as pd
 import polars as pl
+import pyarrow as pa
+import sqlalchemy as sqla
 
 from .engine import Engine
 
@@ -19,3 +26,126 @@ def read_database_table(
         return dataframe
     except (IOError, TypeError, ValueError) as exception:
         raise exception
+
+
+# Rows per chunk of a streamed table read
+READ_CHUNK_ROWS: int = 100_000
+
+
+def _to_arrow_type(column_type: sqla.types.TypeEngine[Any]) -> pa.DataType:
+    """Returns the Arrow type of a SQL column type. Types without an Arrow
+    counterpart, e.g. JSON or intervals, are read as strings."""
+    if isinstance(column_type, sqla.Boolean):
+        return pa.bool_()
+    if isinstance(column_type, sqla.Integer):
+        return pa.int64()
+    if isinstance(column_type, (sqla.Float, sqla.Numeric)):
+        return pa.float64()
+    if isinstance(column_type, sqla.DateTime):
+        return pa.timestamp("ns", tz="UTC" if column_type.timezone else None)
+    if isinstance(column_type, sqla.Date):
+        return pa.date32()
+    if isinstance(column_type, sqla.Time):
+        return pa.time64("us")
+    if isinstance(column_type, sqla.LargeBinary):
+        return pa.binary()
+    return pa.string()
+
+
+def _get_string_converter(
+    column_type: sqla.types.TypeEngine[Any],
+) -> Optional[Callable[[Any], str]]:
+    """Returns the converter of the values of a column type that is read as
+    strings, or none if its values are strings already. JSON values are
+    serialized as JSON, and other values are formatted."""
+    if isinstance(column_type, sqla.String) or not pa.types.is_string(
+        _to_arrow_type(column_type)
+    ):
+        return None
+    if isinstance(column_type, sqla.JSON):
+        return json.dumps
+    return str
+
+
+def select_database_table(
+    engine: Engine,
+    table: str,
+    columns: Sequence[str] = (),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    time_column: str = "timestamp",
+) -> tuple[sqla.Select[Any], pa.Schema]:
+    """Returns a query of the given columns of a table, or all columns, with
+    the rows between start and end inclusive, and the Arrow schema of the
+    query from the column types of the table."""
+    reflected = sqla.Table(table, sqla.MetaData(), autoload_with=engine)
+
+    names: list[str] = list(columns) or list(reflected.columns.keys())
+    time_columns: list[str] = (
+        [time_column] if start is not None or end is not None else []
+    )
+    missing: list[str] = [
+        name for name in names + time_columns if name not in reflected.columns
+    ]
+    if missing:
+        raise ValueError(f"missing columns in table {table}: {missing}")
+
+    selected: list[sqla.Column[Any]] = [
+        reflected.columns[name] for name in names
+    ]
+    query: sqla.Select[Any] = sqla.select(*selected)
+    if start is not None:
+        query = query.where(reflected.columns[time_column] >= start)
+    if end is not None:
+        query = query.where(reflected.columns[time_column] <= end)
+
+    schema: pa.Schema = pa.schema(
+        [(column.name, _to_arrow_type(column.type)) for column in selected]
+    )
+    return query, schema
+
+
+def iter_database_table(
+    engine: Engine,
+    table: str,
+    columns: Sequence[str] = (),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    time_column: str = "timestamp",
+    chunk_rows: int = READ_CHUNK_ROWS,
+) -> Iterator[pa.Table]:
+    """Lazily reads the rows of a table in chunks with a server-side cursor,
+    so that memory is bounded by the chunk size rather than the table size.
+    The columns and the time range are selected in the query. The chunks
+    have the schema of the column types, and a table without rows yields an
+    empty chunk. Values of types without an Arrow counterpart are converted
+    to strings, e.g. JSON values to JSON text."""
+    query, schema = select_database_table(
+        engine, table, columns, start, end, time_column
+    )
+
+    converters: dict[str, Callable[[Any], str]] = dict()
+    for column in query.selected_columns:
+        converter: Optional[Callable[[Any], str]] = _get_string_converter(
+            column.type
+        )
+        if converter is not None:
+            converters[column.name] = converter
+
+    with engine.connect() as connection:
+        streamed: sqla.Connection = connection.execution_options(
+            stream_results=True, max_row_buffer=chunk_rows
+        )
+        empty: bool = True
+        for chunk in pd.read_sql(query, streamed, chunksize=chunk_rows):
+            if chunk.empty:
+                continue
+            empty = False
+            for name, converter in converters.items():
+                chunk[name] = chunk[name].map(converter, na_action="ignore")
+            yield pa.Table.from_pandas(
+                chunk, schema=schema, preserve_index=False
+            )
+
+    if empty:
+        yield schema.empty_table()
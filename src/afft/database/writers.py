@@ -1,8 +1,15 @@
 """Module for writing various data types to a SQL database."""
 
-from typing import Any
+import time
 
+from collections.abc import Iterator
+from dataclasses import dataclass
+from io import StringIO
+from typing import Any, Literal, Self
+
+import pandas as pd
 import polars as pl
+import sqlalchemy as sqla
 
 from .engine import Engine
 
@@ -21,3 +28,110 @@ def write_database_table(
         return rows
     except (IOError, TypeError, ValueError) as error:
         return error
+
+
+# Rows per COPY chunk, which bounds the size of the CSV buffer of a load
+COPY_CHUNK_ROWS: int = 100_000
+
+# Marker of missing values in the CSV chunks of COPY, so that empty strings
+# are loaded as empty strings rather than nulls
+COPY_NULL: str = r"\N"
+
+
+@dataclass(slots=True, frozen=True)
+class LoadResult:
+    """Class representing the rows and time of a table load."""
+
+    table: str
+    rows: int
+    seconds: float
+    copied: bool
+
+    @property
+    def rows_per_second(self: Self) -> float:
+        """Returns the throughput of the load."""
+        return self.rows / self.seconds if self.seconds > 0.0 else 0.0
+
+
+def supports_copy(engine: Engine) -> bool:
+    """Returns true if the engine can bulk load rows with COPY FROM STDIN."""
+    return (
+        engine.dialect.name == "postgresql"
+        and engine.dialect.driver == "psycopg2"
+    )
+
+
+def _iter_copy_chunks(
+    dataframe: pd.DataFrame, chunk_rows: int
+) -> Iterator[StringIO]:
+    """Yields the rows of a data frame as CSV buffers of at most chunk rows.
+    Missing values are written as the null marker of COPY."""
+    for start in range(0, len(dataframe), chunk_rows):
+        buffer = StringIO()
+        dataframe.iloc[start : start + chunk_rows].to_csv(
+            buffer, header=False, index=False, na_rep=COPY_NULL
+        )
+        buffer.seek(0)
+        yield buffer
+
+
+def _copy_rows(
+    connection: sqla.Connection,
+    table: str,
+    dataframe: pd.DataFrame,
+    chunk_rows: int,
+) -> None:
+    """Streams the rows of a data frame into an existing table with COPY FROM
+    STDIN in CSV chunks."""
+    preparer = connection.dialect.identifier_preparer
+    columns: str = ", ".join(
+        preparer.quote(str(column)) for column in dataframe.columns
+    )
+    statement: str = (
+        f"COPY {preparer.quote(table)} ({columns}) FROM STDIN "
+        f"WITH (FORMAT csv, NULL '{COPY_NULL}')"
+    )
+
+    cursor = connection.connection.cursor()
+    try:
+        for buffer in _iter_copy_chunks(dataframe, chunk_rows):
+            cursor.copy_expert(statement, buffer)
+    finally:
+        cursor.close()
+
+
+def load_database_table(
+    engine: Engine,
+    table: str,
+    dataframe: pd.DataFrame,
+    if_exists: Literal["fail", "replace", "append"] = "fail",
+    chunk_rows: int = COPY_CHUNK_ROWS,
+) -> LoadResult:
+    """Loads a data frame into a database table in one transaction. With
+    PostgreSQL, the table is created from the column types of the frame, and
+    the rows are streamed with COPY. Other backends insert the rows in
+    batches."""
+    start: float = time.perf_counter()
+    copied: bool = supports_copy(engine)
+
+    with engine.begin() as connection:
+        if copied:
+            dataframe.head(0).to_sql(
+                table, con=connection, if_exists=if_exists, index=False
+            )
+            _copy_rows(connection, table, dataframe, chunk_rows)
+        else:
+            dataframe.to_sql(
+                table,
+                con=connection,
+                if_exists=if_exists,
+                index=False,
+                chunksize=chunk_rows,
+            )
+
+    return LoadResult(
+        table=table,
+        rows=len(dataframe),
+        seconds=time.perf_counter() - start,
+        copied=copied,
+    )
@@ -3,8 +3,22 @@
 from .config_io import read_config as read_config
 from .config_io import write_config as write_config
 
+from .file_io import follow_lines as follow_lines
+from .file_io import is_compressed as is_compressed
+from .file_io import iter_lines as iter_lines
+from .file_io import iter_topic_lines as iter_topic_lines
+from .file_io import read_line_range as read_line_range
 from .file_io import read_lines as read_lines
+from .file_io import split_line_ranges as split_line_ranges
 from .file_io import write_lines as write_lines
 
+from .table_io import TableFormat as TableFormat
+from .table_io import format_array_columns as format_array_columns
+from .table_io import get_table_format as get_table_format
+from .table_io import get_table_path as get_table_path
+from .table_io import read_table as read_table
+from .table_io import write_table as write_table
+from .table_io import write_table_chunks as write_table_chunks
+
 
 __all__ = []
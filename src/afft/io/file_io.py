@@ -1,6 +1,100 @@
-"""Module for reading and writing text files."""
+"""Module for reading and writing text files. Text files that are compressed
+with gzip, zstd, bzip2 or lz4 are decompressed while they are read."""
 
+import mmap
+import os
+import queue
+import threading
+import time
+
+from collections import Counter
+from collections.abc import Collection, Iterator
+from io import BytesIO, TextIOWrapper
 from pathlib import Path
+from typing import Optional
+
+import pyarrow as pa
+
+
+# Compression codecs of the compressed file suffixes
+COMPRESSION_CODECS: dict[str, str] = {
+    ".gz": "gzip",
+    ".gzip": "gzip",
+    ".zst": "zstd",
+    ".zstd": "zstd",
+    ".bz2": "bz2",
+    ".lz4": "lz4",
+}
+
+# Size and number of the decompressed chunks that are read ahead
+DECOMPRESS_CHUNK_BYTES: int = 4 * 1024**2
+DECOMPRESS_QUEUE_SIZE: int = 4
+
+
+def is_compressed(path: Path) -> bool:
+    """Returns true if the suffix of a file is a compression suffix."""
+    return path.suffix.lower() in COMPRESSION_CODECS
+
+
+def _read_ahead(path: Path) -> Iterator[bytes]:
+    """Yields the decompressed chunks of a compressed file. Chunks are
+    decompressed in a background thread, which runs while the caller
+    processes the previous chunks since the decompressor releases the GIL."""
+    chunks: queue.Queue[bytes | BaseException] = queue.Queue(
+        DECOMPRESS_QUEUE_SIZE
+    )
+    stopped: threading.Event = threading.Event()
+
+    def decompress() -> None:
+        try:
+            with pa.input_stream(
+                str(path), compression=COMPRESSION_CODECS[path.suffix.lower()]
+            ) as stream:
+                while not stopped.is_set():
+                    chunk: bytes = stream.read(DECOMPRESS_CHUNK_BYTES)
+                    chunks.put(chunk)
+                    if not chunk:
+                        return
+        except BaseException as exception:
+            chunks.put(exception)
+
+    thread: threading.Thread = threading.Thread(target=decompress, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item: bytes | BaseException = chunks.get()
+            if isinstance(item, BaseException):
+                raise item
+            if not item:
+                return
+            yield item
+    finally:
+        # Unblock the decompressor if the caller stops early
+        stopped.set()
+        while thread.is_alive():
+            try:
+                chunks.get_nowait()
+            except queue.Empty:
+                thread.join(0.01)
+
+
+def _iter_compressed_lines(path: Path) -> Iterator[bytes]:
+    """Yields the lines of a compressed file in bytes, without line feeds."""
+    remainder: bytes = b""
+    for chunk in _read_ahead(path):
+        lines: list[bytes] = (remainder + chunk).split(b"\n")
+        remainder = lines.pop()
+        yield from lines
+    if remainder:
+        yield remainder
+
+
+def _decode_line(line: bytes, encoding: str = "utf-8") -> str:
+    """Decodes a line in bytes without its trailing carriage return."""
+    if line.endswith(b"\r"):
+        line = line[:-1]
+    return line.decode(encoding)
 
 
 def read_lines(path: Path, mode: str = "r") -> list[str]:
@@ -8,6 +102,9 @@ def read_lines(path: Path, mode: str = "r") -> list[str]:
     if not path.is_file():
         raise ValueError(f"path {path} is not a file")
 
+    if is_compressed(path):
+        return [_decode_line(line) for line in _iter_compressed_lines(path)]
+
     try:
         with open(path, mode) as filehandle:
             lines = filehandle.readlines()
@@ -17,6 +114,240 @@ def read_lines(path: Path, mode: str = "r") -> list[str]:
         raise exception
 
 
+def iter_lines(path: Path, mode: str = "r") -> Iterator[str]:
+    """Lazily reads lines from a text file, one line at a time."""
+    if not path.is_file():
+        raise ValueError(f"path {path} is not a file")
+
+    return _iter_lines(path, mode)
+
+
+def _iter_lines(path: Path, mode: str) -> Iterator[str]:
+    """Yields the lines of a text file without line breaks."""
+    if is_compressed(path):
+        for line in _iter_compressed_lines(path):
+            yield _decode_line(line)
+        return
+
+    with open(path, mode) as filehandle:
+        for line in filehandle:
+            yield line.replace("\n", "")
+
+
+def split_line_ranges(path: Path, count: int) -> list[tuple[int, int]]:
+    """Splits a file into at most count contiguous byte ranges, each of which
+    starts at the beginning of a line and ends after a line break."""
+    if not path.is_file():
+        raise ValueError(f"path {path} is not a file")
+    if is_compressed(path):
+        raise ValueError(f"compressed file cannot be split: {path}")
+    if count < 1:
+        raise ValueError(f"invalid range count: {count}")
+
+    size: int = os.path.getsize(path)
+    boundaries: list[int] = [0]
+    with open(path, "rb") as filehandle:
+        for index in range(1, count):
+            target: int = size * index // count
+            if target <= boundaries[-1]:
+                continue
+            # Move the boundary to just after the next line break
+            filehandle.seek(target - 1)
+            filehandle.readline()
+            boundary: int = filehandle.tell()
+            if boundaries[-1] < boundary < size:
+                boundaries.append(boundary)
+    boundaries.append(size)
+
+    return [
+        (start, end)
+        for start, end in zip(boundaries[:-1], boundaries[1:])
+        if start < end
+    ]
+
+
+def read_line_range(path: Path, start: int, end: int) -> list[str]:
+    """Reads the lines in a byte range of a text file. The range is decoded
+    like read_lines, so that the lines of consecutive ranges are the same as
+    the lines of the whole file."""
+    if not path.is_file():
+        raise ValueError(f"path {path} is not a file")
+    if is_compressed(path):
+        raise ValueError(f"compressed file cannot be split: {path}")
+
+    with open(path, "rb") as filehandle:
+        filehandle.seek(start)
+        data: bytes = filehandle.read(end - start)
+
+    return _decode_lines(data)
+
+
+def _decode_lines(data: bytes) -> list[str]:
+    """Decodes the lines of a text file like read_lines."""
+    with TextIOWrapper(BytesIO(data)) as filehandle:
+        return [line.replace("\n", "") for line in filehandle.readlines()]
+
+
+# Maximum number of bytes that are read from a followed file at once
+FOLLOW_CHUNK_BYTES: int = 16 * 1024**2
+
+
+def follow_lines(
+    path: Path,
+    offset: int = 0,
+    poll_interval: float = 0.25,
+    idle_timeout: Optional[float] = None,
+) -> Iterator[tuple[list[str], int]]:
+    """Lazily reads the complete lines that are appended to a growing text
+    file after a byte offset, and yields the lines and the offset after
+    them. A partial last line is read once its line break is written. The
+    file is polled at the given interval, until no lines have been appended
+    for idle_timeout seconds, if given."""
+    if not path.is_file():
+        raise ValueError(f"path {path} is not a file")
+    if is_compressed(path):
+        raise ValueError(f"compressed file cannot be followed: {path}")
+    if offset < 0:
+        raise ValueError(f"invalid offset: {offset}")
+
+    return _follow_lines(path, offset, poll_interval, idle_timeout)
+
+
+def _follow_lines(
+    path: Path,
+    offset: int,
+    poll_interval: float,
+    idle_timeout: Optional[float],
+) -> Iterator[tuple[list[str], int]]:
+    """Yields the lines appended to a file, polling for new lines."""
+    with open(path, "rb") as filehandle:
+        idle_since: float = time.monotonic()
+        while True:
+            size: int = os.fstat(filehandle.fileno()).st_size
+            if size < offset:
+                raise ValueError(f"file was truncated: {path}")
+
+            if size > offset:
+                filehandle.seek(offset)
+                data: bytes = filehandle.read(
+                    min(size - offset, FOLLOW_CHUNK_BYTES)
+                )
+                end: int = data.rfind(b"\n")
+                if end >= 0:
+                    offset += end + 1
+                    yield _decode_lines(data[: end + 1]), offset
+                    idle_since = time.monotonic()
+                    continue
+
+            if (
+                idle_timeout is not None
+                and time.monotonic() - idle_since >= idle_timeout
+            ):
+                return
+
+            time.sleep(poll_interval)
+
+
+# Bytes that end a line topic, i.e. whitespace except line breaks
+TOPIC_SEPARATORS: bytes = b" \t\x0b\x0c"
+
+
+def iter_topic_lines(
+    path: Path,
+    topics: Collection[str],
+    skipped: Optional[Counter[str]] = None,
+    start: int = 0,
+    end: Optional[int] = None,
+    encoding: str = "utf-8",
+) -> Iterator[str]:
+    """Lazily reads the lines of a text file, and skips lines whose topic is
+    not in the given topics. The topic of a line is the text before its
+    first colon if the colon is followed by whitespace, and lines without a
+    topic are always read. The file is memory-mapped and scanned in bytes,
+    so that only the lines that are read are decoded. Topics of the skipped
+    lines are counted in skipped, if given.
+
+    Lines are split at line feeds, and a trailing carriage return is removed.
+    If a byte range is given, it should start at the beginning of a line.
+    Compressed files are decompressed as a stream instead, and have no byte
+    ranges."""
+    if not path.is_file():
+        raise ValueError(f"path {path} is not a file")
+
+    encoded: frozenset[bytes] = frozenset(
+        topic.encode(encoding) for topic in topics
+    )
+
+    if is_compressed(path):
+        if start != 0 or end is not None:
+            raise ValueError(f"compressed file cannot be split: {path}")
+        return _iter_compressed_topic_lines(path, encoded, skipped, encoding)
+
+    return _iter_topic_lines(path, encoded, skipped, start, end, encoding)
+
+
+def _iter_compressed_topic_lines(
+    path: Path,
+    topics: frozenset[bytes],
+    skipped: Optional[Counter[str]],
+    encoding: str,
+) -> Iterator[str]:
+    """Yields the decoded lines with a topic in the given topics, or without
+    a topic, from a compressed file."""
+    for line in _iter_compressed_lines(path):
+        colon: int = line.find(b":")
+        if (
+            colon >= 0
+            and colon + 1 < len(line)
+            and line[colon + 1] in TOPIC_SEPARATORS
+            and line[:colon] not in topics
+        ):
+            if skipped is not None:
+                skipped[line[:colon].decode(encoding)] += 1
+            continue
+        yield _decode_line(line, encoding)
+
+
+def _iter_topic_lines(
+    path: Path,
+    topics: frozenset[bytes],
+    skipped: Optional[Counter[str]],
+    start: int,
+    end: Optional[int],
+    encoding: str,
+) -> Iterator[str]:
+    """Yields the decoded lines with a topic in the given topics, or without
+    a topic, from a memory-mapped byte range of a file."""
+    if os.path.getsize(path) == 0:
+        return
+
+    with (
+        open(path, "rb") as filehandle,
+        mmap.mmap(filehandle.fileno(), 0, access=mmap.ACCESS_READ) as data,
+    ):
+        stop: int = len(data) if end is None else min(end, len(data))
+        find = data.find
+
+        while start < stop:
+            line_end: int = find(b"\n", start, stop)
+            if line_end < 0:
+                line_end = stop
+
+            colon: int = find(b":", start, line_end)
+            if (
+                colon >= 0
+                and colon + 1 < line_end
+                and data[colon + 1] in TOPIC_SEPARATORS
+                and data[start:colon] not in topics
+            ):
+                if skipped is not None:
+                    skipped[data[start:colon].decode(encoding)] += 1
+            else:
+                yield _decode_line(data[start:line_end], encoding)
+
+            start = line_end + 1
+
+
 def write_lines(lines: list[str], path: Path, mode: str = "w") -> Path:
     """Writes lines to a text file."""
 
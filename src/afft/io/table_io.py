@@ -0,0 +1,170 @@
+"""Module for reading and writing tables as CSV, Parquet and Arrow IPC files."""
+
+from collections.abc import Iterable, Sequence
+from contextlib import ExitStack
+from enum import StrEnum
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+class TableFormat(StrEnum):
+    CSV = "csv"
+    PARQUET = "parquet"
+    ARROW = "arrow"
+
+
+TABLE_SUFFIXES: dict[TableFormat, str] = {
+    TableFormat.CSV: ".csv",
+    TableFormat.PARQUET: ".parquet",
+    TableFormat.ARROW: ".arrow",
+}
+
+
+def get_table_format(path: Path) -> TableFormat:
+    """Returns the table format of a file from its suffix."""
+    for table_format, suffix in TABLE_SUFFIXES.items():
+        if path.suffix.lower() == suffix:
+            return table_format
+    raise ValueError(f"invalid table file suffix: {path}")
+
+
+def get_table_path(
+    directory: Path, name: str, table_format: TableFormat
+) -> Path:
+    """Returns the path of a table file in a directory."""
+    return directory / f"{name}{TABLE_SUFFIXES[table_format]}"
+
+
+def format_array_columns(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Returns a dataframe with the arrays of array columns, e.g. sonar
+    traces, formatted as space-separated values, so that they can be written
+    to CSV files and text database columns without truncation."""
+    columns: list[str] = [
+        column
+        for column in dataframe.columns
+        if dataframe[column].dtype == object
+        and len(dataframe)
+        and isinstance(dataframe[column].iloc[0], np.ndarray)
+    ]
+    if not columns:
+        return dataframe
+
+    return dataframe.assign(
+        **{
+            column: dataframe[column].map(
+                lambda values: " ".join(map(str, values.tolist())),
+                na_action="ignore",
+            )
+            for column in columns
+        }
+    )
+
+
+def write_table(table: pa.Table | pd.DataFrame, path: Path) -> None:
+    """Writes a table to a file in the format of the file suffix. Parquet and
+    Arrow IPC files keep the column types, so that timestamps are not
+    formatted as text and parsed again by the reader. Array columns are
+    written as lists in the binary formats."""
+    table_format: TableFormat = get_table_format(path)
+
+    if table_format == TableFormat.CSV:
+        dataframe: pd.DataFrame = (
+            table.to_pandas() if isinstance(table, pa.Table) else table
+        )
+        format_array_columns(dataframe).to_csv(path, index=False)
+        return
+
+    if isinstance(table, pd.DataFrame):
+        table = pa.Table.from_pandas(table, preserve_index=False)
+
+    match table_format:
+        case TableFormat.PARQUET:
+            pq.write_table(table, path)
+        case TableFormat.ARROW:
+            with (
+                pa.OSFile(str(path), "wb") as sink,
+                pa.ipc.new_file(sink, table.schema) as writer,
+            ):
+                writer.write_table(table)
+
+
+def _open_table_writer(
+    stack: ExitStack,
+    path: Path,
+    table_format: TableFormat,
+    schema: pa.Schema,
+) -> pq.ParquetWriter | pa.ipc.RecordBatchFileWriter:
+    """Opens a writer of Arrow tables to a Parquet or Arrow IPC file, which
+    is closed with the stack."""
+    match table_format:
+        case TableFormat.PARQUET:
+            return stack.enter_context(pq.ParquetWriter(path, schema))
+        case TableFormat.ARROW:
+            sink: pa.OSFile = stack.enter_context(pa.OSFile(str(path), "wb"))
+            return stack.enter_context(pa.ipc.new_file(sink, schema))
+        case _:
+            raise ValueError(f"invalid binary table format: {table_format}")
+
+
+def write_table_chunks(
+    chunks: Iterable[pa.Table | pd.DataFrame], path: Path
+) -> int:
+    """Writes the chunks of a table to a file in the format of the file
+    suffix, so that the table is written with the memory of a chunk, and
+    returns the number of rows. Parquet and Arrow IPC files have the schema
+    of the first chunk, so the chunks should have the same schema."""
+    table_format: TableFormat = get_table_format(path)
+    rows: int = 0
+
+    if table_format == TableFormat.CSV:
+        with open(path, "w", newline="") as file:
+            header: bool = True
+            for chunk in chunks:
+                dataframe: pd.DataFrame = (
+                    chunk.to_pandas() if isinstance(chunk, pa.Table) else chunk
+                )
+                format_array_columns(dataframe).to_csv(
+                    file, header=header, index=False
+                )
+                header = False
+                rows += len(dataframe)
+        return rows
+
+    with ExitStack() as stack:
+        writer: pq.ParquetWriter | pa.ipc.RecordBatchFileWriter | None = None
+        for chunk in chunks:
+            table: pa.Table = (
+                chunk
+                if isinstance(chunk, pa.Table)
+                else pa.Table.from_pandas(chunk, preserve_index=False)
+            )
+            if writer is None:
+                writer = _open_table_writer(
+                    stack, path, table_format, table.schema
+                )
+            writer.write_table(table)
+            rows += table.num_rows
+
+        if writer is None:
+            raise ValueError(f"no table chunks to write: {path}")
+
+    return rows
+
+
+def read_table(
+    path: Path, timestamp_columns: Sequence[str] = ()
+) -> pd.DataFrame:
+    """Reads a table from a file in the format of the file suffix. Timestamp
+    columns are parsed from CSV files, and typed in the other formats."""
+    match get_table_format(path):
+        case TableFormat.CSV:
+            return pd.read_csv(path, parse_dates=list(timestamp_columns))
+        case TableFormat.PARQUET:
+            return pq.read_table(path).to_pandas()
+        case TableFormat.ARROW:
+            with pa.memory_map(str(path)) as source:
+                return pa.ipc.open_file(source).read_all().to_pandas()
@@ -8,6 +8,7 @@ from pathlib import Path
 
 import pandas as pd
 
+import afft.io as io
 from afft.utils.log import logger
 
 from .types import TrackLinkFixEntry, TrackLinkRawEntry
@@ -45,14 +46,13 @@ def parse_fix_entries(path: Path) -> pd.DataFrame:
     """
     entries: list[TrackLinkFixEntry] = []
 
-    with open(path) as file:
-        for line in file:
-            if not line.startswith("USBL_FIX:"):
-                continue
-            entry: TrackLinkFixEntry | None = _parse_fix_line(line)
-            if entry is None:
-                continue
-            entries.append(entry)
+    for line in io.iter_topic_lines(path, {"USBL_FIX"}):
+        if not line.startswith("USBL_FIX:"):
+            continue
+        entry: TrackLinkFixEntry | None = _parse_fix_line(line)
+        if entry is None:
+            continue
+        entries.append(entry)
 
     dataframe: pd.DataFrame = pd.DataFrame(
         [dataclasses.asdict(entry) for entry in entries]
@@ -76,14 +76,13 @@ def parse_raw_entries(path: Path) -> pd.DataFrame:
     """
     entries: list[TrackLinkRawEntry] = []
 
-    with open(path) as file:
-        for line in file:
-            if not line.startswith("USBL_RAW:"):
-                continue
-            entry: TrackLinkRawEntry | None = _parse_raw_line(line)
-            if entry is None:
-                continue
-            entries.append(entry)
+    for line in io.iter_topic_lines(path, {"USBL_RAW"}):
+        if not line.startswith("USBL_RAW:"):
+            continue
+        entry: TrackLinkRawEntry | None = _parse_raw_line(line)
+        if entry is None:
+            continue
+        entries.append(entry)
 
     return pd.DataFrame([dataclasses.asdict(entry) for entry in entries])
 
@@ -105,26 +104,23 @@ def parse_novatel_entries(path: Path) -> pd.DataFrame:
     """
     records: list[dict[str, object]] = []
 
-    with open(path) as file:
-        for line in file:
-            if not line.startswith("NOVATEL:"):
-                continue
-            parsed: tuple[float, float, float] | None = _parse_novatel_line(
-                line
-            )
-            if parsed is None:
-                continue
-            unix_ts: float
-            ship_lat: float
-            ship_lon: float
-            unix_ts, ship_lat, ship_lon = parsed
-            records.append(
-                {
-                    "unix_timestamp": unix_ts,
-                    "ship_latitude": ship_lat,
-                    "ship_longitude": ship_lon,
-                }
-            )
+    for line in io.iter_topic_lines(path, {"NOVATEL"}):
+        if not line.startswith("NOVATEL:"):
+            continue
+        parsed: tuple[float, float, float] | None = _parse_novatel_line(line)
+        if parsed is None:
+            continue
+        unix_ts: float
+        ship_lat: float
+        ship_lon: float
+        unix_ts, ship_lat, ship_lon = parsed
+        records.append(
+            {
+                "unix_timestamp": unix_ts,
+                "ship_latitude": ship_lat,
+                "ship_longitude": ship_lon,
+            }
+        )
 
     return pd.DataFrame(records)
 
@@ -1,9 +1,54 @@
 """Package for message processing functionality for AUV Sirius."""
 
 from .concrete_messages import get_message_type as get_message_type
+from .concrete_messages import SonarTrace as SonarTrace
+from .concrete_messages import UnixTimestamp as UnixTimestamp
+from .message_columns import (
+    accumulate_message_columns as accumulate_message_columns,
+)
+from .message_columns import build_message_dataframe as build_message_dataframe
+from .message_columns import get_trace_matrix as get_trace_matrix
+from .message_columns import parse_message_columns as parse_message_columns
+from .message_columns import (
+    parse_message_file_columns as parse_message_file_columns,
+)
+from .message_decimation import DecimationRule as DecimationRule
+from .message_decimation import MessageDecimator as MessageDecimator
+from .message_decimation import (
+    build_decimation_rules as build_decimation_rules,
+)
+from .message_frames import parse_message_frames as parse_message_frames
+from .message_index import MessageIndex as MessageIndex
+from .message_index import build_message_index as build_message_index
+from .message_index import iter_indexed_lines as iter_indexed_lines
+from .message_index import load_message_index as load_message_index
+from .message_index import read_message_index as read_message_index
+from .message_index import write_message_index as write_message_index
 from .message_interfaces import Message as Message
+from .message_merge import get_line_timestamp as get_line_timestamp
+from .message_merge import iter_merged_topic_lines as iter_merged_topic_lines
+from .message_merge import merge_message_lines as merge_message_lines
 from .message_interfaces import MessageParser as MessageParser
+from .message_parsers import PARSER_VERSION as PARSER_VERSION
 from .message_parsers import get_message_parser as get_message_parser
+from .message_protocol import MessageProtocol as MessageProtocol
+from .message_protocol import ParseStatistics as ParseStatistics
+from .message_protocol import batch_messages as batch_messages
+from .message_protocol import build_message_protocol as build_message_protocol
+from .message_protocol import (
+    create_parse_statistics as create_parse_statistics,
+)
+from .message_protocol import group_messages as group_messages
+from .message_protocol import iter_message_batches as iter_message_batches
+from .message_protocol import iter_message_lines as iter_message_lines
+from .message_protocol import iter_messages as iter_messages
+from .message_protocol import parse_message_file as parse_message_file
 from .message_protocol import parse_message_lines as parse_message_lines
+from .message_protocol import (
+    subscribe_parse_statistics as subscribe_parse_statistics,
+)
+from .message_protocol import (
+    unsubscribe_parse_statistics as unsubscribe_parse_statistics,
+)
 
 __all__ = []
@@ -1,38 +1,108 @@
-"""Module for message classes."""
+"""Module for message classes. Message, header and body classes are slotted
+dataclasses, so that instances do not carry a dict of attributes."""
 
+import functools
+
+from collections.abc import Callable
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, Optional, Self
+from operator import attrgetter
+from typing import Any, NewType, Optional, Self
+
+import numpy as np
+
+from numpy.typing import NDArray
+
+
+# Unix epoch seconds. Messages carry timestamps as floats, and timestamp
+# columns are converted to datetimes when tables are built.
+UnixTimestamp = NewType("UnixTimestamp", float)
+
+# Sonar return intensities of the bins of a trace, as a byte per bin. Traces
+# are stored as arrays rather than a field per bin, so that their memory is
+# proportional to the raw bytes and they can be processed as a whole.
+SonarTrace = NewType("SonarTrace", NDArray[np.uint8])
+
+
+type FieldGetter = Callable[[Any], tuple[Any, ...]]
+
+
+@functools.cache
+def _get_field_getter(data_type: type[Any]) -> FieldGetter:
+    """Returns a getter of the field values of a slotted dataclass."""
+    names: tuple[str, ...] = data_type.__slots__
+    if len(names) == 1:
+        getter: attrgetter[Any] = attrgetter(names[0])
+        return lambda instance: (getter(instance),)
+    return attrgetter(*names)
+
 
+def get_field_values(instance: Any) -> tuple[Any, ...]:
+    """Returns the field values of a slotted dataclass in field order."""
+    # Classes of untyped instances are passed to the cached functions, since
+    # type checkers do not match class objects to hashable cache arguments
+    return _get_field_getter(instance.__class__)(instance)
 
-@dataclass
+
+def _equal_traces(values: tuple[Any, ...], others: tuple[Any, ...]) -> bool:
+    """Returns true if field values are equal, comparing arrays by value."""
+    return len(values) == len(others) and all(
+        np.array_equal(value, other)
+        if isinstance(value, np.ndarray)
+        else value == other
+        for value, other in zip(values, others)
+    )
+
+
+@functools.cache
+def get_message_fields(message_type: type[Any]) -> tuple[str, ...]:
+    """Returns the names of the header and body fields of a message type, in
+    the order of the values of the message tuples."""
+    header_names: tuple[str, ...] = message_type.header_type.__slots__
+    body_names: tuple[str, ...] = message_type.body_type.__slots__
+    return header_names + body_names
+
+
+def get_field_dict(message: Any) -> dict[str, Any]:
+    """Returns the header and body fields of a message as a dict."""
+    return dict(zip(get_message_fields(message.__class__), message.to_tuple()))
+
+
+@dataclass(slots=True)
 class MessageHeader:
     """Class representing an AUV message header."""
 
     topic: str
-    timestamp: datetime
+    timestamp: UnixTimestamp
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        return self.__dict__
+        return dict(zip(self.__slots__, self.to_tuple()))
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the field values of the object in field order."""
+        return get_field_values(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class ImageCaptureData:
     """Class representing image capture data."""
 
     label: str
     filename: str
-    trigger_time: datetime
+    trigger_time: UnixTimestamp
     exposure_logged: bool
     exposure: int = 0
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        return self.__dict__
+        return dict(zip(self.__slots__, self.to_tuple()))
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the field values of the object in field order."""
+        return get_field_values(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class SeabirdCTDData:
     """Class representing data from a Seabird CTD."""
 
@@ -44,10 +114,14 @@ class SeabirdCTDData:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        return self.__dict__
+        return dict(zip(self.__slots__, self.to_tuple()))
 
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the field values of the object in field order."""
+        return get_field_values(self)
 
-@dataclass
+
+@dataclass(slots=True)
 class AanderaaCTDData:
     """Class representing data from an Aanderaa CTD."""
 
@@ -59,10 +133,14 @@ class AanderaaCTDData:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        return self.__dict__
+        return dict(zip(self.__slots__, self.to_tuple()))
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the field values of the object in field order."""
+        return get_field_values(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class EcopuckData:
     """Class representing data from an Ecopuck sensor."""
 
@@ -73,7 +151,11 @@ class EcopuckData:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        return self.__dict__
+        return dict(zip(self.__slots__, self.to_tuple()))
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the field values of the object in field order."""
+        return get_field_values(self)
 
 
 """
@@ -83,15 +165,15 @@ Navigation system data types:
 - TrackLinkModemData
 - EvologicsModemData
 - MicronSonarData
+- MicronTraceData
+- MicronSectorData
 - OASonarData
 - GpsGsvData
 - GpsRmcData
-
-- TODO: MICRON_TRACE, MICRON_SECTOR
 """
 
 
-@dataclass
+@dataclass(slots=True)
 class ParosciPressureData:
     """Class representing Parosci pressure data."""
 
@@ -99,10 +181,14 @@ class ParosciPressureData:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        return self.__dict__
+        return dict(zip(self.__slots__, self.to_tuple()))
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the field values of the object in field order."""
+        return get_field_values(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class TeledyneDVLData:
     """Class representing Teledyne DVL data. Check documentation at:
     https://www.comm-tec.com/Docs/Manuali/RDI/WH_CG_Mar14.pdf"""
@@ -137,10 +223,14 @@ class TeledyneDVLData:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        return self.__dict__
+        return dict(zip(self.__slots__, self.to_tuple()))
 
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the field values of the object in field order."""
+        return get_field_values(self)
 
-@dataclass
+
+@dataclass(slots=True)
 class TrackLinkModemData:
     """Class representing TrackLink modem data."""
 
@@ -157,10 +247,14 @@ class TrackLinkModemData:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        return self.__dict__
+        return dict(zip(self.__slots__, self.to_tuple()))
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the field values of the object in field order."""
+        return get_field_values(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class EvologicsModemData:
     """Class representing Evologics modem data."""
 
@@ -182,23 +276,14 @@ class EvologicsModemData:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        return {
-            "target_latitude": self.target_latitude,
-            "target_longitude": self.target_longitude,
-            "target_depth": self.target_depth,
-            "target_x": self.target_x,
-            "target_y": self.target_y,
-            "target_z": self.target_z,
-            "accuracy": self.accuracy,
-            "ship_latitude": self.ship_latitude,
-            "ship_longitude": self.ship_longitude,
-            "ship_roll": self.ship_roll,
-            "ship_pitch": self.ship_pitch,
-            "ship_heading": self.ship_heading,
-        }
+        return dict(zip(self.__slots__, self.to_tuple()))
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the field values of the object in field order."""
+        return get_field_values(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class MicronSonarData:
     """Class representing Micron sonar data."""
 
@@ -209,15 +294,66 @@ class MicronSonarData:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        return {
-            "profile_range": self.profile_range,
-            "profile_altitude": self.profile_altitude,
-            "pseudo_forward_distance": self.pseudo_forward_distance,
-            "angle": self.angle,
-        }
+        return dict(zip(self.__slots__, self.to_tuple()))
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the field values of the object in field order."""
+        return get_field_values(self)
+
+
+@dataclass(slots=True, eq=False)
+class MicronTraceData:
+    """Class representing a Micron sonar trace, i.e. the return intensities
+    of the range bins at a head angle."""
+
+    angle: float
+    range_scale: float
+    gain: float
+    intensities: SonarTrace
 
+    def __eq__(self: Self, other: object) -> bool:
+        if not isinstance(other, MicronTraceData):
+            return NotImplemented
+        return _equal_traces(self.to_tuple(), other.to_tuple())
 
-@dataclass
+    def to_dict(self: Self) -> dict[str, Any]:
+        """Returns a dict representation of the object."""
+        return dict(zip(self.__slots__, self.to_tuple()))
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the field values of the object in field order."""
+        return get_field_values(self)
+
+
+@dataclass(slots=True, eq=False)
+class MicronSectorData:
+    """Class representing a Micron sonar sector scan, i.e. the intensities of
+    the traces between a start and end angle in scan order. Every trace has
+    the same number of bins, so the intensities can be reshaped to a trace
+    per row."""
+
+    start_angle: float
+    end_angle: float
+    range_scale: float
+    gain: float
+    trace_count: int
+    intensities: SonarTrace
+
+    def __eq__(self: Self, other: object) -> bool:
+        if not isinstance(other, MicronSectorData):
+            return NotImplemented
+        return _equal_traces(self.to_tuple(), other.to_tuple())
+
+    def to_dict(self: Self) -> dict[str, Any]:
+        """Returns a dict representation of the object."""
+        return dict(zip(self.__slots__, self.to_tuple()))
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the field values of the object in field order."""
+        return get_field_values(self)
+
+
+@dataclass(slots=True)
 class OASonarData:
     """Class representing obstacle avoidance sonar data."""
 
@@ -227,14 +363,14 @@ class OASonarData:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        return {
-            "profile_range": self.profile_range,
-            "profile_altitude": self.profile_altitude,
-            "pseudo_forward_distance": self.pseudo_forward_distance,
-        }
+        return dict(zip(self.__slots__, self.to_tuple()))
 
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the field values of the object in field order."""
+        return get_field_values(self)
 
-@dataclass
+
+@dataclass(slots=True)
 class GpsGsvData:
     """Class representing GPS satellites-in-view data (GPGSV)."""
 
@@ -242,10 +378,14 @@ class GpsGsvData:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        return self.__dict__
+        return dict(zip(self.__slots__, self.to_tuple()))
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the field values of the object in field order."""
+        return get_field_values(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class GpsRmcData:
     """Class representing GPS recommended minimum navigation data (GPRMC)."""
 
@@ -259,10 +399,14 @@ class GpsRmcData:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        return self.__dict__
+        return dict(zip(self.__slots__, self.to_tuple()))
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the field values of the object in field order."""
+        return get_field_values(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class BatteryData:
     """Class representing battery data."""
 
@@ -276,18 +420,14 @@ class BatteryData:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        return {
-            "label": self.label,
-            "time_left": self.time_left,
-            "current": self.current,
-            "voltage": self.voltage,
-            "power": self.power,
-            "charge_percent": self.charge_percent,
-            "charging": self.charging,
-        }
+        return dict(zip(self.__slots__, self.to_tuple()))
 
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the field values of the object in field order."""
+        return get_field_values(self)
 
-@dataclass
+
+@dataclass(slots=True)
 class ThrusterData:
     """Class representing thruster data."""
 
@@ -299,13 +439,11 @@ class ThrusterData:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        return {
-            "label": self.label,
-            "rpm": self.rpm,
-            "current": self.current,
-            "voltage": self.voltage,
-            "temperature": self.temperature,
-        }
+        return dict(zip(self.__slots__, self.to_tuple()))
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the field values of the object in field order."""
+        return get_field_values(self)
 
 
 """
@@ -319,6 +457,8 @@ AUV message types:
  - TrackLinkModemMessage
  - EvologicsModemMessage
  - MicronSonarMessage
+ - MicronTraceMessage
+ - MicronSectorMessage
  - OASonarMessage
  - GpsGsvMessage
  - GpsRmcMessage
@@ -327,7 +467,7 @@ AUV message types:
 """
 
 
-@dataclass
+@dataclass(slots=True)
 class ImageCaptureMessage:
     """Class representing an image capture message."""
 
@@ -339,12 +479,14 @@ class ImageCaptureMessage:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        data = self.header.to_dict()
-        data.update(self.body.to_dict())
-        return data
+        return get_field_dict(self)
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the header and body values of the object in field order."""
+        return self.header.to_tuple() + self.body.to_tuple()
 
 
-@dataclass
+@dataclass(slots=True)
 class SeabirdCTDMessage:
     """Class representing a Seabird CTD message."""
 
@@ -356,12 +498,14 @@ class SeabirdCTDMessage:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        data = self.header.to_dict()
-        data.update(self.body.to_dict())
-        return data
+        return get_field_dict(self)
 
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the header and body values of the object in field order."""
+        return self.header.to_tuple() + self.body.to_tuple()
 
-@dataclass
+
+@dataclass(slots=True)
 class AanderaaCTDMessage:
     """Class representing an Aanderaa CTD message."""
 
@@ -373,12 +517,14 @@ class AanderaaCTDMessage:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        data = self.header.to_dict()
-        data.update(self.body.to_dict())
-        return data
+        return get_field_dict(self)
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the header and body values of the object in field order."""
+        return self.header.to_tuple() + self.body.to_tuple()
 
 
-@dataclass
+@dataclass(slots=True)
 class EcopuckMessage:
     """Class representing an Ecopuck message."""
 
@@ -390,12 +536,14 @@ class EcopuckMessage:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        data = self.header.to_dict()
-        data.update(self.body.to_dict())
-        return data
+        return get_field_dict(self)
 
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the header and body values of the object in field order."""
+        return self.header.to_tuple() + self.body.to_tuple()
 
-@dataclass
+
+@dataclass(slots=True)
 class ParosciPressureMessage:
     """Class representing a Paroscientific pressure message."""
 
@@ -407,12 +555,14 @@ class ParosciPressureMessage:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        data = self.header.to_dict()
-        data.update(self.body.to_dict())
-        return data
+        return get_field_dict(self)
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the header and body values of the object in field order."""
+        return self.header.to_tuple() + self.body.to_tuple()
 
 
-@dataclass
+@dataclass(slots=True)
 class TeledyneDVLMessage:
     """Class representing a Teledyne DVL message."""
 
@@ -424,12 +574,14 @@ class TeledyneDVLMessage:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        data = self.header.to_dict()
-        data.update(self.body.to_dict())
-        return data
+        return get_field_dict(self)
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the header and body values of the object in field order."""
+        return self.header.to_tuple() + self.body.to_tuple()
 
 
-@dataclass
+@dataclass(slots=True)
 class TrackLinkModemMessage:
     """Class representing a TrackLink modem message."""
 
@@ -441,12 +593,14 @@ class TrackLinkModemMessage:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        data = self.header.to_dict()
-        data.update(self.body.to_dict())
-        return data
+        return get_field_dict(self)
 
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the header and body values of the object in field order."""
+        return self.header.to_tuple() + self.body.to_tuple()
 
-@dataclass
+
+@dataclass(slots=True)
 class EvologicsModemMessage:
     """Class representing an Evologics modem message."""
 
@@ -458,12 +612,14 @@ class EvologicsModemMessage:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        data = self.header.to_dict()
-        data.update(self.body.to_dict())
-        return data
+        return get_field_dict(self)
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the header and body values of the object in field order."""
+        return self.header.to_tuple() + self.body.to_tuple()
 
 
-@dataclass
+@dataclass(slots=True)
 class MicronSonarMessage:
     """Class representing a Micron sonar message."""
 
@@ -475,12 +631,52 @@ class MicronSonarMessage:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        data = self.header.to_dict()
-        data.update(self.body.to_dict())
-        return data
+        return get_field_dict(self)
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the header and body values of the object in field order."""
+        return self.header.to_tuple() + self.body.to_tuple()
+
+
+@dataclass(slots=True)
+class MicronTraceMessage:
+    """Class representing a Micron sonar trace message."""
+
+    header_type = MessageHeader
+    body_type = MicronTraceData
+
+    header: MessageHeader
+    body: MicronTraceData
+
+    def to_dict(self: Self) -> dict[str, Any]:
+        """Returns a dict representation of the object."""
+        return get_field_dict(self)
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the header and body values of the object in field order."""
+        return self.header.to_tuple() + self.body.to_tuple()
 
 
-@dataclass
+@dataclass(slots=True)
+class MicronSectorMessage:
+    """Class representing a Micron sonar sector message."""
+
+    header_type = MessageHeader
+    body_type = MicronSectorData
+
+    header: MessageHeader
+    body: MicronSectorData
+
+    def to_dict(self: Self) -> dict[str, Any]:
+        """Returns a dict representation of the object."""
+        return get_field_dict(self)
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the header and body values of the object in field order."""
+        return self.header.to_tuple() + self.body.to_tuple()
+
+
+@dataclass(slots=True)
 class OASonarMessage:
     """Class representing an OA sonar message."""
 
@@ -492,12 +688,14 @@ class OASonarMessage:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        data = self.header.to_dict()
-        data.update(self.body.to_dict())
-        return data
+        return get_field_dict(self)
 
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the header and body values of the object in field order."""
+        return self.header.to_tuple() + self.body.to_tuple()
 
-@dataclass
+
+@dataclass(slots=True)
 class GpsGsvMessage:
     """Class representing a GPS satellites-in-view message."""
 
@@ -509,12 +707,14 @@ class GpsGsvMessage:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        data = self.header.to_dict()
-        data.update(self.body.to_dict())
-        return data
+        return get_field_dict(self)
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the header and body values of the object in field order."""
+        return self.header.to_tuple() + self.body.to_tuple()
 
 
-@dataclass
+@dataclass(slots=True)
 class GpsRmcMessage:
     """Class representing a GPS recommended minimum navigation message."""
 
@@ -526,12 +726,14 @@ class GpsRmcMessage:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        data = self.header.to_dict()
-        data.update(self.body.to_dict())
-        return data
+        return get_field_dict(self)
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the header and body values of the object in field order."""
+        return self.header.to_tuple() + self.body.to_tuple()
 
 
-@dataclass
+@dataclass(slots=True)
 class BatteryMessage:
     """Class representing a battery message."""
 
@@ -543,12 +745,14 @@ class BatteryMessage:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        data = self.header.to_dict()
-        data.update(self.body.to_dict())
-        return data
+        return get_field_dict(self)
 
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the header and body values of the object in field order."""
+        return self.header.to_tuple() + self.body.to_tuple()
 
-@dataclass
+
+@dataclass(slots=True)
 class ThrusterMessage:
     """Class representing a thruster message."""
 
@@ -560,9 +764,11 @@ class ThrusterMessage:
 
     def to_dict(self: Self) -> dict[str, Any]:
         """Returns a dict representation of the object."""
-        data = self.header.to_dict()
-        data.update(self.body.to_dict())
-        return data
+        return get_field_dict(self)
+
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns the header and body values of the object in field order."""
+        return self.header.to_tuple() + self.body.to_tuple()
 
 
 MESSAGE_TYPES: list[type] = [
@@ -575,6 +781,8 @@ MESSAGE_TYPES: list[type] = [
     TrackLinkModemMessage,
     EvologicsModemMessage,
     MicronSonarMessage,
+    MicronTraceMessage,
+    MicronSectorMessage,
     OASonarMessage,
     GpsGsvMessage,
     GpsRmcMessage,
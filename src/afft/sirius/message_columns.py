@@ -0,0 +1,463 @@
+"""Module for columnar accumulation and conversion of parsed messages."""
+
+import dataclasses
+import time
+
+from array import array
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import Any, Optional, Self
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from numpy.typing import NDArray
+
+import afft.io as io
+
+from .concrete_messages import SonarTrace, UnixTimestamp, get_message_fields
+from .message_interfaces import Message
+from .message_parsers import FieldConverter, FieldValidator, MessageFormat
+from .message_protocol import (
+    CHUNKS_PER_WORKER,
+    MessageProtocol,
+    ParseStatistics,
+    build_message_protocol,
+    create_parse_statistics,
+    map_message_chunks,
+    split_line_chunks,
+)
+
+
+# Typed buffers for the field annotations of the message dataclasses
+ARRAY_TYPECODES: dict[Any, str] = {
+    float: "d",
+    int: "q",
+    bool: "b",
+    UnixTimestamp: "d",
+}
+
+
+def epoch_to_microseconds(
+    seconds: NDArray[np.float64],
+) -> NDArray[np.int64]:
+    """Converts Unix epoch seconds to integer epoch microseconds, rounding
+    exactly like datetime.fromtimestamp."""
+
+    whole: NDArray[np.float64] = np.trunc(seconds)
+    micros: NDArray[np.float64] = np.rint((seconds - whole) * 1e6)
+
+    # Carry microseconds that round up to, or below, a whole second
+    whole = whole + (micros >= 1e6) - (micros < 0)
+    micros = micros - 1e6 * (micros >= 1e6) + 1e6 * (micros < 0)
+
+    values: NDArray[np.int64] = whole.astype(
+        np.int64
+    ) * 1_000_000 + micros.astype(np.int64)
+    return values
+
+
+def epoch_to_timestamp_array(seconds: NDArray[np.float64]) -> pa.Array:
+    """Converts Unix epoch seconds to an Arrow array of UTC timestamps with
+    microsecond resolution."""
+    return pa.array(
+        epoch_to_microseconds(seconds), type=pa.timestamp("us", tz="UTC")
+    )
+
+
+def epoch_to_datetime_index(
+    seconds: NDArray[np.float64],
+) -> pd.DatetimeIndex:
+    """Converts Unix epoch seconds to a datetime64[ns, UTC] index with the
+    same microsecond rounding as epoch_to_timestamp_array."""
+    return pd.to_datetime(epoch_to_microseconds(seconds), unit="us", utc=True)
+
+
+def get_timestamp_fields(message_type: Any) -> list[str]:
+    """Returns the names of the Unix timestamp fields of a message type."""
+    return [
+        field.name
+        for message_part in (message_type.header_type, message_type.body_type)
+        for field in dataclasses.fields(message_part)
+        if field.type is UnixTimestamp
+    ]
+
+
+def build_message_dataframe(
+    messages: Sequence[Message[Any, Any]],
+) -> pd.DataFrame:
+    """Builds a dataframe from messages, and converts the Unix timestamp
+    columns to datetime64[ns, UTC] in one step per column. Messages of a
+    single type are built from tuples, without a dict per message."""
+
+    message_types: dict[type, None] = dict.fromkeys(
+        type(message) for message in messages
+    )
+
+    if len(message_types) == 1:
+        dataframe: pd.DataFrame = pd.DataFrame.from_records(
+            [message.to_tuple() for message in messages],
+            columns=get_message_fields(next(iter(message_types))),
+        )
+    else:
+        dataframe = pd.DataFrame([message.to_dict() for message in messages])
+
+    timestamp_fields: dict[str, None] = dict.fromkeys(
+        field
+        for message_type in message_types
+        for field in get_timestamp_fields(message_type)
+    )
+
+    for field in timestamp_fields:
+        dataframe[field] = epoch_to_datetime_index(
+            dataframe[field].to_numpy(dtype=np.float64)
+        )
+
+    return dataframe
+
+
+class TraceColumn:
+    """Class representing a column of sonar traces, buffered as the bytes of
+    all traces and the offset of every trace in them."""
+
+    def __init__(self: Self) -> None:
+        self.values: bytearray = bytearray()
+        self.offsets: array[int] = array("i", [0])
+
+    def __len__(self: Self) -> int:
+        return len(self.offsets) - 1
+
+    def append(self: Self, trace: SonarTrace) -> None:
+        """Appends the bytes of a trace to the column."""
+        self.values += trace.tobytes()
+        self.offsets.append(len(self.values))
+
+    def to_arrow(self: Self) -> pa.Array:
+        """Returns the traces as an Arrow list array of bytes, without a
+        Python object per trace."""
+        return pa.ListArray.from_arrays(
+            pa.array(np.frombuffer(self.offsets, dtype=np.int32)),
+            pa.array(np.frombuffer(bytes(self.values), dtype=np.uint8)),
+        )
+
+
+def get_trace_matrix(
+    traces: pa.Array | pa.ChunkedArray,
+) -> NDArray[np.uint8]:
+    """Returns a column of sonar traces with the same number of bins as a
+    matrix with a trace per row, so that the traces can be processed with
+    vectorized operations."""
+    if isinstance(traces, pa.ChunkedArray):
+        traces = traces.combine_chunks()
+    if not len(traces):
+        return np.empty((0, 0), dtype=np.uint8)
+
+    lengths: NDArray[np.int32] = np.diff(traces.offsets.to_numpy())
+    if np.any(lengths != lengths[0]):
+        raise ValueError("sonar traces have different numbers of bins")
+
+    values: NDArray[np.uint8] = traces.flatten().to_numpy(zero_copy_only=False)
+    return values.reshape(len(traces), int(lengths[0]))
+
+
+def _buffer_to_arrow(field_type: Any, column: array[Any]) -> pa.Array:
+    """Returns a column of fixed-width values as an Arrow array without
+    copying the buffer into Python objects."""
+    if field_type is UnixTimestamp:
+        return epoch_to_timestamp_array(np.frombuffer(column))
+    if field_type is bool:
+        return pa.array(np.frombuffer(column, dtype=np.int8).astype(bool))
+    return pa.array(np.frombuffer(column, dtype=column.typecode))
+
+
+class ColumnBuffer:
+    """Class representing typed column buffers for the messages of a single
+    topic, filled directly from pattern matches."""
+
+    def __init__(self: Self, message_format: MessageFormat) -> None:
+        self.message_format: MessageFormat = message_format
+        self.types: tuple[Any, ...] = message_format.types
+        self.converters: tuple[FieldConverter, ...] = message_format.converters
+        self.validator: Optional[FieldValidator] = message_format.validator
+        self.columns: list[array[Any] | TraceColumn | list[Any]] = [
+            array(ARRAY_TYPECODES[field_type])
+            if field_type in ARRAY_TYPECODES
+            else TraceColumn()
+            if field_type is SonarTrace
+            else list()
+            for field_type in self.types
+        ]
+        self.appenders: list[Callable[[Any], None]] = [
+            column.append for column in self.columns
+        ]
+
+    def __len__(self: Self) -> int:
+        return len(self.columns[0])
+
+    def append(self: Self, values: Iterable[Any]) -> None:
+        """Appends the raw group values of a match to the columns. Values are
+        converted before any column is touched, so a failed conversion
+        leaves the columns aligned."""
+        converted: list[Any] = [
+            converter(value)
+            for converter, value in zip(self.converters, values)
+        ]
+        if self.validator is not None:
+            self.validator(converted)
+        for appender, value in zip(self.appenders, converted):
+            appender(value)
+
+    def to_arrow(self: Self) -> pa.Table:
+        """Returns the columns as an Arrow table."""
+        arrays: list[pa.Array] = list()
+        for field_type, column in zip(self.types, self.columns):
+            if isinstance(column, array):
+                arrays.append(_buffer_to_arrow(field_type, column))
+            elif isinstance(column, TraceColumn):
+                arrays.append(column.to_arrow())
+            else:
+                arrays.append(pa.array(column, type=pa.string()))
+        return pa.Table.from_arrays(
+            arrays, names=list(self.message_format.fields)
+        )
+
+
+def accumulate_message_columns(
+    lines: Iterable[str],
+    protocol: MessageProtocol,
+    statistics: Optional[ParseStatistics] = None,
+) -> dict[str, ColumnBuffer]:
+    """Parses lines as message types in the protocol into per-topic column
+    buffers, without creating message objects."""
+
+    if statistics is None:
+        statistics = ParseStatistics()
+
+    if statistics.measured:
+        return _accumulate_measured_columns(lines, protocol, statistics)
+
+    buffers: dict[str, ColumnBuffer] = dict()
+
+    for line in lines:
+        topic, item, values = protocol.match_values(line)
+
+        if item is None:
+            statistics.skipped[topic] += 1
+            continue
+
+        if values is None:
+            statistics.failed[topic] += 1
+            continue
+
+        buffer: ColumnBuffer | None = buffers.get(topic)
+        if buffer is None:
+            buffer = buffers[topic] = ColumnBuffer(item.message_format)
+
+        try:
+            buffer.append(values)
+        except (ValueError, OverflowError):
+            statistics.failed[topic] += 1
+            # Keep topics in order of their first parsed message
+            if not len(buffer):
+                del buffers[topic]
+
+    return buffers
+
+
+def _accumulate_measured_columns(
+    lines: Iterable[str],
+    protocol: MessageProtocol,
+    statistics: ParseStatistics,
+) -> dict[str, ColumnBuffer]:
+    """Parses lines into column buffers like accumulate_message_columns, and
+    measures the parsed lines, bytes and parse time of every topic in the
+    protocol."""
+
+    buffers: dict[str, ColumnBuffer] = dict()
+    clock: Callable[[], float] = time.perf_counter
+
+    for line in lines:
+        start: float = clock()
+        topic, item, values = protocol.match_values(line)
+
+        if item is None:
+            statistics.skipped[topic] += 1
+            continue
+
+        parsed: bool = False
+        if values is not None:
+            buffer: ColumnBuffer | None = buffers.get(topic)
+            if buffer is None:
+                buffer = buffers[topic] = ColumnBuffer(item.message_format)
+
+            try:
+                buffer.append(values)
+                parsed = True
+            except (ValueError, OverflowError):
+                # Keep topics in order of their first parsed message
+                if not len(buffer):
+                    del buffers[topic]
+
+        statistics.seconds[topic] += clock() - start
+        statistics.line_bytes[topic] += len(line) + 1
+
+        if parsed:
+            statistics.parsed[topic] += 1
+        else:
+            statistics.failed[topic] += 1
+
+    return buffers
+
+
+def merge_message_columns(
+    chunk_tables: Iterable[dict[str, pa.Table]],
+) -> dict[str, pa.Table]:
+    """Merges the tables of consecutive chunks, so that topics and rows are in
+    the same order as if the chunks were parsed as one."""
+
+    topic_tables: dict[str, list[pa.Table]] = dict()
+
+    for tables in chunk_tables:
+        for topic, table in tables.items():
+            if topic not in topic_tables:
+                topic_tables[topic] = list()
+            topic_tables[topic].append(table)
+
+    return {
+        topic: pa.concat_tables(tables)
+        for topic, tables in topic_tables.items()
+    }
+
+
+def _column_line_chunk(
+    lines: list[str], topic_types: dict[str, str], measured: bool
+) -> tuple[dict[str, pa.Table], ParseStatistics]:
+    """Parses a chunk of lines into tables in a worker process."""
+    statistics: ParseStatistics = ParseStatistics(measured=measured)
+    protocol: MessageProtocol = build_message_protocol(topic_types)
+    buffers: dict[str, ColumnBuffer] = accumulate_message_columns(
+        lines, protocol, statistics
+    )
+    return {
+        topic: buffer.to_arrow() for topic, buffer in buffers.items()
+    }, statistics
+
+
+def _column_file_range(
+    byte_range: tuple[Path, int, int],
+    topic_types: dict[str, str],
+    measured: bool,
+) -> tuple[dict[str, pa.Table], ParseStatistics]:
+    """Parses a byte range of a file into tables in a worker process."""
+    path, start, end = byte_range
+    statistics: ParseStatistics = ParseStatistics(measured=measured)
+    protocol: MessageProtocol = build_message_protocol(topic_types)
+    lines: Iterator[str] = io.iter_topic_lines(
+        path, protocol.topics, statistics.skipped, start, end
+    )
+    buffers: dict[str, ColumnBuffer] = accumulate_message_columns(
+        lines, protocol, statistics
+    )
+    return {
+        topic: buffer.to_arrow() for topic, buffer in buffers.items()
+    }, statistics
+
+
+def parse_message_columns(
+    lines: Iterable[str],
+    topic_types: dict[str, str],
+    workers: int = 1,
+    statistics: Optional[ParseStatistics] = None,
+) -> dict[str, pa.Table]:
+    """Parses lines as message types in the given protocol, and returns an
+    Arrow table per topic with the same columns as the message dicts. If more
+    than one worker is given, contiguous chunks of lines are parsed in a
+    process pool and merged in line order. If statistics are given, the lines
+    are counted in them and the caller reports them, otherwise the statistics
+    of the parse are logged and published."""
+
+    reported: bool = statistics is None
+    if statistics is None:
+        statistics = create_parse_statistics()
+
+    if workers > 1:
+        chunks: list[list[str]] = split_line_chunks(
+            list(lines), workers * CHUNKS_PER_WORKER
+        )
+        results, chunk_statistics = map_message_chunks(
+            _column_line_chunk,
+            chunks,
+            topic_types,
+            workers,
+            statistics.measured,
+        )
+        statistics.update(chunk_statistics)
+        tables: dict[str, pa.Table] = merge_message_columns(results)
+    else:
+        protocol: MessageProtocol = build_message_protocol(topic_types)
+        buffers: dict[str, ColumnBuffer] = accumulate_message_columns(
+            lines, protocol, statistics
+        )
+        tables = {topic: buffer.to_arrow() for topic, buffer in buffers.items()}
+
+    if reported:
+        statistics.log()
+        statistics.publish()
+
+    return tables
+
+
+def parse_message_file_columns(
+    path: Path,
+    topic_types: dict[str, str],
+    workers: int = 1,
+    statistics: Optional[ParseStatistics] = None,
+) -> dict[str, pa.Table]:
+    """Parses the lines of a message file into an Arrow table per topic. If
+    more than one worker is given, the file is split into newline-aligned
+    byte ranges that are read and parsed in a process pool. Lines of topics
+    that are not in the protocol are skipped before they are decoded.
+    Compressed files cannot be split, so their lines are read before they
+    are parsed. The statistics are reported as by parse_message_columns."""
+
+    if workers > 1 and io.is_compressed(path):
+        return parse_message_columns(
+            io.read_lines(path), topic_types, workers, statistics
+        )
+
+    reported: bool = statistics is None
+    if statistics is None:
+        statistics = create_parse_statistics()
+
+    if workers > 1:
+        byte_ranges: list[tuple[Path, int, int]] = [
+            (path, start, end)
+            for start, end in io.split_line_ranges(
+                path, workers * CHUNKS_PER_WORKER
+            )
+        ]
+        results, chunk_statistics = map_message_chunks(
+            _column_file_range,
+            byte_ranges,
+            topic_types,
+            workers,
+            statistics.measured,
+        )
+        statistics.update(chunk_statistics)
+        tables: dict[str, pa.Table] = merge_message_columns(results)
+    else:
+        protocol: MessageProtocol = build_message_protocol(topic_types)
+        lines: Iterator[str] = io.iter_topic_lines(
+            path, protocol.topics, statistics.skipped
+        )
+        buffers: dict[str, ColumnBuffer] = accumulate_message_columns(
+            lines, protocol, statistics
+        )
+        tables = {topic: buffer.to_arrow() for topic, buffer in buffers.items()}
+
+    if reported:
+        statistics.log()
+        statistics.publish()
+
+    return tables
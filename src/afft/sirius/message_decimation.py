@@ -0,0 +1,138 @@
+"""Module for decimating the message lines of topics before they are parsed."""
+
+import math
+
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+from typing import Any, Optional, Self
+
+from .message_merge import get_line_timestamp
+
+
+@dataclass(slots=True, frozen=True)
+class DecimationRule:
+    """Class representing the decimation of a topic, which keeps either every
+    Nth message or at most a target rate of messages per second."""
+
+    every: Optional[int] = None
+    rate: Optional[float] = None
+
+    def __post_init__(self: Self) -> None:
+        if (self.every is None) == (self.rate is None):
+            raise ValueError("decimation needs either every or rate")
+        if self.every is not None and (
+            not isinstance(self.every, int) or self.every < 1
+        ):
+            raise ValueError(f"invalid decimation interval: {self.every}")
+        if self.rate is not None and not self.rate > 0.0:
+            raise ValueError(f"invalid decimation rate: {self.rate}")
+
+
+def build_decimation_rules(
+    config: Mapping[str, Mapping[str, Any]],
+) -> dict[str, DecimationRule]:
+    """Builds the decimation rules of a mapping from topic to a table with
+    either an every or a rate key, e.g. the decimation section of a protocol
+    config."""
+    rules: dict[str, DecimationRule] = dict()
+    for topic, values in config.items():
+        if not isinstance(values, Mapping):
+            raise ValueError(f"invalid decimation for topic {topic}: {values}")
+
+        unknown: set[str] = set(values) - {"every", "rate"}
+        if unknown:
+            raise ValueError(
+                f"invalid decimation keys for topic {topic}: "
+                + ", ".join(sorted(unknown))
+            )
+
+        try:
+            rules[topic] = DecimationRule(**values)
+        except ValueError as error:
+            raise ValueError(
+                f"invalid decimation for topic {topic}: {error}"
+            ) from error
+
+    return rules
+
+
+@dataclass
+class MessageDecimator:
+    """Class that drops the lines of decimated topics before they are parsed,
+    so that the messages of dropped lines are never built. Every-N topics
+    keep the first line and every Nth line after it. Rate topics keep the
+    first line in every 1 / rate second interval since the epoch, so that
+    the kept lines do not depend on where the stream starts. Lines without a
+    timestamp are kept, so that the parser counts them as failed. The state
+    is kept between calls, so that the batches of a followed file are
+    decimated as one stream, and can be saved and restored, so that a
+    resumed follow continues the stream."""
+
+    rules: dict[str, DecimationRule]
+    counts: Counter[str] = field(default_factory=Counter, init=False)
+    intervals: dict[str, int] = field(default_factory=dict, init=False)
+
+    def decimate(
+        self: Self,
+        lines: Iterable[str],
+        decimated: Optional[Counter[str]] = None,
+    ) -> Iterator[str]:
+        """Lazily yields the lines that are kept, and counts the dropped lines
+        of every topic in decimated, if given."""
+        if not self.rules:
+            yield from lines
+            return
+
+        if decimated is None:
+            decimated = Counter()
+
+        rules: dict[str, DecimationRule] = self.rules
+        counts: Counter[str] = self.counts
+        intervals: dict[str, int] = self.intervals
+
+        for line in lines:
+            topic: str = line.partition(":")[0]
+            rule: Optional[DecimationRule] = rules.get(topic)
+
+            if rule is None:
+                yield line
+                continue
+
+            if rule.every is not None:
+                count: int = counts[topic]
+                counts[topic] = count + 1
+                if count % rule.every:
+                    decimated[topic] += 1
+                    continue
+            else:
+                assert rule.rate is not None, "decimation rate is required"
+                timestamp: Optional[float] = get_line_timestamp(line)
+                if timestamp is not None:
+                    interval: int = math.floor(timestamp * rule.rate)
+                    if intervals.get(topic) == interval:
+                        decimated[topic] += 1
+                        continue
+                    intervals[topic] = interval
+
+            yield line
+
+    def to_dict(self: Self) -> dict[str, dict[str, int]]:
+        """Returns the line counts and last kept intervals of the topics."""
+        return {"counts": dict(self.counts), "intervals": dict(self.intervals)}
+
+    def restore(self: Self, state: Mapping[str, Mapping[str, int]]) -> None:
+        """Restores the line counts and last kept intervals of a saved state.
+        Topics that are no longer decimated are ignored."""
+        self.counts = Counter(
+            {
+                topic: int(count)
+                for topic, count in state.get("counts", {}).items()
+                if topic in self.rules
+            }
+        )
+        self.intervals = {
+            topic: int(interval)
+            for topic, interval in state.get("intervals", {}).items()
+            if topic in self.rules
+        }
@@ -0,0 +1,268 @@
+"""Module for vectorized parsing of messages with polars."""
+
+import re
+import time
+
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any, Optional
+
+import polars as pl
+
+from .concrete_messages import SonarTrace, UnixTimestamp
+from .message_columns import epoch_to_timestamp_array
+from .message_parsers import (
+    BATTERY_TOPIC_TO_NAME,
+    MESSAGE_HEADER_PATTERN,
+    THRUSTER_TOPIC_TO_NAME,
+    FieldConverter,
+    FieldValidator,
+    MessageFormat,
+    is_matched,
+    to_flag,
+    to_optional_int,
+    to_stem,
+    to_trace,
+)
+from .message_protocol import (
+    MessageProtocol,
+    ParseStatistics,
+    build_message_protocol,
+    create_parse_statistics,
+)
+
+
+type ExpressionConverter = Callable[[pl.Expr], pl.Expr]
+
+
+def _to_trace_expression(expr: pl.Expr) -> pl.Expr:
+    """Converts bin intensities to lists of bytes, or null if any intensity
+    does not fit in a byte."""
+    intensities: pl.Expr = expr.str.extract_all(r"\d+").list.eval(
+        pl.element().cast(pl.UInt8, strict=False)
+    )
+    return (
+        pl.when(intensities.list.eval(pl.element().is_null()).list.any())
+        .then(None)
+        .otherwise(intensities)
+    )
+
+
+LINE_COLUMN: str = "line"
+TOPIC_COLUMN: str = "topic"
+ROW_COLUMN: str = "row"
+
+
+# Polars data types for the field annotations of the message dataclasses
+POLARS_TYPES: dict[Any, pl.DataType] = {
+    str: pl.String(),
+    float: pl.Float64(),
+    int: pl.Int64(),
+    bool: pl.Boolean(),
+    UnixTimestamp: pl.Datetime("us", "UTC"),
+    SonarTrace: pl.List(pl.UInt8()),
+}
+
+
+# Vectorized equivalents of the field converters of the message formats.
+# Conversions that would raise in the converter evaluate to null instead.
+# Time fields are converted to timestamps once the failed rows have been
+# removed.
+EXPRESSION_CONVERTERS: dict[FieldConverter, ExpressionConverter] = {
+    str: lambda expr: expr,
+    float: lambda expr: expr.cast(pl.Float64, strict=False),
+    int: lambda expr: expr.cast(pl.Int64, strict=False),
+    to_stem: lambda expr: expr.str.replace(r"\.[^.]*$", ""),
+    is_matched: lambda expr: expr.is_not_null(),
+    to_optional_int: lambda expr: (
+        pl.when(expr.is_null())
+        .then(0)
+        .otherwise(expr.cast(pl.Int64, strict=False))
+    ),
+    to_flag: lambda expr: expr.cast(pl.Int64, strict=False) != 0,
+    to_trace: _to_trace_expression,
+    BATTERY_TOPIC_TO_NAME.__getitem__: lambda expr: expr.replace_strict(
+        BATTERY_TOPIC_TO_NAME, return_dtype=pl.String
+    ),
+    THRUSTER_TOPIC_TO_NAME.__getitem__: lambda expr: expr.replace_strict(
+        THRUSTER_TOPIC_TO_NAME, return_dtype=pl.String
+    ),
+}
+
+
+def to_polars_regex(pattern: re.Pattern[str]) -> str:
+    """Returns the regex of a compiled pattern with its verbose flag inlined,
+    so that the pattern can be used by the polars string expressions."""
+    if pattern.flags & re.VERBOSE:
+        return f"(?x){pattern.pattern}"
+    return pattern.pattern
+
+
+def _convert_field(
+    group: str, converter: FieldConverter, field_type: Any
+) -> pl.Expr:
+    """Returns an expression that converts a group column to a field column.
+    Converters without a vectorized equivalent are applied element-wise."""
+    expression_converter: ExpressionConverter | None = (
+        EXPRESSION_CONVERTERS.get(converter)
+    )
+    if expression_converter is None:
+        return pl.col(group).map_elements(
+            converter, return_dtype=POLARS_TYPES[field_type]
+        )
+    return expression_converter(pl.col(group))
+
+
+def _is_valid(validator: FieldValidator, fields: Sequence[Any]) -> bool:
+    """Returns true if the validator accepts the field values of a row."""
+    try:
+        validator(fields)
+    except ValueError:
+        return False
+    return True
+
+
+def extract_message_frame(
+    lines: pl.DataFrame, message_format: MessageFormat
+) -> tuple[pl.DataFrame, int]:
+    """Extracts the fields of a message format from a frame of lines, and
+    returns a frame with the parsed rows and the number of failed rows."""
+
+    groups: pl.DataFrame = lines.select(
+        pl.col(ROW_COLUMN),
+        pl.col(LINE_COLUMN)
+        .str.extract_groups(to_polars_regex(message_format.pattern))
+        .struct.unnest(),
+    )
+
+    fields: pl.DataFrame = groups.select(
+        pl.col(ROW_COLUMN),
+        *[
+            _convert_field(group, converter, field_type).alias(field)
+            for field, group, converter, field_type in zip(
+                message_format.fields,
+                message_format.groups,
+                message_format.converters,
+                message_format.types,
+            )
+        ],
+    )
+
+    # Lines that do not match have null groups, and conversions that fail
+    # have null fields
+    parsed: pl.DataFrame = fields.filter(
+        pl.all_horizontal(
+            pl.col(field).is_not_null() for field in message_format.fields
+        )
+    )
+
+    if message_format.validator is not None:
+        parsed = parsed.filter(
+            pl.Series(
+                [
+                    _is_valid(message_format.validator, row)
+                    for row in parsed.select(message_format.fields).iter_rows()
+                ],
+                dtype=pl.Boolean,
+            )
+        )
+
+    parsed = parsed.with_columns(
+        pl.Series(
+            field,
+            epoch_to_timestamp_array(parsed.get_column(field).to_numpy()),
+        )
+        for field, field_type in zip(
+            message_format.fields, message_format.types
+        )
+        if field_type is UnixTimestamp
+    ).cast(
+        {
+            field: POLARS_TYPES[field_type]
+            for field, field_type in zip(
+                message_format.fields, message_format.types
+            )
+        }
+    )
+
+    return parsed, fields.height - parsed.height
+
+
+def parse_message_frames(
+    lines: Iterable[str],
+    topic_types: dict[str, str],
+    statistics: Optional[ParseStatistics] = None,
+) -> dict[str, pl.DataFrame]:
+    """Parses lines as message types in the given protocol with vectorized
+    polars expressions, and returns a frame per topic with the same columns
+    as the message dicts. The message format regexes are applied per topic,
+    so that every line is matched by the pattern of its topic only. If
+    statistics are given, the lines are counted in them and the caller
+    reports them, otherwise the statistics of the parse are logged and
+    published."""
+
+    protocol: MessageProtocol = build_message_protocol(topic_types)
+    reported: bool = statistics is None
+    if statistics is None:
+        statistics = create_parse_statistics()
+
+    frame: pl.DataFrame = (
+        pl.DataFrame(
+            {LINE_COLUMN: list(lines)}, schema={LINE_COLUMN: pl.String}
+        )
+        .with_row_index(ROW_COLUMN)
+        .with_columns(
+            pl.col(LINE_COLUMN)
+            .str.extract_groups(to_polars_regex(MESSAGE_HEADER_PATTERN))
+            .struct.field("topic")
+            .alias(TOPIC_COLUMN)
+        )
+    )
+
+    invalid: pl.DataFrame = frame.filter(pl.col(TOPIC_COLUMN).is_null())
+    if invalid.height:
+        raise ValueError(
+            f"failed to parse header: {invalid.get_column(LINE_COLUMN)[0]}"
+        )
+
+    accepted: pl.Expr = pl.col(TOPIC_COLUMN).is_in(protocol.list_topics())
+
+    for topic, count in (
+        frame.filter(~accepted).get_column(TOPIC_COLUMN).value_counts().rows()
+    ):
+        statistics.skipped[topic] += count
+
+    partitions: dict[Any, pl.DataFrame] = frame.filter(accepted).partition_by(
+        TOPIC_COLUMN, as_dict=True
+    )
+
+    frames: dict[str, pl.DataFrame] = dict()
+    for (topic,), partition in partitions.items():
+        item: MessageProtocol.Item | None = protocol.get_topic(topic)
+        assert item is not None, f"missing protocol item: {topic}"
+
+        start: float = time.perf_counter()
+        parsed, failed = extract_message_frame(partition, item.message_format)
+
+        if statistics.measured:
+            statistics.seconds[topic] += time.perf_counter() - start
+            statistics.line_bytes[topic] += (
+                int(partition.get_column(LINE_COLUMN).str.len_bytes().sum())
+                + partition.height
+            )
+            statistics.parsed[topic] += parsed.height
+
+        if failed:
+            statistics.failed[topic] += failed
+        if parsed.height:
+            frames[topic] = parsed
+
+    if reported:
+        statistics.log()
+        statistics.publish()
+
+    # Order topics by their first parsed message, like the other backends
+    ordered: list[str] = sorted(
+        frames, key=lambda topic: frames[topic].get_column(ROW_COLUMN)[0]
+    )
+
+    return {topic: frames[topic].drop(ROW_COLUMN) for topic in ordered}
@@ -0,0 +1,333 @@
+"""Module for byte-offset indices of message files."""
+
+import math
+import mmap
+import os
+
+from array import array
+from collections.abc import Collection, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Self
+
+import numpy as np
+
+from numpy.typing import NDArray
+
+from afft.io.file_io import TOPIC_SEPARATORS, is_compressed
+from afft.utils.log import logger
+
+
+INDEX_SUFFIX: str = ".idx.npz"
+INDEX_VERSION: int = 1
+
+# Width of the time buckets of an index, in seconds
+DEFAULT_BUCKET_SECONDS: float = 60.0
+
+
+@dataclass
+class MessageIndex:
+    """Class representing a byte-offset index of a message file, i.e. the
+    offsets of the lines of every topic and the byte range of the lines in
+    every time bucket. The index is valid for the file size and modification
+    time it was built from."""
+
+    size: int
+    mtime_ns: int
+    bucket_seconds: float
+    topic_offsets: dict[str, NDArray[np.int64]]
+    bucket_keys: NDArray[np.int64]
+    bucket_starts: NDArray[np.int64]
+    bucket_ends: NDArray[np.int64]
+
+    def is_current(self: Self, path: Path) -> bool:
+        """Returns true if the index matches the size and modification time
+        of the file."""
+        status: os.stat_result = os.stat(path)
+        return (
+            status.st_size == self.size and status.st_mtime_ns == self.mtime_ns
+        )
+
+    def list_topics(self: Self) -> list[str]:
+        """Returns the topics of the file in order of first appearance."""
+        return list(self.topic_offsets.keys())
+
+    def select_range(
+        self: Self, start: Optional[float] = None, end: Optional[float] = None
+    ) -> tuple[int, int]:
+        """Returns the byte range that contains every line with a timestamp
+        within the given times. The range may contain lines outside the
+        times, since buckets are coarse and lines may be out of order."""
+        if start is None and end is None:
+            return 0, self.size
+
+        selected: NDArray[np.bool_] = np.ones(len(self.bucket_keys), dtype=bool)
+        if start is not None:
+            selected &= self.bucket_keys >= math.floor(
+                start / self.bucket_seconds
+            )
+        if end is not None:
+            selected &= self.bucket_keys <= math.floor(
+                end / self.bucket_seconds
+            )
+
+        if not selected.any():
+            return 0, 0
+
+        return (
+            int(self.bucket_starts[selected].min()),
+            int(self.bucket_ends[selected].max()),
+        )
+
+    def select_offsets(
+        self: Self, topics: Collection[str], start: int, end: int
+    ) -> NDArray[np.int64]:
+        """Returns the sorted offsets of the lines of the topics that start
+        within the byte range."""
+        selected: list[NDArray[np.int64]] = list()
+        for topic in topics:
+            offsets: Optional[NDArray[np.int64]] = self.topic_offsets.get(topic)
+            if offsets is None:
+                continue
+            lower, upper = np.searchsorted(offsets, [start, end])
+            selected.append(offsets[lower:upper])
+
+        if not selected:
+            return np.empty(0, dtype=np.int64)
+
+        return np.sort(np.concatenate(selected))
+
+
+def get_index_path(path: Path) -> Path:
+    """Returns the path of the index sidecar of a message file."""
+    return path.with_name(f"{path.name}{INDEX_SUFFIX}")
+
+
+def _read_header(
+    data: mmap.mmap, start: int, end: int
+) -> Optional[tuple[bytes, Optional[float]]]:
+    """Reads the topic and timestamp of a line in bytes. The topic is none if
+    the first colon of the line is not followed by whitespace, and the
+    timestamp is none if the text after the colon is not a number."""
+    colon: int = data.find(b":", start, end)
+    if colon < 0 or colon + 1 >= end or data[colon + 1] not in TOPIC_SEPARATORS:
+        return None
+
+    stamp_end: int = data.find(b" ", colon + 2, end)
+    if stamp_end < 0:
+        stamp_end = end
+
+    try:
+        timestamp: Optional[float] = float(data[colon + 1 : stamp_end])
+    except ValueError:
+        timestamp = None
+
+    return data[start:colon], timestamp
+
+
+def build_message_index(
+    path: Path, bucket_seconds: float = DEFAULT_BUCKET_SECONDS
+) -> MessageIndex:
+    """Builds an index of a message file by scanning its lines in bytes.
+    Compressed files cannot be indexed, since they cannot be seeked."""
+    if not path.is_file():
+        raise ValueError(f"path {path} is not a file")
+    if is_compressed(path):
+        raise ValueError(f"compressed file cannot be indexed: {path}")
+    if bucket_seconds <= 0:
+        raise ValueError(f"invalid bucket width: {bucket_seconds}")
+
+    status: os.stat_result = os.stat(path)
+    offsets: dict[bytes, array[int]] = dict()
+    buckets: dict[int, list[int]] = dict()
+
+    if status.st_size:
+        with (
+            open(path, "rb") as filehandle,
+            mmap.mmap(filehandle.fileno(), 0, access=mmap.ACCESS_READ) as data,
+        ):
+            size: int = len(data)
+            start: int = 0
+            while start < size:
+                end: int = data.find(b"\n", start)
+                end = size if end < 0 else end + 1
+
+                header = _read_header(data, start, end)
+                if header is not None:
+                    topic, timestamp = header
+
+                    topic_offsets: Optional[array[int]] = offsets.get(topic)
+                    if topic_offsets is None:
+                        topic_offsets = offsets[topic] = array("q")
+                    topic_offsets.append(start)
+
+                    if timestamp is not None and math.isfinite(timestamp):
+                        key: int = math.floor(timestamp / bucket_seconds)
+                        bucket: Optional[list[int]] = buckets.get(key)
+                        if bucket is None:
+                            buckets[key] = [start, end]
+                        else:
+                            bucket[1] = end
+
+                start = end
+
+    keys: list[int] = sorted(buckets)
+    return MessageIndex(
+        size=status.st_size,
+        mtime_ns=status.st_mtime_ns,
+        bucket_seconds=bucket_seconds,
+        topic_offsets={
+            topic.decode(): np.frombuffer(topic_offsets, dtype=np.int64)
+            for topic, topic_offsets in offsets.items()
+        },
+        bucket_keys=np.array(keys, dtype=np.int64),
+        bucket_starts=np.array(
+            [buckets[key][0] for key in keys], dtype=np.int64
+        ),
+        bucket_ends=np.array([buckets[key][1] for key in keys], dtype=np.int64),
+    )
+
+
+def write_message_index(index: MessageIndex, path: Path) -> Path:
+    """Writes an index to a compressed sidecar next to the message file, and
+    returns the path of the sidecar."""
+    destination: Path = get_index_path(path)
+    topics: list[str] = index.list_topics()
+
+    with open(destination, "wb") as filehandle:
+        np.savez_compressed(
+            filehandle,
+            version=np.int64(INDEX_VERSION),
+            size=np.int64(index.size),
+            mtime_ns=np.int64(index.mtime_ns),
+            bucket_seconds=np.float64(index.bucket_seconds),
+            topics=np.array(topics, dtype=np.str_),
+            topic_counts=np.array(
+                [len(index.topic_offsets[topic]) for topic in topics],
+                dtype=np.int64,
+            ),
+            topic_offsets=np.concatenate(
+                [index.topic_offsets[topic] for topic in topics]
+                or [np.empty(0, dtype=np.int64)]
+            ),
+            bucket_keys=index.bucket_keys,
+            bucket_starts=index.bucket_starts,
+            bucket_ends=index.bucket_ends,
+        )
+
+    return destination
+
+
+def read_message_index(path: Path) -> Optional[MessageIndex]:
+    """Reads the index sidecar of a message file. Returns none if the sidecar
+    does not exist, or if it is outdated by the size or modification time of
+    the file."""
+    source: Path = get_index_path(path)
+    if not source.is_file():
+        return None
+
+    with np.load(source, allow_pickle=False) as data:
+        if int(data["version"]) != INDEX_VERSION:
+            return None
+
+        topics: list[str] = [str(topic) for topic in data["topics"]]
+        boundaries: NDArray[np.int64] = np.cumsum(data["topic_counts"])[:-1]
+        index: MessageIndex = MessageIndex(
+            size=int(data["size"]),
+            mtime_ns=int(data["mtime_ns"]),
+            bucket_seconds=float(data["bucket_seconds"]),
+            topic_offsets=dict(
+                zip(topics, np.split(data["topic_offsets"], boundaries))
+            ),
+            bucket_keys=data["bucket_keys"],
+            bucket_starts=data["bucket_starts"],
+            bucket_ends=data["bucket_ends"],
+        )
+
+    if not index.is_current(path):
+        return None
+
+    return index
+
+
+def load_message_index(
+    path: Path, bucket_seconds: float = DEFAULT_BUCKET_SECONDS
+) -> MessageIndex:
+    """Reads the index sidecar of a message file, or builds the index if the
+    sidecar is missing or outdated."""
+    index: Optional[MessageIndex] = read_message_index(path)
+    if index is None:
+        logger.warning(f"missing or outdated message index, indexing: {path}")
+        index = build_message_index(path, bucket_seconds)
+    return index
+
+
+def iter_indexed_lines(
+    path: Path,
+    index: MessageIndex,
+    topics: Optional[Collection[str]] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+) -> Iterator[str]:
+    """Lazily reads the lines of a message file with the given topics and
+    timestamps within the given times, by seeking to the offsets in the
+    index. Lines are read for every topic if no topics are given, and lines
+    without a timestamp are left to the parser."""
+    if not index.is_current(path):
+        raise ValueError(f"outdated message index: {path}")
+
+    return _iter_indexed_lines(path, index, topics, start, end)
+
+
+def _iter_indexed_lines(
+    path: Path,
+    index: MessageIndex,
+    topics: Optional[Collection[str]],
+    start: Optional[float],
+    end: Optional[float],
+) -> Iterator[str]:
+    """Yields the decoded lines of the selected offsets or byte range."""
+    range_start, range_end = index.select_range(start, end)
+    if range_start >= range_end:
+        return
+
+    with (
+        open(path, "rb") as filehandle,
+        mmap.mmap(filehandle.fileno(), 0, access=mmap.ACCESS_READ) as data,
+    ):
+        offsets: Iterator[int] = (
+            iter(index.select_offsets(topics, range_start, range_end).tolist())
+            if topics is not None
+            else _iter_line_offsets(data, range_start, range_end)
+        )
+
+        for offset in offsets:
+            line_end: int = data.find(b"\n", offset)
+            if line_end < 0:
+                line_end = len(data)
+
+            if start is not None or end is not None:
+                header = _read_header(data, offset, line_end)
+                timestamp: Optional[float] = (
+                    header[1] if header is not None else None
+                )
+                if timestamp is not None and (
+                    (start is not None and timestamp < start)
+                    or (end is not None and timestamp > end)
+                ):
+                    continue
+
+            line: bytes = data[offset:line_end]
+            if line.endswith(b"\r"):
+                line = line[:-1]
+            yield line.decode()
+
+
+def _iter_line_offsets(data: mmap.mmap, start: int, end: int) -> Iterator[int]:
+    """Yields the offsets of the lines that start within a byte range."""
+    while start < end:
+        yield start
+        line_end: int = data.find(b"\n", start, end)
+        if line_end < 0:
+            return
+        start = line_end + 1
@@ -35,5 +35,9 @@ class Message(Protocol, Generic[Header, Body]):
         """Returns a dictionary of the message fields."""
         ...
 
+    def to_tuple(self: Self) -> tuple[Any, ...]:
+        """Returns a tuple of the message field values."""
+        ...
+
 
 type MessageParser = Callable[[str], Any]
@@ -0,0 +1,96 @@
+"""Module for fast tokenizers of message lines with a fixed key:value layout."""
+
+import re
+
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import Optional
+
+
+type Tokenizer = Callable[[str], Optional[Sequence[Optional[str]]]]
+
+
+# Value patterns of the message regexes
+POINT_NUMBER: str = r"[-+]?\d*[.]\d*"
+UNSIGNED_POINT_NUMBER: str = r"\d*[.]\d*"
+DECIMAL: str = r"[-+]?\d+[.]\d+"
+UNSIGNED_DECIMAL: str = r"\d+[.]\d+"
+INTEGER: str = r"[-+]?\d+"
+DIGITS: str = r"\d+"
+OPTIONAL_DIGITS: str = r"\d*"
+DIGIT: str = r"\d"
+# Single-spaced byte values, as in the bins of sonar traces
+BYTE_SEQUENCE: str = r"\d{1,3}(?: \d{1,3})*"
+
+ANY_TOPIC: str = r"[^:\s]+"
+WORD_TOPIC: str = r"\w+"
+
+
+@dataclass(frozen=True, slots=True)
+class KeyValueField:
+    """Class representing a key:value field of a message line, with the
+    group name and value pattern of the field in the message regex."""
+
+    key: str
+    group: str
+    value: str
+
+
+@dataclass(frozen=True, slots=True)
+class KeyValueLayout:
+    """Class representing the canonical layout of a message line, i.e. a
+    topic, a timestamp and a fixed sequence of key:value fields separated by
+    single spaces. Values follow their key directly, or after a space if the
+    layout is spaced."""
+
+    fields: tuple[KeyValueField, ...]
+    topic: str = ANY_TOPIC
+    spaced: bool = False
+
+
+def compile_layout_pattern(layout: KeyValueLayout) -> re.Pattern[str]:
+    """Compiles a strict pattern for the canonical layout of a line, with
+    unnamed groups for the topic, the timestamp and the field values."""
+    separator: str = " " if layout.spaced else ""
+    fields: str = "".join(
+        f" {re.escape(field.key)}:{separator}({field.value})"
+        for field in layout.fields
+    )
+    return re.compile(rf"({layout.topic}): (\d+\.\d+){fields}\Z")
+
+
+def create_layout_tokenizer(
+    layout: KeyValueLayout, groups: Sequence[str]
+) -> Tokenizer:
+    """Creates a tokenizer that returns the values of the given groups for
+    lines in the canonical layout, and none for any other line.
+
+    The canonical pattern only accepts single spaces, a topic without colons
+    or whitespace and no trailing characters, and avoids the lazy topic and
+    optional whitespace of the message regexes. A line it accepts is also
+    matched by the message regex with the same group values, so that other
+    lines can be left to the message regex."""
+
+    names: list[str] = ["topic", "timestamp"] + [
+        field.group for field in layout.fields
+    ]
+    unknown: set[str] = set(groups) - set(names)
+    if unknown:
+        raise ValueError(f"invalid layout: missing groups {sorted(unknown)}")
+    if len(groups) < 2:
+        raise ValueError("invalid layout: at least two groups are required")
+
+    pattern: re.Pattern[str] = compile_layout_pattern(layout)
+    select: Callable[[Sequence[str]], tuple[str, ...]] = itemgetter(
+        *(names.index(group) for group in groups)
+    )
+    match_pattern = pattern.match
+
+    def tokenize(line: str) -> Optional[Sequence[Optional[str]]]:
+        match: Optional[re.Match[str]] = match_pattern(line)
+        if match is None:
+            return None
+        return select(match.groups())
+
+    return tokenize
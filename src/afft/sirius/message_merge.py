@@ -0,0 +1,73 @@
+"""Module for merging the lines of several message files in time order."""
+
+import heapq
+import math
+
+from collections import Counter
+from collections.abc import Collection, Iterable, Iterator, Sequence
+from operator import itemgetter
+from pathlib import Path
+from typing import Optional
+
+import afft.io as io
+
+
+def get_line_timestamp(line: str) -> Optional[float]:
+    """Returns the timestamp after the topic of a message line, or none if
+    the line has no finite timestamp."""
+    _, separator, remainder = line.partition(":")
+    if not separator:
+        return None
+
+    fields: list[str] = remainder.split(maxsplit=1)
+    if not fields:
+        return None
+
+    try:
+        timestamp: float = float(fields[0])
+    except ValueError:
+        return None
+
+    return timestamp if math.isfinite(timestamp) else None
+
+
+def _iter_timed_lines(lines: Iterable[str]) -> Iterator[tuple[float, str]]:
+    """Yields lines with their timestamps. Lines without a timestamp get the
+    timestamp of the previous line, so that they stay after it."""
+    timestamp: float = -math.inf
+    for line in lines:
+        line_timestamp: Optional[float] = get_line_timestamp(line)
+        if line_timestamp is not None:
+            timestamp = line_timestamp
+        yield timestamp, line
+
+
+def merge_message_lines(sources: Iterable[Iterable[str]]) -> Iterator[str]:
+    """Lazily merges the lines of several sources in timestamp order, with a
+    heap of the next line of every source. The lines of every source should
+    be in time order, and lines with equal timestamps keep source order."""
+    merged: Iterator[tuple[float, str]] = heapq.merge(
+        *(_iter_timed_lines(lines) for lines in sources), key=itemgetter(0)
+    )
+    return map(itemgetter(1), merged)
+
+
+def iter_merged_topic_lines(
+    paths: Sequence[Path],
+    topics: Collection[str],
+    skipped: Optional[Counter[str]] = None,
+) -> Iterator[str]:
+    """Lazily reads the lines of several message files of a deployment in
+    timestamp order, so that messages are grouped per topic in time order
+    without sorting. Lines of topics that are not in the given topics are
+    skipped before they are decoded, and counted in skipped if given."""
+    if not paths:
+        raise ValueError("no message files to merge")
+
+    sources: list[Iterator[str]] = [
+        io.iter_topic_lines(path, topics, skipped) for path in paths
+    ]
+    if len(sources) == 1:
+        return sources[0]
+
+    return merge_message_lines(sources)
@@ -1,14 +1,38 @@
 """Module for parsing of message data types."""
 
+import dataclasses
 import re
 
-from datetime import datetime, timezone
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional, Self
+
+import numpy as np
+
+from numpy.typing import NDArray
 
 from .message_interfaces import MessageParser
+from .message_layouts import (
+    BYTE_SEQUENCE,
+    DECIMAL,
+    DIGIT,
+    DIGITS,
+    INTEGER,
+    OPTIONAL_DIGITS,
+    POINT_NUMBER,
+    UNSIGNED_DECIMAL,
+    UNSIGNED_POINT_NUMBER,
+    WORD_TOPIC,
+    KeyValueField,
+    KeyValueLayout,
+    Tokenizer,
+    create_layout_tokenizer,
+)
 from .concrete_messages import (
     MessageHeader,
+    SonarTrace,
+    UnixTimestamp,
     ImageCaptureMessage,
     SeabirdCTDMessage,
     AanderaaCTDMessage,
@@ -18,6 +42,8 @@ from .concrete_messages import (
     TrackLinkModemMessage,
     EvologicsModemMessage,
     MicronSonarMessage,
+    MicronTraceMessage,
+    MicronSectorMessage,
     OASonarMessage,
     GpsGsvMessage,
     GpsRmcMessage,
@@ -26,6 +52,11 @@ from .concrete_messages import (
 )
 
 
+# Version of the parsed message fields, to be incremented whenever a parser
+# changes its output so that cached parse results are invalidated
+PARSER_VERSION: int = 1
+
+
 MESSAGE_HEADER_REGEX = r"""
     ^
     (?P<topic>.+?):\s+
@@ -158,6 +189,30 @@ MICRON_REGEX = r"""
     $
     """
 
+MICRON_TRACE_REGEX = r"""
+    ^
+    (?P<topic>.+?):\s+
+    (?P<timestamp>\d+\.\d+)\s+
+    Angle:\s*(?P<angle>[-+]?\d+\.\d+)\s+
+    Range:\s*(?P<range_scale>\d+\.\d+)\s+
+    Gain:\s*(?P<gain>\d+\.\d+)\s+
+    Bins:\s*(?P<intensities>\d{1,3}(?:\s+\d{1,3})*)\s*
+    $
+    """
+
+MICRON_SECTOR_REGEX = r"""
+    ^
+    (?P<topic>.+?):\s+
+    (?P<timestamp>\d+\.\d+)\s+
+    Start:\s*(?P<start_angle>[-+]?\d+\.\d+)\s+
+    End:\s*(?P<end_angle>[-+]?\d+\.\d+)\s+
+    Range:\s*(?P<range_scale>\d+\.\d+)\s+
+    Gain:\s*(?P<gain>\d+\.\d+)\s+
+    Traces:\s*(?P<trace_count>\d+)\s+
+    Bins:\s*(?P<intensities>\d{1,3}(?:\s+\d{1,3})*)\s*
+    $
+    """
+
 OAS_REGEX = r"""
     ^
     (?P<topic>.+?):\s+
@@ -215,23 +270,523 @@ BATTERY_REGEX = r"""
     """
 
 
-def _unix_epoch_to_datetime(ts: float) -> datetime:
-    """Convert a Unix float timestamp (seconds) to a UTC datetime object."""
-    return datetime.fromtimestamp(ts, tz=timezone.utc)
+# Canonical layouts of the key:value messages. Lines in these layouts are
+# tokenized with positional patterns, and other lines fall back to the
+# regexes above. The value patterns are the same as in the regexes.
+
+TELEDYNE_DVL_LAYOUT: KeyValueLayout = KeyValueLayout(
+    fields=(
+        KeyValueField("alt", "altitude", POINT_NUMBER),
+        KeyValueField("r1", "range_01", POINT_NUMBER),
+        KeyValueField("r2", "range_02", POINT_NUMBER),
+        KeyValueField("r3", "range_03", POINT_NUMBER),
+        KeyValueField("r4", "range_04", POINT_NUMBER),
+        KeyValueField("h", "heading", POINT_NUMBER),
+        KeyValueField("p", "pitch", POINT_NUMBER),
+        KeyValueField("r", "roll", POINT_NUMBER),
+        KeyValueField("vx", "velocity_x", POINT_NUMBER),
+        KeyValueField("vy", "velocity_y", POINT_NUMBER),
+        KeyValueField("vz", "velocity_z", POINT_NUMBER),
+        KeyValueField("nx", "dmg_x", POINT_NUMBER),
+        KeyValueField("ny", "dmg_y", POINT_NUMBER),
+        KeyValueField("nz", "dmg_z", POINT_NUMBER),
+        KeyValueField("COG", "course_over_ground", POINT_NUMBER),
+        KeyValueField("SOG", "speed_over_ground", POINT_NUMBER),
+        KeyValueField("bt_status", "bottom_track_status", OPTIONAL_DIGITS),
+        KeyValueField("h_true", "true_heading", POINT_NUMBER),
+        KeyValueField("p_gimbal", "gimbal_pitch", POINT_NUMBER),
+        KeyValueField("sv", "sound_velocity", POINT_NUMBER),
+    )
+)
+
+LQ_MODEM_LAYOUT: KeyValueLayout = KeyValueLayout(
+    fields=(
+        KeyValueField("time", "device_time", POINT_NUMBER),
+        KeyValueField("Lat", "ship_latitude", POINT_NUMBER),
+        KeyValueField("Lon", "ship_longitude", POINT_NUMBER),
+        KeyValueField("hdg", "ship_heading", POINT_NUMBER),
+        KeyValueField("roll", "ship_roll", POINT_NUMBER),
+        KeyValueField("pitch", "ship_pitch", POINT_NUMBER),
+        KeyValueField("bear", "target_bearing_angle", POINT_NUMBER),
+        KeyValueField("rng", "target_slant_range", POINT_NUMBER),
+    )
+)
+
+EVOLOGICS_MODEM_LAYOUT: KeyValueLayout = KeyValueLayout(
+    fields=(
+        KeyValueField("target_lat", "target_latitude", POINT_NUMBER),
+        KeyValueField("target_lon", "target_longitude", POINT_NUMBER),
+        KeyValueField("target_depth", "target_depth", POINT_NUMBER),
+        KeyValueField("accuracy", "accuracy", POINT_NUMBER),
+        KeyValueField("ship_lat", "ship_latitude", POINT_NUMBER),
+        KeyValueField("ship_lon", "ship_longitude", UNSIGNED_POINT_NUMBER),
+        KeyValueField("ship_roll", "ship_roll", POINT_NUMBER),
+        KeyValueField("ship_pitch", "ship_pitch", POINT_NUMBER),
+        KeyValueField("ship_heading", "ship_heading", UNSIGNED_POINT_NUMBER),
+        KeyValueField("target_x", "target_x", POINT_NUMBER),
+        KeyValueField("target_y", "target_y", POINT_NUMBER),
+        KeyValueField("target_z", "target_z", POINT_NUMBER),
+    )
+)
+
+THRUSTER_LAYOUT: KeyValueLayout = KeyValueLayout(
+    fields=(
+        KeyValueField("RPM", "rpm", POINT_NUMBER),
+        KeyValueField("A", "current", POINT_NUMBER),
+        KeyValueField("V", "voltage", POINT_NUMBER),
+        KeyValueField("T", "temperature", POINT_NUMBER),
+    ),
+    spaced=True,
+)
+
+MICRON_TRACE_LAYOUT: KeyValueLayout = KeyValueLayout(
+    fields=(
+        KeyValueField("Angle", "angle", DECIMAL),
+        KeyValueField("Range", "range_scale", UNSIGNED_DECIMAL),
+        KeyValueField("Gain", "gain", UNSIGNED_DECIMAL),
+        KeyValueField("Bins", "intensities", BYTE_SEQUENCE),
+    )
+)
+
+MICRON_SECTOR_LAYOUT: KeyValueLayout = KeyValueLayout(
+    fields=(
+        KeyValueField("Start", "start_angle", DECIMAL),
+        KeyValueField("End", "end_angle", DECIMAL),
+        KeyValueField("Range", "range_scale", UNSIGNED_DECIMAL),
+        KeyValueField("Gain", "gain", UNSIGNED_DECIMAL),
+        KeyValueField("Traces", "trace_count", DIGITS),
+        KeyValueField("Bins", "intensities", BYTE_SEQUENCE),
+    )
+)
+
+BATTERY_LAYOUT: KeyValueLayout = KeyValueLayout(
+    fields=(
+        KeyValueField("TimeLeft", "time_left", INTEGER),
+        KeyValueField("PercentCharge", "charge_percent", DIGITS),
+        KeyValueField("Current", "current", DECIMAL),
+        KeyValueField("Voltage", "voltage", DECIMAL),
+        KeyValueField("Power", "power", DECIMAL),
+        KeyValueField("Charging", "charging", DIGIT),
+    ),
+    topic=WORD_TOPIC,
+    spaced=True,
+)
+
+
+BATTERY_TOPIC_TO_NAME: dict[str, str] = {
+    "BATT": "battery",
+    "BATT0": "battery_00",
+    "BATT1": "battery_01",
+    "BATT2": "battery_02",
+}
+
+
+THRUSTER_TOPIC_TO_NAME: dict[str, str] = {
+    "THR_PORT": "thruster_portside",
+    "THR_STBD": "thruster_starboard",
+    "THR_VERT": "thruster_vertical",
+}
+
+
+type FieldConverter = Callable[[Any], Any]
+
+# Validators check the converted field values of a message as a whole, and
+# raise a value error for values that are invalid together
+type FieldValidator = Callable[[Sequence[Any]], None]
+
+
+def to_stem(value: str) -> str:
+    """Converts a matched filename to its stem."""
+    return Path(value).stem
+
+
+def is_matched(value: str | None) -> bool:
+    """Returns true if an optional group was matched."""
+    return value is not None
+
+
+def to_optional_int(value: str | None) -> int:
+    """Converts an optional matched integer, defaulting to zero."""
+    return int(value) if value is not None else 0
+
+
+def to_flag(value: str) -> bool:
+    """Converts a matched integer flag to a boolean."""
+    return bool(int(value))
+
+
+def to_trace(value: str) -> SonarTrace:
+    """Converts matched whitespace-separated bin intensities to an array with
+    a byte per bin."""
+    intensities: NDArray[np.int64] = np.fromstring(
+        value, dtype=np.int64, sep=" "
+    )
+    if intensities.size and intensities.max() > 255:
+        raise ValueError(f"invalid sonar intensities: {value}")
+    return SonarTrace(intensities.astype(np.uint8))
+
+
+def _check_sector_traces(fields: Sequence[Any]) -> None:
+    """Checks that the bins of a sector scan, i.e. its last two fields, can be
+    split into its number of traces of equal length."""
+    trace_count, intensities = fields[-2:]
+    if trace_count < 1 or len(intensities) % trace_count:
+        raise ValueError(
+            f"invalid sonar sector: {len(intensities)} bins, "
+            f"{trace_count} traces"
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class MessageFormat:
+    """Class representing a compiled message format, i.e. a pattern and the
+    converters from its groups to the header and body fields of a message."""
+
+    message_type: type
+    pattern: re.Pattern[str]
+    fields: tuple[str, ...]
+    types: tuple[Any, ...]
+    groups: tuple[str, ...]
+    converters: tuple[FieldConverter, ...]
+    header_size: int
+    tokenizer: Optional[Tokenizer] = None
+    validator: Optional[FieldValidator] = None
+
+    def match_values(self: Self, line: str) -> Optional[Sequence[Any]]:
+        """Returns the group values of a line, or none if the line does not
+        match the format. Lines are tokenized if the format has a tokenizer,
+        and matched by the pattern otherwise."""
+        if self.tokenizer is not None:
+            values: Optional[Sequence[Any]] = self.tokenizer(line)
+            if values is not None:
+                return values
+
+        match: Optional[re.Match[str]] = self.pattern.match(line)
+        if match is None:
+            return None
+        return match.group(*self.groups)
+
+    def convert(self: Self, values: Sequence[Any]) -> list[Any]:
+        """Returns the converted field values of the group values, ordered as
+        the header fields followed by the body fields."""
+        fields: list[Any] = [
+            converter(value)
+            for converter, value in zip(self.converters, values)
+        ]
+        if self.validator is not None:
+            self.validator(fields)
+        return fields
+
+    def build(self: Self, match: re.Match[str]) -> Any:
+        """Builds a message from a match of the format pattern."""
+        return self.build_values(match.group(*self.groups))
+
+    def build_values(self: Self, values: Sequence[Any]) -> Any:
+        """Builds a message from the group values of a line."""
+        fields: list[Any] = self.convert(values)
+        message_type: Any = self.message_type
+        return message_type(
+            message_type.header_type(*fields[: self.header_size]),
+            message_type.body_type(*fields[self.header_size :]),
+        )
+
+
+def create_message_format(
+    message_type: Any,
+    regex: str,
+    converters: dict[str, tuple[str, FieldConverter]],
+    layout: Optional[KeyValueLayout] = None,
+    validator: Optional[FieldValidator] = None,
+) -> MessageFormat:
+    """Creates a message format from a regex and a mapping from field name to
+    a pattern group and a converter. Every header and body field of the
+    message type must have a converter. If a key:value layout is given, the
+    format tokenizes lines in the layout before matching the regex. If a
+    validator is given, it checks the converted fields of every message."""
+
+    header_fields: list[dataclasses.Field[Any]] = list(
+        dataclasses.fields(message_type.header_type)
+    )
+    body_fields: list[dataclasses.Field[Any]] = list(
+        dataclasses.fields(message_type.body_type)
+    )
+    fields: list[str] = [field.name for field in header_fields + body_fields]
+
+    missing: set[str] = set(fields) - set(converters)
+    unknown: set[str] = set(converters) - set(fields)
+    if missing or unknown:
+        raise ValueError(
+            f"invalid converters for {message_type.__name__}: "
+            f"missing {sorted(missing)}, unknown {sorted(unknown)}"
+        )
+
+    groups: tuple[str, ...] = tuple(converters[field][0] for field in fields)
+
+    return MessageFormat(
+        message_type=message_type,
+        pattern=re.compile(regex, re.VERBOSE),
+        fields=tuple(fields),
+        types=tuple(field.type for field in header_fields + body_fields),
+        groups=groups,
+        converters=tuple(converters[field][1] for field in fields),
+        header_size=len(header_fields),
+        tokenizer=create_layout_tokenizer(layout, groups)
+        if layout is not None
+        else None,
+        validator=validator,
+    )
+
+
+HEADER_CONVERTERS: dict[str, tuple[str, FieldConverter]] = {
+    "topic": ("topic", str),
+    "timestamp": ("timestamp", float),
+}
+
+
+MESSAGE_HEADER_PATTERN: re.Pattern[str] = re.compile(
+    MESSAGE_HEADER_REGEX, re.VERBOSE
+)
+
+
+IMAGE_CAPTURE_FORMAT: MessageFormat = create_message_format(
+    ImageCaptureMessage,
+    IMAGE_CAPTURE_REGEX,
+    HEADER_CONVERTERS
+    | {
+        "label": ("filename", to_stem),
+        "filename": ("filename", str),
+        "trigger_time": ("trigger_time", float),
+        "exposure_logged": ("exposure", is_matched),
+        "exposure": ("exposure", to_optional_int),
+    },
+)
+
+SEABIRD_CTD_FORMAT: MessageFormat = create_message_format(
+    SeabirdCTDMessage,
+    SEABIRD_CTD_REGEX,
+    HEADER_CONVERTERS
+    | {
+        "conductivity": ("conductivity", float),
+        "temperature": ("temperature", float),
+        "salinity": ("salinity", float),
+        "pressure": ("pressure", float),
+        "sound_velocity": ("sound_velocity", float),
+    },
+)
+
+AANDERAA_CTD_FORMAT: MessageFormat = create_message_format(
+    AanderaaCTDMessage,
+    AANDERAA_CTD_REGEX,
+    HEADER_CONVERTERS
+    | {
+        "conductivity": ("conductivity", float),
+        "temperature": ("temperature", float),
+        "salinity": ("salinity", float),
+        "pressure": ("pressure", float),
+        "sound_velocity": ("sound_velocity", float),
+    },
+)
+
+ECOPUCK_FORMAT: MessageFormat = create_message_format(
+    EcopuckMessage,
+    ECOPUCK_REGEX,
+    HEADER_CONVERTERS
+    | {
+        "chlorophyll": ("chlorophyll", float),
+        "backscatter": ("backscatter", float),
+        "cdom": ("cdom", float),
+        "temperature": ("temperature", float),
+    },
+)
+
+PAROSCI_FORMAT: MessageFormat = create_message_format(
+    ParosciPressureMessage,
+    PAROSCI_REGEX,
+    HEADER_CONVERTERS | {"depth": ("depth", float)},
+)
+
+TELEDYNE_DVL_FORMAT: MessageFormat = create_message_format(
+    TeledyneDVLMessage,
+    TELEDYNE_DVL_REGEX,
+    HEADER_CONVERTERS
+    | {
+        "altitude": ("altitude", float),
+        "range_01": ("range_01", float),
+        "range_02": ("range_02", float),
+        "range_03": ("range_03", float),
+        "range_04": ("range_04", float),
+        "heading": ("heading", float),
+        "pitch": ("pitch", float),
+        "roll": ("roll", float),
+        "velocity_x": ("velocity_x", float),
+        "velocity_y": ("velocity_y", float),
+        "velocity_z": ("velocity_z", float),
+        "dmg_x": ("dmg_x", float),
+        "dmg_y": ("dmg_y", float),
+        "dmg_z": ("dmg_z", float),
+        "course_over_ground": ("course_over_ground", float),
+        "speed_over_ground": ("speed_over_ground", float),
+        "true_heading": ("true_heading", float),
+        "gimbal_pitch": ("gimbal_pitch", float),
+        "sound_velocity": ("sound_velocity", float),
+        "bottom_track_status": ("bottom_track_status", int),
+    },
+    layout=TELEDYNE_DVL_LAYOUT,
+)
+
+LQ_MODEM_FORMAT: MessageFormat = create_message_format(
+    TrackLinkModemMessage,
+    LQ_MODEM_REGEX,
+    HEADER_CONVERTERS
+    | {
+        "ship_latitude": ("ship_latitude", float),
+        "ship_longitude": ("ship_longitude", float),
+        "ship_roll": ("ship_roll", float),
+        "ship_pitch": ("ship_pitch", float),
+        "ship_heading": ("ship_heading", float),
+        "device_time": ("device_time", float),
+        "target_bearing_angle": ("target_bearing_angle", float),
+        "target_slant_range": ("target_slant_range", float),
+    },
+    layout=LQ_MODEM_LAYOUT,
+)
+
+EVOLOGICS_MODEM_FORMAT: MessageFormat = create_message_format(
+    EvologicsModemMessage,
+    EVOLOGICS_MODEM_REGEX,
+    HEADER_CONVERTERS
+    | {
+        "target_latitude": ("target_latitude", float),
+        "target_longitude": ("target_longitude", float),
+        "target_depth": ("target_depth", float),
+        "target_x": ("target_x", float),
+        "target_y": ("target_y", float),
+        "target_z": ("target_z", float),
+        "accuracy": ("accuracy", float),
+        "ship_latitude": ("ship_latitude", float),
+        "ship_longitude": ("ship_longitude", float),
+        "ship_roll": ("ship_roll", float),
+        "ship_pitch": ("ship_pitch", float),
+        "ship_heading": ("ship_heading", float),
+    },
+    layout=EVOLOGICS_MODEM_LAYOUT,
+)
+
+MICRON_FORMAT: MessageFormat = create_message_format(
+    MicronSonarMessage,
+    MICRON_REGEX,
+    HEADER_CONVERTERS
+    | {
+        "profile_range": ("profile_range", float),
+        "profile_altitude": ("profile_altitude", float),
+        "pseudo_forward_distance": ("pseudo_forward_distance", float),
+        "angle": ("angle", float),
+    },
+)
+
+MICRON_TRACE_FORMAT: MessageFormat = create_message_format(
+    MicronTraceMessage,
+    MICRON_TRACE_REGEX,
+    HEADER_CONVERTERS
+    | {
+        "angle": ("angle", float),
+        "range_scale": ("range_scale", float),
+        "gain": ("gain", float),
+        "intensities": ("intensities", to_trace),
+    },
+    layout=MICRON_TRACE_LAYOUT,
+)
+
+MICRON_SECTOR_FORMAT: MessageFormat = create_message_format(
+    MicronSectorMessage,
+    MICRON_SECTOR_REGEX,
+    HEADER_CONVERTERS
+    | {
+        "start_angle": ("start_angle", float),
+        "end_angle": ("end_angle", float),
+        "range_scale": ("range_scale", float),
+        "gain": ("gain", float),
+        "trace_count": ("trace_count", int),
+        "intensities": ("intensities", to_trace),
+    },
+    layout=MICRON_SECTOR_LAYOUT,
+    validator=_check_sector_traces,
+)
+
+OAS_FORMAT: MessageFormat = create_message_format(
+    OASonarMessage,
+    OAS_REGEX,
+    HEADER_CONVERTERS
+    | {
+        "profile_range": ("profile_range", float),
+        "profile_altitude": ("profile_altitude", float),
+        "pseudo_forward_distance": ("pseudo_forward_distance", float),
+    },
+)
+
+GPS_GSV_FORMAT: MessageFormat = create_message_format(
+    GpsGsvMessage,
+    GPS_GSV_REGEX,
+    HEADER_CONVERTERS | {"satellites_in_view": ("satellites_in_view", int)},
+)
+
+GPS_RMC_FORMAT: MessageFormat = create_message_format(
+    GpsRmcMessage,
+    GPS_RMC_REGEX,
+    HEADER_CONVERTERS
+    | {
+        "latitude": ("latitude", float),
+        "longitude": ("longitude", float),
+        "bad": ("bad", int),
+        "status": ("status", str),
+        "speed_knots": ("speed", float),
+        "course_over_ground": ("course", float),
+        "magnetic_variation": ("magnetic_variation", float),
+    },
+)
+
+BATTERY_FORMAT: MessageFormat = create_message_format(
+    BatteryMessage,
+    BATTERY_REGEX,
+    HEADER_CONVERTERS
+    | {
+        "label": ("topic", BATTERY_TOPIC_TO_NAME.__getitem__),
+        "time_left": ("time_left", int),
+        "current": ("current", float),
+        "voltage": ("voltage", float),
+        "power": ("power", float),
+        "charge_percent": ("charge_percent", int),
+        "charging": ("charging", to_flag),
+    },
+    layout=BATTERY_LAYOUT,
+)
+
+THRUSTER_FORMAT: MessageFormat = create_message_format(
+    ThrusterMessage,
+    THRUSTER_REGEX,
+    HEADER_CONVERTERS
+    | {
+        "label": ("topic", THRUSTER_TOPIC_TO_NAME.__getitem__),
+        "rpm": ("rpm", float),
+        "current": ("current", float),
+        "voltage": ("voltage", float),
+        "temperature": ("temperature", float),
+    },
+    layout=THRUSTER_LAYOUT,
+)
 
 
 def parse_message_header(line: str) -> MessageHeader:
     """Parses the header from a message line."""
 
-    pattern = re.compile(MESSAGE_HEADER_REGEX, re.VERBOSE)
-    match = pattern.match(line)
+    match = MESSAGE_HEADER_PATTERN.match(line)
 
     if not match:
         raise ValueError(f"failed to parse header: {line}")
 
     header = MessageHeader(
         topic=str(match["topic"]),
-        timestamp=_unix_epoch_to_datetime(float(match["timestamp"])),
+        timestamp=UnixTimestamp(float(match["timestamp"])),
     )
 
     return header
@@ -240,391 +795,193 @@ def parse_message_header(line: str) -> MessageHeader:
 def parse_image_message(line: str) -> ImageCaptureMessage:
     """Parses a message line as an image capture message."""
 
-    pattern = re.compile(IMAGE_CAPTURE_REGEX, re.VERBOSE)
-    match = pattern.match(line)
+    values = IMAGE_CAPTURE_FORMAT.match_values(line)
 
-    if not match:
+    if values is None:
         raise ValueError(f"failed to parse image message: {line}")
 
-    header = ImageCaptureMessage.header_type(
-        topic=str(match["topic"]),
-        timestamp=_unix_epoch_to_datetime(float(match["timestamp"])),
-    )
-
-    filename: str = str(match["filename"])
-    label: str = Path(match["filename"]).stem
-    trigger_time: datetime = _unix_epoch_to_datetime(
-        float(match["trigger_time"])
-    )
-    exposure_logged: bool = match["exposure"] is not None
-
-    exposure: int = int(match["exposure"]) if exposure_logged else 0
-
-    body = ImageCaptureMessage.body_type(
-        label=label,
-        filename=filename,
-        trigger_time=trigger_time,
-        exposure_logged=exposure_logged,
-        exposure=exposure,
-    )
-
-    return ImageCaptureMessage(header, body)
+    message: ImageCaptureMessage = IMAGE_CAPTURE_FORMAT.build_values(values)
+    return message
 
 
 def parse_seabird_ctd_message(line: str) -> SeabirdCTDMessage:
     """Parses a message line as a Seabird CTD message."""
 
-    pattern = re.compile(SEABIRD_CTD_REGEX, re.VERBOSE)
-    match = pattern.match(line)
+    values = SEABIRD_CTD_FORMAT.match_values(line)
 
-    if not match:
+    if values is None:
         raise ValueError(f"failed to parse Seabird CTD message: {line}")
 
-    header = SeabirdCTDMessage.header_type(
-        topic=str(match["topic"]),
-        timestamp=_unix_epoch_to_datetime(float(match["timestamp"])),
-    )
-
-    body = SeabirdCTDMessage.body_type(
-        conductivity=float(match["conductivity"]),
-        temperature=float(match["temperature"]),
-        salinity=float(match["salinity"]),
-        pressure=float(match["pressure"]),
-        sound_velocity=float(match["sound_velocity"]),
-    )
-
-    return SeabirdCTDMessage(header, body)
+    message: SeabirdCTDMessage = SEABIRD_CTD_FORMAT.build_values(values)
+    return message
 
 
 def parse_aanderaa_ctd_message(line: str) -> AanderaaCTDMessage:
     """Parses a message line as an Aanderaa CTD message."""
 
-    pattern = re.compile(AANDERAA_CTD_REGEX, re.VERBOSE)
-    match = pattern.match(line)
+    values = AANDERAA_CTD_FORMAT.match_values(line)
 
-    if not match:
+    if values is None:
         raise ValueError(f"failed to parse Aanderaa CTD message: {line}")
 
-    header = AanderaaCTDMessage.header_type(
-        topic=str(match["topic"]),
-        timestamp=_unix_epoch_to_datetime(float(match["timestamp"])),
-    )
-
-    body = AanderaaCTDMessage.body_type(
-        conductivity=float(match["conductivity"]),
-        temperature=float(match["temperature"]),
-        salinity=float(match["salinity"]),
-        pressure=float(match["pressure"]),
-        sound_velocity=float(match["sound_velocity"]),
-    )
-
-    return AanderaaCTDMessage(header, body)
+    message: AanderaaCTDMessage = AANDERAA_CTD_FORMAT.build_values(values)
+    return message
 
 
 def parse_ecopuck_message(line: str) -> EcopuckMessage:
     """Parses a message line as an Ecopuck water quality message."""
 
-    pattern = re.compile(ECOPUCK_REGEX, re.VERBOSE)
-    match = pattern.match(line)
+    values = ECOPUCK_FORMAT.match_values(line)
 
-    if not match:
+    if values is None:
         raise ValueError(f"failed to parse Ecopuck message: {line}")
 
-    header = EcopuckMessage.header_type(
-        topic=str(match["topic"]),
-        timestamp=_unix_epoch_to_datetime(float(match["timestamp"])),
-    )
-
-    body = EcopuckMessage.body_type(
-        chlorophyll=float(match["chlorophyll"]),
-        backscatter=float(match["backscatter"]),
-        cdom=float(match["cdom"]),
-        temperature=float(match["temperature"]),
-    )
-
-    return EcopuckMessage(header, body)
+    message: EcopuckMessage = ECOPUCK_FORMAT.build_values(values)
+    return message
 
 
 def parse_parosci_pressure_message(line: str) -> ParosciPressureMessage:
     """Parses a message line as a Parosci pressure message."""
-    pattern = re.compile(PAROSCI_REGEX, re.VERBOSE)
-    match = pattern.match(line)
 
-    if not match:
-        raise ValueError(f"failed to parse message line: {line}")
-
-    header = ParosciPressureMessage.header_type(
-        topic=str(match["topic"]),
-        timestamp=_unix_epoch_to_datetime(float(match["timestamp"])),
-    )
+    values = PAROSCI_FORMAT.match_values(line)
 
-    body = ParosciPressureMessage.body_type(
-        depth=float(match["depth"]),
-    )
+    if values is None:
+        raise ValueError(f"failed to parse message line: {line}")
 
-    return ParosciPressureMessage(header, body)
+    message: ParosciPressureMessage = PAROSCI_FORMAT.build_values(values)
+    return message
 
 
 def parse_teledyne_dvl_message(line: str) -> TeledyneDVLMessage:
     """Parses a message line as a Teledyne DVL message."""
 
-    pattern = re.compile(TELEDYNE_DVL_REGEX, re.VERBOSE)
-    match = pattern.match(line)
+    values = TELEDYNE_DVL_FORMAT.match_values(line)
 
-    if not match:
+    if values is None:
         raise ValueError(f"failed to parse message line: {line}")
 
-    header: MessageHeader = TeledyneDVLMessage.header_type(
-        topic=str(match["topic"]),
-        timestamp=_unix_epoch_to_datetime(float(match["timestamp"])),
-    )
-
-    body = TeledyneDVLMessage.body_type(
-        altitude=float(match["altitude"]),
-        range_01=float(match["range_01"]),
-        range_02=float(match["range_02"]),
-        range_03=float(match["range_03"]),
-        range_04=float(match["range_04"]),
-        heading=float(match["heading"]),
-        pitch=float(match["pitch"]),
-        roll=float(match["roll"]),
-        velocity_x=float(match["velocity_x"]),
-        velocity_y=float(match["velocity_y"]),
-        velocity_z=float(match["velocity_z"]),
-        dmg_x=float(match["dmg_x"]),
-        dmg_y=float(match["dmg_y"]),
-        dmg_z=float(match["dmg_z"]),
-        course_over_ground=float(match["course_over_ground"]),
-        speed_over_ground=float(match["speed_over_ground"]),
-        true_heading=float(match["true_heading"]),
-        gimbal_pitch=float(match["gimbal_pitch"]),
-        sound_velocity=float(match["sound_velocity"]),
-        bottom_track_status=int(match["bottom_track_status"]),
-    )
-
-    return TeledyneDVLMessage(header, body)
+    message: TeledyneDVLMessage = TELEDYNE_DVL_FORMAT.build_values(values)
+    return message
 
 
 def parse_lq_modem_message(line: str) -> TrackLinkModemMessage:
     """Parses a message line as a LQ modem message."""
 
-    pattern = re.compile(LQ_MODEM_REGEX, re.VERBOSE)
-    match = pattern.match(line)
+    values = LQ_MODEM_FORMAT.match_values(line)
 
-    if not match:
+    if values is None:
         raise ValueError(f"failed to parse message line: {line}")
 
-    header: MessageHeader = TrackLinkModemMessage.header_type(
-        topic=str(match["topic"]),
-        timestamp=_unix_epoch_to_datetime(float(match["timestamp"])),
-    )
-
-    body = TrackLinkModemMessage.body_type(
-        ship_latitude=float(match["ship_latitude"]),
-        ship_longitude=float(match["ship_longitude"]),
-        ship_roll=float(match["ship_roll"]),
-        ship_pitch=float(match["ship_pitch"]),
-        ship_heading=float(match["ship_heading"]),
-        device_time=float(match["device_time"]),
-        target_bearing_angle=float(match["target_bearing_angle"]),
-        target_slant_range=float(match["target_slant_range"]),
-    )
-
-    return TrackLinkModemMessage(header, body)
+    message: TrackLinkModemMessage = LQ_MODEM_FORMAT.build_values(values)
+    return message
 
 
 def parse_evologics_modem_message(line: str) -> EvologicsModemMessage:
     """Parses a message line as an Evologics USBL message."""
 
-    pattern = re.compile(EVOLOGICS_MODEM_REGEX, re.VERBOSE)
-    match = pattern.match(line)
+    values = EVOLOGICS_MODEM_FORMAT.match_values(line)
 
-    if not match:
+    if values is None:
         raise ValueError(f"failed to parse message line: {line}")
 
-    header = EvologicsModemMessage.header_type(
-        topic=str(match["topic"]),
-        timestamp=_unix_epoch_to_datetime(float(match["timestamp"])),
-    )
-
-    body = EvologicsModemMessage.body_type(
-        target_latitude=float(match["target_latitude"]),
-        target_longitude=float(match["target_longitude"]),
-        target_depth=float(match["target_depth"]),
-        target_x=float(match["target_x"]),
-        target_y=float(match["target_y"]),
-        target_z=float(match["target_z"]),
-        accuracy=float(match["accuracy"]),
-        ship_latitude=float(match["ship_latitude"]),
-        ship_longitude=float(match["ship_longitude"]),
-        ship_roll=float(match["ship_roll"]),
-        ship_pitch=float(match["ship_pitch"]),
-        ship_heading=float(match["ship_heading"]),
-    )
-
-    return EvologicsModemMessage(header, body)
+    message: EvologicsModemMessage = EVOLOGICS_MODEM_FORMAT.build_values(values)
+    return message
 
 
 def parse_micron_sonar_message(line: str) -> MicronSonarMessage:
     """Parses a message line as a Micron sonar message."""
 
-    pattern = re.compile(MICRON_REGEX, re.VERBOSE)
-    match = pattern.match(line)
+    values = MICRON_FORMAT.match_values(line)
 
-    if not match:
+    if values is None:
         raise ValueError(f"failed to parse message line: {line}")
 
-    header = MicronSonarMessage.header_type(
-        topic=str(match["topic"]),
-        timestamp=_unix_epoch_to_datetime(float(match["timestamp"])),
-    )
+    message: MicronSonarMessage = MICRON_FORMAT.build_values(values)
+    return message
 
-    body = MicronSonarMessage.body_type(
-        profile_range=float(match["profile_range"]),
-        profile_altitude=float(match["profile_altitude"]),
-        pseudo_forward_distance=float(match["pseudo_forward_distance"]),
-        angle=float(match["angle"]),
-    )
 
-    return MicronSonarMessage(header, body)
+def parse_micron_trace_message(line: str) -> MicronTraceMessage:
+    """Parses a message line as a Micron sonar trace message."""
 
+    values = MICRON_TRACE_FORMAT.match_values(line)
 
-def parse_obstacle_avoidance_sonar_message(line: str) -> OASonarMessage:
-    """Parses a message line as an OA sonar message."""
+    if values is None:
+        raise ValueError(f"failed to parse message line: {line}")
 
-    pattern = re.compile(OAS_REGEX, re.VERBOSE)
-    match = pattern.match(line)
+    message: MicronTraceMessage = MICRON_TRACE_FORMAT.build_values(values)
+    return message
 
-    if not match:
+
+def parse_micron_sector_message(line: str) -> MicronSectorMessage:
+    """Parses a message line as a Micron sonar sector message."""
+
+    values = MICRON_SECTOR_FORMAT.match_values(line)
+
+    if values is None:
         raise ValueError(f"failed to parse message line: {line}")
 
-    header = OASonarMessage.header_type(
-        topic=str(match["topic"]),
-        timestamp=_unix_epoch_to_datetime(float(match["timestamp"])),
-    )
+    message: MicronSectorMessage = MICRON_SECTOR_FORMAT.build_values(values)
+    return message
 
-    body = OASonarMessage.body_type(
-        profile_range=float(match["profile_range"]),
-        profile_altitude=float(match["profile_altitude"]),
-        pseudo_forward_distance=float(match["pseudo_forward_distance"]),
-    )
 
-    return OASonarMessage(header, body)
+def parse_obstacle_avoidance_sonar_message(line: str) -> OASonarMessage:
+    """Parses a message line as an OA sonar message."""
+
+    values = OAS_FORMAT.match_values(line)
+
+    if values is None:
+        raise ValueError(f"failed to parse message line: {line}")
+
+    message: OASonarMessage = OAS_FORMAT.build_values(values)
+    return message
 
 
 def parse_gps_gsv_message(line: str) -> GpsGsvMessage:
     """Parses a message line as a GPS satellites-in-view message."""
 
-    pattern = re.compile(GPS_GSV_REGEX, re.VERBOSE)
-    match = pattern.match(line)
+    values = GPS_GSV_FORMAT.match_values(line)
 
-    if not match:
+    if values is None:
         raise ValueError(f"failed to parse GPS GSV message: {line}")
 
-    header = GpsGsvMessage.header_type(
-        topic=str(match["topic"]),
-        timestamp=_unix_epoch_to_datetime(float(match["timestamp"])),
-    )
-
-    body = GpsGsvMessage.body_type(
-        satellites_in_view=int(match["satellites_in_view"]),
-    )
-
-    return GpsGsvMessage(header, body)
+    message: GpsGsvMessage = GPS_GSV_FORMAT.build_values(values)
+    return message
 
 
 def parse_gps_rmc_message(line: str) -> GpsRmcMessage:
     """Parses a message line as a GPS recommended minimum navigation message."""
 
-    pattern = re.compile(GPS_RMC_REGEX, re.VERBOSE)
-    match = pattern.match(line)
+    values = GPS_RMC_FORMAT.match_values(line)
 
-    if not match:
+    if values is None:
         raise ValueError(f"failed to parse GPS RMC message: {line}")
 
-    header = GpsRmcMessage.header_type(
-        topic=str(match["topic"]),
-        timestamp=_unix_epoch_to_datetime(float(match["timestamp"])),
-    )
-
-    body = GpsRmcMessage.body_type(
-        latitude=float(match["latitude"]),
-        longitude=float(match["longitude"]),
-        bad=int(match["bad"]),
-        status=str(match["status"]),
-        speed_knots=float(match["speed"]),
-        course_over_ground=float(match["course"]),
-        magnetic_variation=float(match["magnetic_variation"]),
-    )
-
-    return GpsRmcMessage(header, body)
-
-
-BATTERY_TOPIC_TO_NAME: dict[str, str] = {
-    "BATT": "battery",
-    "BATT0": "battery_00",
-    "BATT1": "battery_01",
-    "BATT2": "battery_02",
-}
+    message: GpsRmcMessage = GPS_RMC_FORMAT.build_values(values)
+    return message
 
 
 def parse_battery_message(line: str) -> BatteryMessage:
     """Parses a message line as a BatteryMessage object."""
 
-    pattern = re.compile(BATTERY_REGEX, re.VERBOSE)
-    match = pattern.match(line)
+    values = BATTERY_FORMAT.match_values(line)
 
-    if not match:
+    if values is None:
         raise ValueError(f"failed to parse message line: {line}")
 
-    header = BatteryMessage.header_type(
-        topic=str(match["topic"]),
-        timestamp=_unix_epoch_to_datetime(float(match["timestamp"])),
-    )
-
-    body = BatteryMessage.body_type(
-        label=BATTERY_TOPIC_TO_NAME[header.topic],
-        time_left=int(match["time_left"]),
-        current=float(match["current"]),
-        voltage=float(match["voltage"]),
-        power=float(match["power"]),
-        charge_percent=int(match["charge_percent"]),
-        charging=bool(int(match["charging"])),
-    )
-
-    return BatteryMessage(header, body)
-
-
-THRUSTER_TOPIC_TO_NAME: dict[str, str] = {
-    "THR_PORT": "thruster_portside",
-    "THR_STBD": "thruster_starboard",
-    "THR_VERT": "thruster_vertical",
-}
+    message: BatteryMessage = BATTERY_FORMAT.build_values(values)
+    return message
 
 
 def parse_thruster_message(line: str) -> ThrusterMessage:
     """Parser function for thruster messages."""
 
-    pattern = re.compile(THRUSTER_REGEX, re.VERBOSE)
-    match = pattern.match(line)
+    values = THRUSTER_FORMAT.match_values(line)
 
-    if not match:
+    if values is None:
         raise ValueError(f"failed to parse message line: {line}")
 
-    header = ThrusterMessage.header_type(
-        topic=str(match["topic"]),
-        timestamp=_unix_epoch_to_datetime(float(match["timestamp"])),
-    )
-
-    body = ThrusterMessage.body_type(
-        label=THRUSTER_TOPIC_TO_NAME[header.topic],
-        rpm=float(match["rpm"]),
-        current=float(match["current"]),
-        voltage=float(match["voltage"]),
-        temperature=float(match["temperature"]),
-    )
-
-    return ThrusterMessage(header, body)
+    message: ThrusterMessage = THRUSTER_FORMAT.build_values(values)
+    return message
 
 
 MESSAGE_PARSERS: list[MessageParser] = [
@@ -638,6 +995,8 @@ MESSAGE_PARSERS: list[MessageParser] = [
     parse_lq_modem_message,
     parse_evologics_modem_message,
     parse_micron_sonar_message,
+    parse_micron_trace_message,
+    parse_micron_sector_message,
     parse_obstacle_avoidance_sonar_message,
     parse_gps_gsv_message,
     parse_gps_rmc_message,
@@ -657,6 +1016,8 @@ MESSAGE_TYPE_TO_PARSER: dict[type, MessageParser] = {
     TrackLinkModemMessage: parse_lq_modem_message,
     EvologicsModemMessage: parse_evologics_modem_message,
     MicronSonarMessage: parse_micron_sonar_message,
+    MicronTraceMessage: parse_micron_trace_message,
+    MicronSectorMessage: parse_micron_sector_message,
     OASonarMessage: parse_obstacle_avoidance_sonar_message,
     GpsGsvMessage: parse_gps_gsv_message,
     GpsRmcMessage: parse_gps_rmc_message,
@@ -669,3 +1030,29 @@ def get_message_parser(message_type: type) -> Optional[MessageParser]:
     """Returns a parser for the message type if the message type is within the
     set of messages, and none otherwise."""
     return MESSAGE_TYPE_TO_PARSER.get(message_type)
+
+
+MESSAGE_TYPE_TO_FORMAT: dict[type, MessageFormat] = {
+    ImageCaptureMessage: IMAGE_CAPTURE_FORMAT,
+    SeabirdCTDMessage: SEABIRD_CTD_FORMAT,
+    AanderaaCTDMessage: AANDERAA_CTD_FORMAT,
+    EcopuckMessage: ECOPUCK_FORMAT,
+    ParosciPressureMessage: PAROSCI_FORMAT,
+    TeledyneDVLMessage: TELEDYNE_DVL_FORMAT,
+    TrackLinkModemMessage: LQ_MODEM_FORMAT,
+    EvologicsModemMessage: EVOLOGICS_MODEM_FORMAT,
+    MicronSonarMessage: MICRON_FORMAT,
+    MicronTraceMessage: MICRON_TRACE_FORMAT,
+    MicronSectorMessage: MICRON_SECTOR_FORMAT,
+    OASonarMessage: OAS_FORMAT,
+    GpsGsvMessage: GPS_GSV_FORMAT,
+    GpsRmcMessage: GPS_RMC_FORMAT,
+    BatteryMessage: BATTERY_FORMAT,
+    ThrusterMessage: THRUSTER_FORMAT,
+}
+
+
+def get_message_format(message_type: type) -> Optional[MessageFormat]:
+    """Returns the compiled format for the message type if the message type is
+    within the set of messages, and none otherwise."""
+    return MESSAGE_TYPE_TO_FORMAT.get(message_type)
@@ -1,15 +1,31 @@
 """Module for building protocols."""
 
-from collections import Counter
-from dataclasses import dataclass
+import re
+import time
+
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
+from pathlib import Path
 from typing import Optional, Self
 
 from typing import Any
 
+import pandas as pd
+
 from .message_interfaces import Message, MessageParser
-from .message_parsers import get_message_parser
+from .message_layouts import Tokenizer
+from .message_parsers import (
+    MessageFormat,
+    get_message_format,
+    get_message_parser,
+    parse_message_header,
+)
 from .concrete_messages import MessageHeader, get_message_type
 
+import afft.io as io
 from afft.utils.log import logger
 
 
@@ -24,12 +40,18 @@ class MessageProtocol:
         topic: str
         message_type: type
         message_parser: MessageParser
+        message_format: MessageFormat
 
     items: dict[str, Item]
+    # Topics of the items, for prefiltering lines by topic
+    topics: frozenset[str] = field(init=False)
+
+    def __post_init__(self: Self) -> None:
+        self.topics = frozenset(self.items)
 
     def has_topic(self: Self, topic: str) -> bool:
         """Returns true if the protocol contains the topic."""
-        return topic in self.items
+        return topic in self.topics
 
     def get_topic(self: Self, topic: str) -> Optional[Item]:
         """Returns the item if the topic is in the protocol."""
@@ -39,6 +61,64 @@ class MessageProtocol:
         """Returns a list of topics in the message set."""
         return list(self.items.keys())
 
+    def match_line(
+        self: Self, line: str
+    ) -> tuple[str, Optional[Item], Optional[re.Match[str]]]:
+        """Returns the topic of a line, the protocol item for the topic and the
+        match of the item pattern. The item is none if the topic is not in
+        the protocol, and the match is none if the line does not match."""
+
+        # Dispatch on the text before the first colon, so that an accepted
+        # line is matched exactly once by its compiled pattern
+        topic: str = line.partition(":")[0]
+        item: Optional[MessageProtocol.Item] = self.items.get(topic)
+
+        if item is not None:
+            match = item.message_format.pattern.match(line)
+            if match is not None and match["topic"] == topic:
+                return topic, item, match
+
+        # Otherwise let the header pattern decide the topic
+        header: MessageHeader = parse_message_header(line)
+        item = self.items.get(header.topic)
+
+        if item is None:
+            return header.topic, None, None
+
+        return header.topic, item, item.message_format.pattern.match(line)
+
+    def match_values(
+        self: Self, line: str
+    ) -> tuple[str, Optional[Item], Optional[Sequence[Any]]]:
+        """Returns the topic of a line, the protocol item for the topic and the
+        group values of the item format. Lines in the layout of a format with a
+        tokenizer are not matched by the format pattern, and lines of topics
+        that are not in the protocol are skipped without parsing the header."""
+
+        topic, _, remainder = line.partition(":")
+
+        if topic not in self.topics:
+            # The header topic ends at the first colon if it is followed by
+            # whitespace, so that unsubscribed lines are skipped without
+            # matching the header pattern
+            if remainder[:1].isspace():
+                return topic, None, None
+        else:
+            tokenizer: Optional[Tokenizer] = self.items[
+                topic
+            ].message_format.tokenizer
+            if tokenizer is not None:
+                values: Optional[Sequence[Any]] = tokenizer(line)
+                if values is not None:
+                    return topic, self.items[topic], values
+
+        topic, item, match = self.match_line(line)
+
+        if item is None or match is None:
+            return topic, item, None
+
+        return topic, item, match.group(*item.message_format.groups)
+
 
 def build_message_protocol(topic_to_name: dict[str, str]) -> MessageProtocol:
     """Builds a protocol from a mapping from topic to a string representation of a message type."""
@@ -53,68 +133,495 @@ def build_message_protocol(topic_to_name: dict[str, str]) -> MessageProtocol:
         message_parser: Optional[MessageParser] = get_message_parser(
             message_type
         )
+        message_format: Optional[MessageFormat] = get_message_format(
+            message_type
+        )
 
-        if not message_type or not message_parser:
+        if not message_type or not message_parser or not message_format:
             continue
 
-        items.append(MessageProtocol.Item(topic, message_type, message_parser))
+        items.append(
+            MessageProtocol.Item(
+                topic, message_type, message_parser, message_format
+            )
+        )
 
     return MessageProtocol({item.topic: item for item in items})
 
 
-def parse_message_lines(
-    lines: list[str], topic_types: dict[str, str]
-) -> dict[str, list[Message[Any, Any]]]:
-    """Parses lines as message types in the given protocol."""
+type StatisticsHook = Callable[["ParseStatistics"], None]
 
-    protocol: MessageProtocol = build_message_protocol(topic_types)
-    message_groups: dict[str, list[Message[Any, Any]]] = dict()
-    skipped: Counter[str] = Counter()
-    failed: Counter[str] = Counter()
 
-    header_parser: MessageParser | None = get_message_parser(MessageHeader)
-    assert header_parser is not None
+# Hooks that are called with the statistics of every finished parse
+STATISTICS_HOOKS: list[StatisticsHook] = list()
+
+
+@dataclass
+class ParseStatistics:
+    """Class representing counters of skipped, failed and decimated message
+    lines. If the statistics are measured, the parsed lines, the bytes of the
+    lines and the parse time of the lines of every topic in the protocol are
+    counted too. Measuring times every line, so it is only done on
+    request."""
+
+    skipped: Counter[str] = field(default_factory=Counter)
+    failed: Counter[str] = field(default_factory=Counter)
+    decimated: Counter[str] = field(default_factory=Counter)
+    measured: bool = False
+    parsed: Counter[str] = field(default_factory=Counter)
+    line_bytes: Counter[str] = field(default_factory=Counter)
+    seconds: defaultdict[str, float] = field(
+        default_factory=lambda: defaultdict(float)
+    )
+
+    def update(self: Self, other: "ParseStatistics") -> None:
+        """Adds the counters of another set of statistics."""
+        self.skipped.update(other.skipped)
+        self.failed.update(other.failed)
+        self.decimated.update(other.decimated)
+        self.parsed.update(other.parsed)
+        self.line_bytes.update(other.line_bytes)
+        for topic, seconds in other.seconds.items():
+            self.seconds[topic] += seconds
+        self.measured = self.measured or other.measured
+
+    def publish(self: Self) -> None:
+        """Calls the subscribed hooks with the statistics."""
+        for hook in STATISTICS_HOOKS:
+            hook(self)
+
+    def to_records(self: Self) -> list[dict[str, Any]]:
+        """Returns the metrics of every topic as records, ordered by parse
+        time so that the topics that dominate the runtime come first. The
+        mean time is per parsed or failed line."""
+        topics: dict[str, None] = dict.fromkeys(
+            sorted(
+                self.parsed.keys() | self.failed.keys(),
+                key=lambda topic: (-self.seconds.get(topic, 0.0), topic),
+            )
+        )
+        topics.update(dict.fromkeys(sorted(self.decimated)))
+        topics.update(dict.fromkeys(sorted(self.skipped)))
+
+        records: list[dict[str, Any]] = list()
+        for topic in topics:
+            measured: int = self.parsed[topic] + self.failed[topic]
+            seconds: float = self.seconds.get(topic, 0.0)
+            records.append(
+                {
+                    "topic": topic,
+                    "lines": measured
+                    + self.decimated[topic]
+                    + self.skipped[topic],
+                    "parsed": self.parsed[topic],
+                    "failed": self.failed[topic],
+                    "skipped": self.skipped[topic],
+                    "decimated": self.decimated[topic],
+                    "bytes": self.line_bytes[topic],
+                    "seconds": seconds,
+                    "mean_seconds": seconds / measured if measured else 0.0,
+                }
+            )
+        return records
+
+    def write_report(self: Self, path: Path) -> Path:
+        """Writes the topic metrics to a CSV file, or to a config file such as
+        JSON under a topics key."""
+        records: list[dict[str, Any]] = self.to_records()
+        if path.suffix.lower() == ".csv":
+            io.write_table(pd.DataFrame.from_records(records), path)
+            return path
+        return io.write_config({"topics": records}, path, "wb")
+
+    def log(self: Self) -> None:
+        """Logs a warning with the skipped and failed messages per topic, and
+        the decimated messages per topic."""
+
+        if self.skipped:
+            logger.warning(
+                "Skipped messages with no protocol item ({} topics, {} total):{}".format(
+                    len(self.skipped),
+                    sum(self.skipped.values()),
+                    "".join(
+                        f"\n  {topic}: {count}"
+                        for topic, count in sorted(self.skipped.items())
+                    ),
+                )
+            )
+
+        if self.failed:
+            logger.warning(
+                "Failed to parse messages ({} topics, {} total):{}".format(
+                    len(self.failed),
+                    sum(self.failed.values()),
+                    "".join(
+                        f"\n  {topic}: {count}"
+                        for topic, count in sorted(self.failed.items())
+                    ),
+                )
+            )
+
+        if self.decimated:
+            logger.info(
+                "Decimated messages ({} topics, {} total):{}".format(
+                    len(self.decimated),
+                    sum(self.decimated.values()),
+                    "".join(
+                        f"\n  {topic}: {count}"
+                        for topic, count in sorted(self.decimated.items())
+                    ),
+                )
+            )
+
+
+def create_parse_statistics(measured: bool = False) -> ParseStatistics:
+    """Creates statistics that are measured if requested, or if any hooks are
+    subscribed to the statistics of finished parses."""
+    return ParseStatistics(measured=measured or bool(STATISTICS_HOOKS))
+
+
+def subscribe_parse_statistics(hook: StatisticsHook) -> None:
+    """Subscribes a hook to the measured statistics of every finished parse,
+    e.g. to collect per-topic metrics of the parses of a task."""
+    STATISTICS_HOOKS.append(hook)
+
+
+def unsubscribe_parse_statistics(hook: StatisticsHook) -> None:
+    """Unsubscribes a hook from the statistics of finished parses."""
+    STATISTICS_HOOKS.remove(hook)
+
+
+def iter_messages(
+    lines: Iterable[str],
+    protocol: MessageProtocol,
+    statistics: Optional[ParseStatistics] = None,
+) -> Iterator[tuple[str, Message[Any, Any]]]:
+    """Lazily parses lines as message types in the protocol, and yields the
+    topic and message of every parsed line. Skipped and failed lines are
+    counted in the statistics, if given."""
+
+    if statistics is None:
+        statistics = ParseStatistics()
+
+    if statistics.measured:
+        yield from _iter_measured_messages(lines, protocol, statistics)
+        return
+
+    skipped: Counter[str] = statistics.skipped
+    failed: Counter[str] = statistics.failed
 
     for line in lines:
-        header: MessageHeader = header_parser(line)
-        item: MessageProtocol.Item | None = protocol.get_topic(header.topic)
+        topic, item, values = protocol.match_values(line)
 
         if item is None:
-            skipped[header.topic] += 1
+            skipped[topic] += 1
+            continue
+
+        if values is None:
+            failed[topic] += 1
             continue
 
         try:
-            parsed_message: Message[Any, Any] = item.message_parser(line)
+            parsed_message: Message[Any, Any] = (
+                item.message_format.build_values(values)
+            )
         except ValueError:
-            failed[header.topic] += 1
+            failed[topic] += 1
             continue
 
-        if header.topic not in message_groups:
-            message_groups[header.topic] = list()
-        message_groups[header.topic].append(parsed_message)
-
-    if skipped:
-        logger.warning(
-            "Skipped messages with no protocol item ({} topics, {} total):{}".format(
-                len(skipped),
-                sum(skipped.values()),
-                "".join(
-                    f"\n  {topic}: {count}"
-                    for topic, count in sorted(skipped.items())
-                ),
-            )
+        yield topic, parsed_message
+
+
+def _iter_measured_messages(
+    lines: Iterable[str],
+    protocol: MessageProtocol,
+    statistics: ParseStatistics,
+) -> Iterator[tuple[str, Message[Any, Any]]]:
+    """Parses lines like iter_messages, and measures the parsed lines, bytes
+    and parse time of every topic in the protocol."""
+
+    skipped: Counter[str] = statistics.skipped
+    failed: Counter[str] = statistics.failed
+    clock: Callable[[], float] = time.perf_counter
+
+    for line in lines:
+        start: float = clock()
+        topic, item, values = protocol.match_values(line)
+
+        if item is None:
+            skipped[topic] += 1
+            continue
+
+        parsed_message: Optional[Message[Any, Any]] = None
+        if values is not None:
+            try:
+                parsed_message = item.message_format.build_values(values)
+            except ValueError:
+                pass
+
+        statistics.seconds[topic] += clock() - start
+        statistics.line_bytes[topic] += len(line) + 1
+
+        if parsed_message is None:
+            failed[topic] += 1
+            continue
+
+        statistics.parsed[topic] += 1
+        yield topic, parsed_message
+
+
+def iter_message_lines(
+    path: Path,
+    protocol: MessageProtocol,
+    statistics: Optional[ParseStatistics] = None,
+) -> Iterator[tuple[str, Message[Any, Any]]]:
+    """Lazily reads and parses the lines of a message file, and yields the
+    topic and message of every parsed line. Lines of topics that are not in
+    the protocol are skipped before they are decoded."""
+    if statistics is None:
+        statistics = ParseStatistics()
+
+    lines: Iterator[str] = io.iter_topic_lines(
+        path, protocol.topics, statistics.skipped
+    )
+    return iter_messages(lines, protocol, statistics)
+
+
+def iter_message_batches(
+    path: Path,
+    protocol: MessageProtocol,
+    batch_size: int,
+    statistics: Optional[ParseStatistics] = None,
+) -> Iterator[tuple[str, list[Message[Any, Any]]]]:
+    """Lazily reads and parses the lines of a message file, and yields per-topic
+    batches of at most batch_size messages. Batches are yielded as soon as
+    they are full, and the remaining partial batches are yielded at the end
+    of the file in order of first appearance."""
+    return batch_messages(
+        iter_message_lines(path, protocol, statistics), batch_size
+    )
+
+
+def batch_messages(
+    messages: Iterable[tuple[str, Message[Any, Any]]], batch_size: int
+) -> Iterator[tuple[str, list[Message[Any, Any]]]]:
+    """Lazily groups topics and messages into per-topic batches of at most
+    batch_size messages, in the same order as iter_message_batches."""
+
+    if batch_size < 1:
+        raise ValueError(f"invalid batch size: {batch_size}")
+
+    return _batch_messages(messages, batch_size)
+
+
+def _batch_messages(
+    messages: Iterable[tuple[str, Message[Any, Any]]], batch_size: int
+) -> Iterator[tuple[str, list[Message[Any, Any]]]]:
+    """Yields full batches as they fill up, and the partial batches at the
+    end in order of first appearance."""
+    batches: dict[str, list[Message[Any, Any]]] = dict()
+    for topic, message in messages:
+        batch: list[Message[Any, Any]] | None = batches.get(topic)
+        if batch is None:
+            batch = batches[topic] = list()
+        batch.append(message)
+        if len(batch) >= batch_size:
+            yield topic, batch
+            batches[topic] = list()
+
+    for topic, batch in batches.items():
+        if batch:
+            yield topic, batch
+
+
+# Number of chunks per worker, so that workers that finish early pick up
+# the remaining chunks
+CHUNKS_PER_WORKER: int = 4
+
+
+def map_message_chunks(
+    function: Callable[
+        [Any, dict[str, str], bool], tuple[Any, ParseStatistics]
+    ],
+    chunks: Sequence[Any],
+    topic_types: dict[str, str],
+    workers: int,
+    measured: bool = False,
+) -> tuple[list[Any], ParseStatistics]:
+    """Applies a chunk parser to every chunk in a process pool, and returns
+    the results in chunk order together with the aggregated statistics. The
+    function must be importable by the worker processes, and measures its
+    statistics if measured is true."""
+
+    if workers < 1:
+        raise ValueError(f"invalid number of workers: {workers}")
+
+    statistics: ParseStatistics = ParseStatistics(measured=measured)
+    results: list[Any] = list()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for result, chunk_statistics in executor.map(
+            function, chunks, repeat(topic_types), repeat(measured)
+        ):
+            results.append(result)
+            statistics.update(chunk_statistics)
+
+    return results, statistics
+
+
+def split_line_chunks(lines: list[str], count: int) -> list[list[str]]:
+    """Splits lines into at most count contiguous chunks of similar size."""
+    size: int = max(1, -(-len(lines) // count))
+    return [lines[start : start + size] for start in range(0, len(lines), size)]
+
+
+def group_messages(
+    lines: Iterable[str],
+    protocol: MessageProtocol,
+    statistics: Optional[ParseStatistics] = None,
+) -> dict[str, list[Message[Any, Any]]]:
+    """Parses lines as message types in the protocol, and groups the messages
+    by topic in order of first appearance."""
+
+    message_groups: dict[str, list[Message[Any, Any]]] = dict()
+
+    for topic, parsed_message in iter_messages(lines, protocol, statistics):
+        if topic not in message_groups:
+            message_groups[topic] = list()
+        message_groups[topic].append(parsed_message)
+
+    return message_groups
+
+
+def merge_message_groups(
+    chunk_groups: Iterable[dict[str, list[Message[Any, Any]]]],
+) -> dict[str, list[Message[Any, Any]]]:
+    """Merges message groups of consecutive chunks, so that topics and
+    messages are in the same order as if the chunks were parsed as one."""
+
+    message_groups: dict[str, list[Message[Any, Any]]] = dict()
+
+    for groups in chunk_groups:
+        for topic, messages in groups.items():
+            if topic not in message_groups:
+                message_groups[topic] = list()
+            message_groups[topic].extend(messages)
+
+    return message_groups
+
+
+def _group_line_chunk(
+    lines: list[str], topic_types: dict[str, str], measured: bool
+) -> tuple[dict[str, list[Message[Any, Any]]], ParseStatistics]:
+    """Groups the messages of a chunk of lines in a worker process."""
+    statistics: ParseStatistics = ParseStatistics(measured=measured)
+    protocol: MessageProtocol = build_message_protocol(topic_types)
+    return group_messages(lines, protocol, statistics), statistics
+
+
+def _group_file_range(
+    byte_range: tuple[Path, int, int],
+    topic_types: dict[str, str],
+    measured: bool,
+) -> tuple[dict[str, list[Message[Any, Any]]], ParseStatistics]:
+    """Groups the messages of a byte range of a file in a worker process."""
+    path, start, end = byte_range
+    statistics: ParseStatistics = ParseStatistics(measured=measured)
+    protocol: MessageProtocol = build_message_protocol(topic_types)
+    lines: Iterator[str] = io.iter_topic_lines(
+        path, protocol.topics, statistics.skipped, start, end
+    )
+    return group_messages(lines, protocol, statistics), statistics
+
+
+def parse_message_lines(
+    lines: Iterable[str],
+    topic_types: dict[str, str],
+    workers: int = 1,
+    statistics: Optional[ParseStatistics] = None,
+) -> dict[str, list[Message[Any, Any]]]:
+    """Parses lines as message types in the given protocol. If more than one
+    worker is given, contiguous chunks of lines are parsed in a process pool
+    and merged in line order. If statistics are given, the lines are counted
+    in them and the caller reports them, otherwise the statistics of the
+    parse are logged and published."""
+
+    reported: bool = statistics is None
+    if statistics is None:
+        statistics = create_parse_statistics()
+
+    if workers > 1:
+        chunks: list[list[str]] = split_line_chunks(
+            list(lines), workers * CHUNKS_PER_WORKER
+        )
+        results, chunk_statistics = map_message_chunks(
+            _group_line_chunk,
+            chunks,
+            topic_types,
+            workers,
+            statistics.measured,
+        )
+        statistics.update(chunk_statistics)
+        message_groups = merge_message_groups(results)
+    else:
+        protocol: MessageProtocol = build_message_protocol(topic_types)
+        message_groups = group_messages(lines, protocol, statistics)
+
+    if reported:
+        statistics.log()
+        statistics.publish()
+
+    return message_groups
+
+
+def parse_message_file(
+    path: Path,
+    topic_types: dict[str, str],
+    workers: int = 1,
+    statistics: Optional[ParseStatistics] = None,
+) -> dict[str, list[Message[Any, Any]]]:
+    """Parses the lines of a message file as message types in the given
+    protocol. If more than one worker is given, the file is split into
+    newline-aligned byte ranges that are read and parsed in a process pool,
+    so that lines are not copied between processes. Lines of topics that are
+    not in the protocol are skipped before they are decoded. Compressed files
+    cannot be split, so their lines are read before they are parsed. The
+    statistics are reported as by parse_message_lines."""
+
+    if workers > 1 and io.is_compressed(path):
+        return parse_message_lines(
+            io.read_lines(path), topic_types, workers, statistics
         )
 
-    if failed:
-        logger.warning(
-            "Failed to parse messages ({} topics, {} total):{}".format(
-                len(failed),
-                sum(failed.values()),
-                "".join(
-                    f"\n  {topic}: {count}"
-                    for topic, count in sorted(failed.items())
-                ),
+    reported: bool = statistics is None
+    if statistics is None:
+        statistics = create_parse_statistics()
+
+    if workers > 1:
+        byte_ranges: list[tuple[Path, int, int]] = [
+            (path, start, end)
+            for start, end in io.split_line_ranges(
+                path, workers * CHUNKS_PER_WORKER
             )
+        ]
+        results, chunk_statistics = map_message_chunks(
+            _group_file_range,
+            byte_ranges,
+            topic_types,
+            workers,
+            statistics.measured,
         )
+        statistics.update(chunk_statistics)
+        message_groups = merge_message_groups(results)
+    else:
+        protocol: MessageProtocol = build_message_protocol(topic_types)
+        lines: Iterator[str] = io.iter_topic_lines(
+            path, protocol.topics, statistics.skipped
+        )
+        message_groups = group_messages(lines, protocol, statistics)
+
+    if reported:
+        statistics.log()
+        statistics.publish()
 
     return message_groups
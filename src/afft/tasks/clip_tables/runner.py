@@ -5,13 +5,15 @@ from pathlib import Path
 import pandas as pd
 from tqdm import tqdm
 
+import afft.io as io
+
 from afft.utils.log import logger
 
 from .types import ClipTableResult, ClipTablesCommand
 
 
 def run_clip_tables(command: ClipTablesCommand) -> None:
-    """Read CSV files from source_dir, clip rows to [start, end], write to output_dir."""
+    """Read table files from source_dir, clip rows to [start, end], write to output_dir."""
     files: list[Path] = sorted(command.source_dir.glob(command.pattern))
 
     if command.start >= command.end:
@@ -34,16 +36,14 @@ def run_clip_tables(command: ClipTablesCommand) -> None:
     progress: tqdm = tqdm(files, unit="table")
     for file in progress:
         progress.set_description(file.stem)
-        df: pd.DataFrame = pd.read_csv(
-            file, parse_dates=[command.timestamp_column]
-        )
+        df: pd.DataFrame = io.read_table(file, [command.timestamp_column])
         rows_in = len(df)
         mask = (df[command.timestamp_column] >= command.start) & (
             df[command.timestamp_column] <= command.end
         )
         clipped: pd.DataFrame = df[mask]
         dest = command.output_dir / file.name
-        clipped.to_csv(dest, index=False)
+        io.write_table(clipped, dest)
         results.append(
             ClipTableResult(
                 file=file,
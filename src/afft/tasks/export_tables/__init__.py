@@ -0,0 +1,7 @@
+"""Package for exporting database tables as table files."""
+
+from .runner import run_export_tables as run_export_tables
+from .types import ExportTableResult as ExportTableResult
+from .types import ExportTablesCommand as ExportTablesCommand
+
+__all__ = []
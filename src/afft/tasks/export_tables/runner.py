@@ -0,0 +1,127 @@
+"""Runner for the table export task."""
+
+import time
+
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+import sqlalchemy as sqla
+from tqdm import tqdm
+
+import afft.database as db
+import afft.io as io
+
+from afft.utils.log import logger
+
+from .types import ExportTableResult, ExportTablesCommand
+
+
+def run_export_tables(
+    command: ExportTablesCommand,
+) -> list[ExportTableResult]:
+    """Export database tables to files in the output directory, with up to
+    jobs tables at a time on the connections of a shared pool. Every table is
+    streamed in chunks of rows. Tables that fail are reported rather than
+    stopping the export."""
+    if command.jobs < 1:
+        raise ValueError(f"invalid number of jobs: {command.jobs}")
+    if not command.output_dir.is_dir():
+        raise ValueError(
+            f"output directory does not exist: {command.output_dir}"
+        )
+
+    engine: db.Engine = db.connect_database(
+        command.database,
+        command.host,
+        command.port,
+        command.driver,
+        db.EngineOptions(
+            pool_size=max(command.jobs, db.EngineOptions().pool_size)
+        ),
+    )
+
+    available: list[str] = sqla.inspect(engine).get_table_names()
+    targets: list[str] = list(command.tables) if command.tables else available
+
+    unknown: list[str] = [table for table in targets if table not in available]
+    if unknown:
+        raise ValueError(f"tables not found in database: {unknown}")
+
+    results: list[ExportTableResult] = list()
+    rows: int = 0
+    with ThreadPoolExecutor(max_workers=command.jobs) as executor:
+        futures: list[Future[ExportTableResult]] = [
+            executor.submit(_export_table, engine, table, command)
+            for table in targets
+        ]
+        progress: tqdm = tqdm(
+            as_completed(futures), total=len(futures), unit="table"
+        )
+        for future in progress:
+            result: ExportTableResult = future.result()
+            results.append(result)
+            rows += result.rows
+            progress.set_postfix(table=result.table, rows=rows)
+
+    results.sort(key=lambda result: result.table)
+    _log_export_report(results)
+    return results
+
+
+def _export_table(
+    engine: db.Engine, table: str, command: ExportTablesCommand
+) -> ExportTableResult:
+    """Streams a database table to a file. Errors are returned in the
+    result."""
+    destination = io.get_table_path(
+        command.output_dir, table, command.output_format
+    )
+    start: float = time.perf_counter()
+    try:
+        chunks = db.iter_database_table(
+            engine,
+            table,
+            command.columns,
+            command.start,
+            command.end,
+            command.time_column,
+            command.chunk_rows,
+        )
+        rows: int = io.write_table_chunks(chunks, destination)
+    except Exception as error:
+        destination.unlink(missing_ok=True)
+        return ExportTableResult(
+            table=table,
+            file=destination,
+            error=f"{type(error).__name__}: {error}",
+        )
+
+    return ExportTableResult(
+        table=table,
+        file=destination,
+        rows=rows,
+        seconds=time.perf_counter() - start,
+    )
+
+
+def _log_export_report(results: list[ExportTableResult]) -> None:
+    """Logs the rows and throughput of every exported table, and the tables
+    that failed."""
+    logger.info("Export summary:")
+    for result in results:
+        if result.error is not None:
+            logger.info(f"  {result.table}: FAILED ({result.error})")
+            continue
+        rate: float = result.rows / result.seconds if result.seconds else 0.0
+        logger.info(
+            f"  {result.table} -> {result.file.name}: {result.rows} rows "
+            f"({rate:,.0f} rows/s)"
+        )
+
+    failures: list[ExportTableResult] = [
+        result for result in results if result.error is not None
+    ]
+    if failures:
+        logger.warning(
+            f"Failed to export {len(failures)} of {len(results)} tables: "
+            + ", ".join(result.table for result in failures)
+        )
@@ -0,0 +1,34 @@
+"""Data types for the table export task."""
+
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from afft.database import READ_CHUNK_ROWS
+from afft.io import TableFormat
+
+
+@dataclass(slots=True, frozen=True)
+class ExportTablesCommand:
+    output_dir: Path
+    database: str
+    host: str | None = None
+    port: int | None = None
+    driver: str = "postgresql"
+    tables: tuple[str, ...] = ()
+    output_format: TableFormat = TableFormat.CSV
+    columns: tuple[str, ...] = ()
+    start: datetime | None = None
+    end: datetime | None = None
+    time_column: str = "timestamp"
+    chunk_rows: int = READ_CHUNK_ROWS
+    jobs: int = 1
+
+
+@dataclass(slots=True, frozen=True)
+class ExportTableResult:
+    table: str
+    file: Path
+    rows: int = 0
+    seconds: float = 0.0
+    error: str | None = None
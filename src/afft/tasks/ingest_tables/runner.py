@@ -1,32 +1,28 @@
 """Runner for the table ingestion task."""
 
-from pathlib import Path
+import time
 
-from afft.env import requireenv
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Literal
 
 import pandas as pd
 from tqdm import tqdm
 
 import afft.database as db
+import afft.io as io
 
 from afft.utils.log import logger
 
 from .types import IngestTableResult, IngestTablesCommand
 
 
-def run_ingest_tables(command: IngestTablesCommand) -> None:
-    """Read CSV files from a directory and ingest each as a database table."""
-    engine: db.Engine | str = db.create_engine(
-        database=command.database,
-        host=command.host,
-        port=command.port,
-        username=requireenv("PG_USERNAME"),
-        password=requireenv("PG_PASSWORD"),
-    )
-
-    assert isinstance(engine, db.Engine), (
-        f"error while connecting to engine: {engine}"
-    )
+def run_ingest_tables(command: IngestTablesCommand) -> list[IngestTableResult]:
+    """Read table files from a directory and ingest each as a database table,
+    with up to jobs tables at a time on the connections of a shared pool.
+    Tables that fail are reported rather than stopping the ingestion."""
+    if command.jobs < 1:
+        raise ValueError(f"invalid number of jobs: {command.jobs}")
 
     files: list[Path] = sorted(command.source_dir.glob(command.pattern))
 
@@ -35,24 +31,93 @@ def run_ingest_tables(command: IngestTablesCommand) -> None:
             f"no files matching '{command.pattern}' in {command.source_dir}"
         )
 
-    if_exists: str = "replace" if command.overwrite else "fail"
+    engine: db.Engine = db.connect_database(
+        command.database,
+        command.host,
+        command.port,
+        command.driver,
+        db.EngineOptions(
+            pool_size=max(command.jobs, db.EngineOptions().pool_size)
+        ),
+    )
 
     results: list[IngestTableResult] = []
-
-    progress: tqdm = tqdm(files, unit="table")
-    for file in progress:
-        progress.set_description(file.stem)
-        df: pd.DataFrame = pd.read_csv(
-            file, parse_dates=list(command.timestamp_columns)
-        )
-        df.to_sql(file.stem, con=engine, if_exists=if_exists, index=False)
-        results.append(
-            IngestTableResult(file=file, table=file.stem, rows=len(df))
+    rows: int = 0
+    start: float = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=command.jobs) as executor:
+        futures: list[Future[IngestTableResult]] = [
+            executor.submit(_ingest_table, engine, file, command)
+            for file in files
+        ]
+        progress: tqdm = tqdm(
+            as_completed(futures), total=len(futures), unit="table"
         )
+        for future in progress:
+            result: IngestTableResult = future.result()
+            results.append(result)
+            rows += result.rows
+            progress.set_postfix(table=result.table, rows=rows)
+    seconds: float = time.perf_counter() - start
+
+    results.sort(key=lambda result: result.file)
 
     if command.verbose:
         logger.info("Ingestion summary:")
         for result in results:
+            if result.error is not None:
+                logger.info(
+                    f"  {result.file.name} -> {result.table}: FAILED "
+                    f"({result.error})"
+                )
+                continue
+            rate: float = (
+                result.rows / result.seconds if result.seconds else 0.0
+            )
             logger.info(
-                f"  {result.file.name} -> {result.table}: {result.rows} rows"
+                f"  {result.file.name} -> {result.table}: {result.rows} rows "
+                f"({rate:,.0f} rows/s)"
             )
+
+    logger.info(
+        f"Ingested {rows} rows into {len(results)} tables in {seconds:.1f} s "
+        f"({rows / seconds if seconds else 0.0:,.0f} rows/s)"
+    )
+
+    failures: list[IngestTableResult] = [
+        result for result in results if result.error is not None
+    ]
+    if failures:
+        logger.warning(
+            f"Failed to ingest {len(failures)} of {len(results)} tables: "
+            + ", ".join(result.table for result in failures)
+        )
+
+    return results
+
+
+def _ingest_table(
+    engine: db.Engine, file: Path, command: IngestTablesCommand
+) -> IngestTableResult:
+    """Reads a table file and loads it into a database table. Errors are
+    returned in the result."""
+    if_exists: Literal["fail", "replace"] = (
+        "replace" if command.overwrite else "fail"
+    )
+    try:
+        df: pd.DataFrame = io.format_array_columns(
+            io.read_table(file, command.timestamp_columns)
+        )
+        load: db.LoadResult = db.load_database_table(
+            engine, file.stem, df, if_exists
+        )
+    except Exception as error:
+        return IngestTableResult(
+            file=file,
+            table=file.stem,
+            rows=0,
+            error=f"{type(error).__name__}: {error}",
+        )
+
+    return IngestTableResult(
+        file=file, table=file.stem, rows=load.rows, seconds=load.seconds
+    )
@@ -10,10 +10,12 @@ class IngestTablesCommand:
     database: str
     host: str
     port: int
+    driver: str = "postgresql"
     pattern: str = "*.csv"
     overwrite: bool = False
     verbose: bool = False
     timestamp_columns: tuple[str, ...] = ("timestamp",)
+    jobs: int = 1
 
 
 @dataclass(slots=True, frozen=True)
@@ -21,3 +23,5 @@ class IngestTableResult:
     file: Path
     table: str
     rows: int
+    seconds: float = 0.0
+    error: str | None = None
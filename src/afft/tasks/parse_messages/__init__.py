@@ -1,6 +1,12 @@
 """Package for parsing AUV messages and ingesting them into a database."""
 
+from .runner import run_index_messages as run_index_messages
+from .runner import run_parse_deployments as run_parse_deployments
 from .runner import run_parse_messages as run_parse_messages
+from .types import IndexMessageCommand as IndexMessageCommand
+from .types import ParseBackend as ParseBackend
+from .types import ParseDeploymentResult as ParseDeploymentResult
+from .types import ParseDeploymentsCommand as ParseDeploymentsCommand
 from .types import ParseMessageCommand as ParseMessageCommand
 from .types import ParseMessageConfig as ParseMessageConfig
 
@@ -0,0 +1,161 @@
+"""Content-addressed cache of parsed message tables."""
+
+import hashlib
+import json
+import os
+import shutil
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Self
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from afft.env import getenv, getenv_int
+from afft.utils.log import logger
+
+
+MANIFEST_FILE: str = "manifest.json"
+
+DEFAULT_CACHE_DIR: Path = Path.home() / ".cache" / "afft" / "messages"
+DEFAULT_CACHE_BYTES: int = 10 * 1024**3
+
+
+def hash_file(path: Path) -> str:
+    """Returns the hex digest of the content of a file."""
+    with open(path, "rb") as filehandle:
+        return hashlib.file_digest(filehandle, "blake2b").hexdigest()
+
+
+def hash_object(value: Any) -> str:
+    """Returns the hex digest of the canonical JSON of a value."""
+    data: bytes = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+@dataclass
+class MessageTableCache:
+    """Class representing a cache of per-topic message tables, stored as
+    Parquet files in a directory per key. Entries are evicted in least
+    recently used order once the cache exceeds its size limit."""
+
+    directory: Path
+    max_bytes: int = DEFAULT_CACHE_BYTES
+
+    def read(self: Self, key: str) -> dict[str, pa.Table] | None:
+        """Returns the tables of a key, or none if the key is not cached."""
+        entry: Path = self.directory / key
+        manifest: Path = entry / MANIFEST_FILE
+        if not manifest.is_file():
+            return None
+
+        try:
+            topics: dict[str, str] = json.loads(manifest.read_text())["topics"]
+            tables: dict[str, pa.Table] = {
+                topic: pq.read_table(entry / filename)
+                for topic, filename in topics.items()
+            }
+        except (OSError, KeyError, ValueError, pa.ArrowException) as error:
+            logger.warning(f"discarding invalid cache entry {key}: {error}")
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+        # Mark the entry as recently used
+        os.utime(manifest)
+        return tables
+
+    def read_counters(self: Self, key: str) -> dict[str, dict[str, int]]:
+        """Returns the line counters that were cached with the tables of a
+        key, e.g. the skipped lines per topic. Entries without counters have
+        no counters."""
+        manifest: Path = self.directory / key / MANIFEST_FILE
+        try:
+            counters: dict[str, dict[str, int]] = json.loads(
+                manifest.read_text()
+            ).get("counters", {})
+        except (OSError, ValueError):
+            return {}
+        return counters
+
+    def write(
+        self: Self,
+        key: str,
+        tables: dict[str, pa.Table],
+        counters: dict[str, dict[str, int]] | None = None,
+    ) -> None:
+        """Writes the tables of a key with optional line counters, and evicts
+        the least recently used entries if the cache exceeds its size
+        limit."""
+        entry: Path = self.directory / key
+        staging: Path = self.directory / f".{key}.{os.getpid()}"
+
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+
+        topics: dict[str, str] = dict()
+        for number, (topic, table) in enumerate(tables.items()):
+            filename: str = f"{number:04d}.parquet"
+            pq.write_table(table, staging / filename)
+            topics[topic] = filename
+
+        # The manifest is written last, so that partial entries are not read
+        (staging / MANIFEST_FILE).write_text(
+            json.dumps({"topics": topics, "counters": counters or {}})
+        )
+
+        shutil.rmtree(entry, ignore_errors=True)
+        try:
+            staging.rename(entry)
+        except OSError:
+            # Another process cached the same key first
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+
+        self.evict(keep=key)
+
+    def evict(self: Self, keep: str | None = None) -> None:
+        """Removes the least recently used entries until the cache is within
+        its size limit. The kept entry is not removed."""
+        entries: list[tuple[float, int, Path]] = list()
+        for entry in self.directory.iterdir():
+            manifest: Path = entry / MANIFEST_FILE
+            if not manifest.is_file():
+                continue
+            size: int = sum(
+                path.stat().st_size
+                for path in entry.iterdir()
+                if path.is_file()
+            )
+            entries.append((manifest.stat().st_mtime, size, entry))
+
+        total: int = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if entry.name == keep:
+                continue
+            logger.info(f"Evicting cached tables: {entry.name}")
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+        if total > self.max_bytes:
+            logger.warning(
+                f"cached tables exceed the cache limit: {total} > "
+                f"{self.max_bytes} bytes"
+            )
+
+
+def create_table_cache() -> MessageTableCache:
+    """Creates a cache in the directory of AFFT_CACHE_DIR, limited to
+    AFFT_CACHE_MAX_BYTES, with defaults if the variables are not set."""
+    directory: str | None = getenv("AFFT_CACHE_DIR")
+    max_bytes: int | None = getenv_int(
+        "AFFT_CACHE_MAX_BYTES", DEFAULT_CACHE_BYTES
+    )
+    assert max_bytes is not None, "cache limit is required"
+
+    return MessageTableCache(
+        directory=Path(directory) if directory else DEFAULT_CACHE_DIR,
+        max_bytes=max_bytes,
+    )
@@ -1,24 +1,53 @@
 """Runner for the message parsing task."""
 
-from collections.abc import Iterable, Mapping
+import os
+import signal
+import threading
+
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
 import pandas as pd
+import polars as pl
+import pyarrow as pa
+
+from tqdm import tqdm
 
 import afft.database as db
 import afft.io as io
 import afft.sirius as sirius
-from afft.env import requireenv
 
 from afft.utils.log import logger
 
-from .types import ParseMessageCommand, ParseMessageConfig
+from .cache import (
+    MessageTableCache,
+    create_table_cache,
+    hash_file,
+    hash_object,
+)
+from .types import (
+    IndexMessageCommand,
+    ParseBackend,
+    ParseDeploymentResult,
+    ParseDeploymentsCommand,
+    ParseMessageCommand,
+    ParseMessageConfig,
+)
 
 
 type Topic = str
-type Messages = Iterable[sirius.Message[Any, Any]]
-type MessageGroups = Mapping[Topic, Messages]
+type Messages = list[sirius.Message[Any, Any]]
+type MessageGroups = dict[Topic, Messages]
 
 
 def run_parse_messages(command: ParseMessageCommand) -> None:
@@ -27,14 +56,369 @@ def run_parse_messages(command: ParseMessageCommand) -> None:
     raw_config: dict[str, Any] = io.read_config(command.config_file)
     config = _load_config(raw_config)
 
-    messages = _parse_messages(command.source_file, config)
-    dataframes = _build_dataframes(messages, config, command.prefix)
+    if command.metrics_file is None:
+        _run_parse_messages(command, config)
+        return
+
+    # Collect the statistics of every parse of the task, which are measured
+    # while a hook is subscribed
+    metrics = sirius.ParseStatistics(measured=True)
+    sirius.subscribe_parse_statistics(metrics.update)
+    try:
+        _run_parse_messages(command, config)
+    finally:
+        sirius.unsubscribe_parse_statistics(metrics.update)
+
+    metrics.write_report(command.metrics_file)
+    logger.info(f"Wrote parse metrics to {command.metrics_file}")
+
+
+def _run_parse_messages(
+    command: ParseMessageCommand, config: ParseMessageConfig
+) -> None:
+    if command.merge_files:
+        if command.follow or command.workers > 1:
+            raise ValueError(
+                "merged files do not support following or multiple workers"
+            )
+        if command.topics or command.start or command.end:
+            raise ValueError(
+                "merged files do not support topic or time selection"
+            )
+        if command.backend == ParseBackend.POLARS:
+            raise ValueError(
+                f"merged files are not supported by backend: {command.backend}"
+            )
+
+    if command.follow:
+        if command.backend != ParseBackend.OBJECTS:
+            raise ValueError(
+                f"following is not supported by backend: {command.backend}"
+            )
+        if command.batch_size is not None or command.workers > 1:
+            raise ValueError(
+                "following does not support batches or multiple workers"
+            )
+        if command.topics or command.start or command.end:
+            raise ValueError(
+                "following does not support topic or time selection"
+            )
+        if command.output_format != io.TableFormat.CSV:
+            raise ValueError(
+                f"following does not support output format: "
+                f"{command.output_format}"
+            )
+        _follow_messages(command, config)
+        return
+
+    if command.batch_size is not None:
+        if command.backend != ParseBackend.OBJECTS:
+            raise ValueError(
+                f"batched parsing is not supported by backend: {command.backend}"
+            )
+        if command.workers > 1:
+            raise ValueError(
+                "batched parsing does not support multiple workers"
+            )
+        if command.output_format != io.TableFormat.CSV:
+            raise ValueError(
+                f"batched parsing does not support output format: "
+                f"{command.output_format}"
+            )
+        _stream_messages(command, config, _select_lines(command, config))
+        return
+
+    # Metrics are measured while parsing, so cached tables are not read
+    if command.use_cache and command.metrics_file is None:
+        tables = _parse_tables_cached(command, config, create_table_cache())
+    else:
+        statistics = sirius.create_parse_statistics()
+        tables = _parse_tables(command, config, statistics)
+        statistics.log()
+        statistics.publish()
+
+    outputs = _build_output_tables(tables, config, command.prefix)
 
     if command.database:
-        _insert_dataframes(command, dataframes)
+        _insert_tables(_create_engine(command), outputs, command.output_jobs)
 
     if command.output_dir:
-        _export_dataframes(command.output_dir, dataframes)
+        _export_tables(
+            command.output_dir,
+            outputs,
+            command.output_format,
+            command.output_jobs,
+        )
+
+
+def run_parse_deployments(
+    command: ParseDeploymentsCommand,
+) -> list[ParseDeploymentResult]:
+    """Parse the message files of many deployments in a process pool, and
+    write the tables of every deployment with the deployment prefix. Every
+    worker loads the protocol and connects to the database once, and reuses
+    them for the deployments it parses. Deployments that fail are reported
+    rather than stopping the batch."""
+    config = _load_config(io.read_config(command.config_file))
+
+    if command.backend == ParseBackend.POLARS:
+        raise ValueError(
+            f"deployment batches are not supported by backend: {command.backend}"
+        )
+    if command.jobs < 1:
+        raise ValueError(f"invalid number of jobs: {command.jobs}")
+    if command.output_dir and not command.output_dir.is_dir():
+        raise ValueError(
+            f"output directory does not exist: {command.output_dir}"
+        )
+
+    deployments: dict[str, list[Path]] = _list_deployments(command)
+
+    results: list[ParseDeploymentResult] = list()
+    with ProcessPoolExecutor(
+        max_workers=min(command.jobs, len(deployments)),
+        initializer=_start_deployment_worker,
+        initargs=(command, config),
+    ) as executor:
+        futures: list[Future[ParseDeploymentResult]] = [
+            executor.submit(_parse_deployment, source_files, prefix)
+            for prefix, source_files in deployments.items()
+        ]
+        for future in tqdm(
+            as_completed(futures), total=len(futures), unit="deployment"
+        ):
+            results.append(future.result())
+
+    results.sort(key=lambda result: result.prefix)
+    _log_deployment_report(results)
+    return results
+
+
+def get_deployment_prefix(source_file: Path) -> str:
+    """Returns the table prefix of a deployment message file, i.e. the file
+    name without suffixes and without a trailing "_messages"."""
+    return source_file.name.split(".")[0].removesuffix("_messages")
+
+
+def _list_deployments(
+    command: ParseDeploymentsCommand,
+) -> dict[str, list[Path]]:
+    """Lists the message files of the deployments by prefix. The source is
+    either a directory searched with the pattern, or a deployment list with
+    a message file and an optional prefix per line. Relative paths in a
+    list are relative to the list. Files with the same prefix are parts of
+    one deployment, and are merged in time order."""
+    deployments: list[tuple[str, Path]] = list()
+
+    if command.source.is_dir():
+        deployments = [
+            (get_deployment_prefix(path), path)
+            for path in sorted(command.source.glob(command.pattern))
+        ]
+    else:
+        for line in io.read_lines(command.source):
+            fields: list[str] = line.split("#", 1)[0].split()
+            if not fields:
+                continue
+            if len(fields) > 2:
+                raise ValueError(f"invalid deployment list line: {line}")
+            path: Path = command.source.parent / fields[0]
+            prefix: str = (
+                fields[1] if len(fields) == 2 else get_deployment_prefix(path)
+            )
+            deployments.append((prefix, path))
+
+    if not deployments:
+        raise FileNotFoundError(f"no deployments in source: {command.source}")
+
+    selected: dict[str, list[Path]] = dict()
+    for prefix, path in deployments:
+        if not path.is_file():
+            raise FileNotFoundError(f"missing deployment message file: {path}")
+        selected.setdefault(prefix, list()).append(path)
+
+    return selected
+
+
+@dataclass
+class _DeploymentWorker:
+    """Class representing the state that a deployment worker process shares
+    between the deployments it parses."""
+
+    command: ParseDeploymentsCommand
+    config: ParseMessageConfig
+    protocol: sirius.MessageProtocol
+    engine: db.Engine | None
+    cache: MessageTableCache | None
+
+
+_deployment_worker: _DeploymentWorker | None = None
+
+
+def _start_deployment_worker(
+    command: ParseDeploymentsCommand, config: ParseMessageConfig
+) -> None:
+    """Initializes the shared state of a deployment worker process."""
+    global _deployment_worker
+    _deployment_worker = _DeploymentWorker(
+        command=command,
+        config=config,
+        protocol=sirius.build_message_protocol(config.message_maps),
+        engine=_create_engine(command) if command.database else None,
+        cache=create_table_cache() if command.use_cache else None,
+    )
+
+
+def _parse_deployment(
+    source_files: list[Path], prefix: str
+) -> ParseDeploymentResult:
+    """Parses the message files of a deployment and writes its tables with
+    the shared state of the worker. Errors are returned in the result."""
+    worker: _DeploymentWorker | None = _deployment_worker
+    assert worker is not None, "deployment worker is not started"
+
+    statistics = sirius.ParseStatistics()
+    try:
+        key: str = _get_cache_key(
+            ParseMessageCommand(
+                source_file=source_files[0],
+                config_file=worker.command.config_file,
+                backend=worker.command.backend,
+                merge_files=tuple(source_files[1:]),
+            ),
+            worker.config,
+        )
+        tables: dict[Topic, pa.Table] | None = (
+            worker.cache.read(key) if worker.cache else None
+        )
+        cached: bool = tables is not None
+        if worker.cache and tables is not None:
+            _restore_counters(statistics, worker.cache.read_counters(key))
+        if tables is None:
+            lines: Iterator[str] = sirius.iter_merged_topic_lines(
+                source_files, worker.protocol.topics, statistics.skipped
+            )
+            tables = _parse_line_tables(
+                _decimate_lines(lines, worker.config, statistics),
+                worker.protocol,
+                worker.command.backend,
+                statistics,
+            )
+            if worker.cache:
+                worker.cache.write(key, tables, _get_counters(statistics))
+
+        outputs = _build_output_tables(tables, worker.config, prefix)
+        if worker.engine is not None:
+            _insert_tables(worker.engine, outputs, worker.command.output_jobs)
+        if worker.command.output_dir:
+            _export_tables(
+                worker.command.output_dir,
+                outputs,
+                worker.command.output_format,
+                worker.command.output_jobs,
+            )
+    except Exception as error:
+        logger.error(f"failed to parse deployment {prefix}: {error}")
+        return ParseDeploymentResult(
+            source_files=tuple(source_files),
+            prefix=prefix,
+            skipped=dict(statistics.skipped),
+            failed=dict(statistics.failed),
+            decimated=dict(statistics.decimated),
+            error=f"{type(error).__name__}: {error}",
+        )
+
+    return ParseDeploymentResult(
+        source_files=tuple(source_files),
+        prefix=prefix,
+        rows={name: table.num_rows for name, table in outputs.items()},
+        skipped=dict(statistics.skipped),
+        failed=dict(statistics.failed),
+        decimated=dict(statistics.decimated),
+        cached=cached,
+    )
+
+
+def _get_counters(
+    statistics: sirius.ParseStatistics,
+) -> dict[str, dict[str, int]]:
+    """Returns the skipped, failed and decimated line counters of parse
+    statistics, which are cached with the parsed tables."""
+    return {
+        "skipped": dict(statistics.skipped),
+        "failed": dict(statistics.failed),
+        "decimated": dict(statistics.decimated),
+    }
+
+
+def _restore_counters(
+    statistics: sirius.ParseStatistics, counters: dict[str, dict[str, int]]
+) -> None:
+    """Adds the cached line counters of a parse to the statistics, so that
+    cached parses are reported as the parses that cached them."""
+    statistics.skipped.update(counters.get("skipped", {}))
+    statistics.failed.update(counters.get("failed", {}))
+    statistics.decimated.update(counters.get("decimated", {}))
+
+
+def _parse_line_tables(
+    lines: Iterable[str],
+    protocol: sirius.MessageProtocol,
+    backend: ParseBackend,
+    statistics: sirius.ParseStatistics,
+) -> dict[Topic, pa.Table]:
+    """Parses lines with a compiled protocol into an Arrow table per topic,
+    and counts skipped and failed lines in the statistics."""
+    match backend:
+        case ParseBackend.OBJECTS:
+            messages = sirius.group_messages(lines, protocol, statistics)
+            return {
+                topic: pa.Table.from_pandas(
+                    sirius.build_message_dataframe(group), preserve_index=False
+                )
+                for topic, group in messages.items()
+            }
+        case ParseBackend.COLUMNAR:
+            buffers = sirius.accumulate_message_columns(
+                lines, protocol, statistics
+            )
+            return {
+                topic: buffer.to_arrow() for topic, buffer in buffers.items()
+            }
+        case _:
+            raise ValueError(f"invalid parse backend: {backend}")
+
+
+def _log_deployment_report(results: list[ParseDeploymentResult]) -> None:
+    """Logs the tables of every deployment, and the skipped, failed and
+    decimated lines per topic over all deployments."""
+    statistics = sirius.ParseStatistics()
+    for result in results:
+        statistics.skipped.update(result.skipped)
+        statistics.failed.update(result.failed)
+        statistics.decimated.update(result.decimated)
+
+    logger.info("Deployment summary:")
+    for result in results:
+        if result.error is not None:
+            logger.info(f"  {result.prefix}: FAILED ({result.error})")
+            continue
+        logger.info(
+            f"  {result.prefix}: {len(result.rows)} tables, "
+            f"{sum(result.rows.values())} rows"
+            + (" (cached)" if result.cached else "")
+        )
+
+    statistics.log()
+
+    failures: list[ParseDeploymentResult] = [
+        result for result in results if result.error is not None
+    ]
+    if failures:
+        logger.warning(
+            f"Failed to parse {len(failures)} of {len(results)} deployments: "
+            + ", ".join(result.prefix for result in failures)
+        )
 
 
 def _load_config(raw: dict[str, Any]) -> ParseMessageConfig:
@@ -46,23 +430,542 @@ def _load_config(raw: dict[str, Any]) -> ParseMessageConfig:
     if table_names is None:
         raise ValueError("invalid config: missing table_names")
 
+    decimation: dict[str, sirius.DecimationRule] = (
+        sirius.build_decimation_rules(raw.get("decimation", {}))
+    )
+    for topic in decimation:
+        if topic not in message_maps:
+            raise ValueError(
+                f"invalid config: decimated topic is not in message_maps: "
+                f"{topic}"
+            )
+
     return ParseMessageConfig(
-        message_maps=message_maps, table_names=table_names
+        message_maps=message_maps,
+        table_names=table_names,
+        decimation=decimation,
     )
 
 
+def run_index_messages(command: IndexMessageCommand) -> None:
+    """Index the topics and times of a message file, and write the index to
+    a sidecar next to the file."""
+    index: sirius.MessageIndex = sirius.build_message_index(
+        command.source_file, command.bucket_seconds
+    )
+    destination: Path = sirius.write_message_index(index, command.source_file)
+
+    logger.info(f"Indexed message topics -> {destination}")
+    for topic, offsets in index.topic_offsets.items():
+        logger.info(f" - {topic}: {len(offsets)} lines")
+
+
+def _to_epoch(value: datetime | None) -> float | None:
+    """Converts a time to epoch seconds, with naive times in UTC."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _select_lines(
+    command: ParseMessageCommand, config: ParseMessageConfig
+) -> list[str] | None:
+    """Reads the lines of the selected topics and times from the source, or
+    returns none if no topics or times are selected."""
+    if not command.topics and command.start is None and command.end is None:
+        return None
+
+    for topic in command.topics:
+        if topic not in config.message_maps:
+            logger.warning(f"selected topic is not in the config: {topic}")
+
+    index: sirius.MessageIndex = sirius.load_message_index(command.source_file)
+    lines: list[str] = list(
+        sirius.iter_indexed_lines(
+            command.source_file,
+            index,
+            topics=command.topics or None,
+            start=_to_epoch(command.start),
+            end=_to_epoch(command.end),
+        )
+    )
+
+    logger.info(f"Selected {len(lines)} lines from index")
+    return lines
+
+
+def _get_cache_key(
+    command: ParseMessageCommand, config: ParseMessageConfig
+) -> str:
+    """Returns the cache key of the parsed tables, which depends on the source
+    content, the message maps and the parser, but not on the table names."""
+    values: dict[str, Any] = {
+        "source": hash_file(command.source_file),
+        "message_maps": config.message_maps,
+        "parser": sirius.PARSER_VERSION,
+        "backend": command.backend,
+        "topics": sorted(command.topics),
+        "start": command.start,
+        "end": command.end,
+    }
+
+    # Keys of single sources do not depend on merged files, and keys of full
+    # rate parses do not depend on decimation
+    if command.merge_files:
+        values["merged"] = [hash_file(path) for path in command.merge_files]
+    if config.decimation:
+        values["decimation"] = {
+            topic: asdict(rule) for topic, rule in config.decimation.items()
+        }
+
+    return hash_object(values)
+
+
+def _parse_tables_cached(
+    command: ParseMessageCommand,
+    config: ParseMessageConfig,
+    cache: MessageTableCache,
+) -> dict[Topic, pa.Table]:
+    """Reads the parsed tables from the cache, or parses the source and
+    caches the tables. The line counters are cached with the tables, so that
+    cached parses report the skipped, failed and decimated lines too."""
+    key: str = _get_cache_key(command, config)
+
+    tables: dict[Topic, pa.Table] | None = cache.read(key)
+    if tables is not None:
+        logger.info(f"Loaded parsed tables from cache: {key}")
+        statistics = sirius.ParseStatistics()
+        _restore_counters(statistics, cache.read_counters(key))
+        statistics.log()
+        return tables
+
+    statistics = sirius.create_parse_statistics()
+    tables = _parse_tables(command, config, statistics)
+    statistics.log()
+    statistics.publish()
+    cache.write(key, tables, _get_counters(statistics))
+    return tables
+
+
+def _parse_tables(
+    command: ParseMessageCommand,
+    config: ParseMessageConfig,
+    statistics: sirius.ParseStatistics,
+) -> dict[Topic, pa.Table]:
+    """Parses the source with the backend of the command into an Arrow table
+    per topic, and counts the skipped, failed and decimated lines in the
+    statistics."""
+
+    if command.merge_files:
+        return _parse_merged_tables(command, config, statistics)
+
+    # Lines selected by topic and time through the index of the source
+    lines: Iterable[str] | None = _select_lines(command, config)
+    if config.decimation:
+        lines = _decimate_lines(
+            _iter_source_lines(command, config, lines, statistics),
+            config,
+            statistics,
+        )
+
+    match command.backend:
+        case ParseBackend.OBJECTS:
+            messages = _parse_messages(
+                command.source_file, config, statistics, command.workers, lines
+            )
+            return {
+                topic: pa.Table.from_pandas(
+                    sirius.build_message_dataframe(group), preserve_index=False
+                )
+                for topic, group in messages.items()
+            }
+        case ParseBackend.COLUMNAR:
+            return _parse_columns(
+                command.source_file, config, statistics, command.workers, lines
+            )
+        case ParseBackend.POLARS:
+            if command.workers > 1:
+                raise ValueError(
+                    "multiple workers are not supported by backend: polars"
+                )
+            frames = _parse_frames(
+                command.source_file, config, statistics, lines
+            )
+            return {
+                topic: frame.to_arrow(compat_level=pl.CompatLevel.oldest())
+                for topic, frame in frames.items()
+            }
+        case _:
+            raise ValueError(f"invalid parse backend: {command.backend}")
+
+
+def _parse_merged_tables(
+    command: ParseMessageCommand,
+    config: ParseMessageConfig,
+    statistics: sirius.ParseStatistics,
+) -> dict[Topic, pa.Table]:
+    """Parses the source and the merged files in time order in one pass, so
+    that the tables of every topic are in time order without sorting."""
+    protocol = sirius.build_message_protocol(config.message_maps)
+    lines: Iterator[str] = sirius.iter_merged_topic_lines(
+        _get_source_files(command), protocol.topics, statistics.skipped
+    )
+    return _parse_line_tables(
+        _decimate_lines(lines, config, statistics),
+        protocol,
+        command.backend,
+        statistics,
+    )
+
+
+def _decimate_lines(
+    lines: Iterable[str],
+    config: ParseMessageConfig,
+    statistics: sirius.ParseStatistics,
+) -> Iterable[str]:
+    """Lazily drops the lines of the topics that are decimated in the config,
+    and counts the dropped lines in the statistics."""
+    if not config.decimation:
+        return lines
+    return sirius.MessageDecimator(config.decimation).decimate(
+        lines, statistics.decimated
+    )
+
+
+def _iter_source_lines(
+    command: ParseMessageCommand,
+    config: ParseMessageConfig,
+    lines: Iterable[str] | None,
+    statistics: sirius.ParseStatistics,
+) -> Iterable[str]:
+    """Returns the selected lines, or lazily reads the lines of the source.
+    Lines of topics that are not in the protocol are skipped before they are
+    decoded, and counted in the statistics."""
+    if lines is not None:
+        return lines
+    protocol = sirius.build_message_protocol(config.message_maps)
+    return io.iter_topic_lines(
+        command.source_file, protocol.topics, statistics.skipped
+    )
+
+
+def _get_source_files(command: ParseMessageCommand) -> list[Path]:
+    """Returns the source file and the files that are merged with it."""
+    return [command.source_file, *command.merge_files]
+
+
 def _parse_messages(
-    source_file: Path, config: ParseMessageConfig
+    source_file: Path,
+    config: ParseMessageConfig,
+    statistics: sirius.ParseStatistics,
+    workers: int = 1,
+    lines: Iterable[str] | None = None,
 ) -> MessageGroups:
-    lines: list[str] = io.read_lines(source_file)
-    return sirius.parse_message_lines(lines, config.message_maps)
+    if lines is not None:
+        return sirius.parse_message_lines(
+            lines, config.message_maps, workers, statistics
+        )
+    return sirius.parse_message_file(
+        source_file, config.message_maps, workers, statistics
+    )
 
 
-def _build_dataframes(
-    message_groups: MessageGroups,
+def _parse_columns(
+    source_file: Path,
     config: ParseMessageConfig,
-    prefix: str | None,
-) -> dict[str, pd.DataFrame]:
+    statistics: sirius.ParseStatistics,
+    workers: int = 1,
+    lines: Iterable[str] | None = None,
+) -> dict[Topic, pa.Table]:
+    if lines is not None:
+        return sirius.parse_message_columns(
+            lines, config.message_maps, workers, statistics
+        )
+    return sirius.parse_message_file_columns(
+        source_file, config.message_maps, workers, statistics
+    )
+
+
+def _parse_frames(
+    source_file: Path,
+    config: ParseMessageConfig,
+    statistics: sirius.ParseStatistics,
+    lines: Iterable[str] | None = None,
+) -> dict[Topic, pl.DataFrame]:
+    if lines is None:
+        lines = io.read_lines(source_file)
+    return sirius.parse_message_frames(lines, config.message_maps, statistics)
+
+
+def _stream_messages(
+    command: ParseMessageCommand,
+    config: ParseMessageConfig,
+    lines: Iterable[str] | None = None,
+) -> None:
+    """Parses the source file lazily and writes the messages in per-topic
+    batches, so that memory is bounded by the batch size rather than the
+    file size. Rows of tables shared by several topics are written in batch
+    order rather than grouped by topic."""
+    assert command.batch_size is not None, "batch size is required"
+
+    if command.output_dir and not command.output_dir.is_dir():
+        raise ValueError(
+            f"output directory does not exist: {command.output_dir}"
+        )
+
+    table_names: dict[Topic, str] = _get_table_names(config, command.prefix)
+    engine: db.Engine | None = (
+        _create_engine(command) if command.database else None
+    )
+
+    protocol = sirius.build_message_protocol(config.message_maps)
+    statistics = sirius.create_parse_statistics()
+    if command.merge_files:
+        lines = sirius.iter_merged_topic_lines(
+            _get_source_files(command), protocol.topics, statistics.skipped
+        )
+    if config.decimation:
+        if lines is None:
+            lines = io.iter_topic_lines(
+                command.source_file, protocol.topics, statistics.skipped
+            )
+        lines = _decimate_lines(lines, config, statistics)
+    batches = (
+        sirius.batch_messages(
+            sirius.iter_messages(lines, protocol, statistics),
+            command.batch_size,
+        )
+        if lines is not None
+        else sirius.iter_message_batches(
+            command.source_file, protocol, command.batch_size, statistics
+        )
+    )
+
+    rows: dict[str, int] = {}
+    for topic, messages in batches:
+        if topic not in table_names:
+            raise ValueError(f"missing table name for message group: {topic}")
+
+        name: str = table_names[topic]
+        dataframe = sirius.build_message_dataframe(messages)
+
+        _write_batch(
+            dataframe,
+            name,
+            engine,
+            command.output_dir,
+            replace=name not in rows,
+        )
+
+        rows[name] = rows.get(name, 0) + len(dataframe)
+
+    statistics.log()
+    statistics.publish()
+
+    logger.info("Wrote tables in batches:")
+    for name, count in rows.items():
+        logger.info(f" - {name}: {count} rows")
+
+
+def _follow_messages(
+    command: ParseMessageCommand, config: ParseMessageConfig
+) -> None:
+    """Tails the source file, and appends the messages of the complete lines
+    that are written to it to the tables. Following starts at the offset of
+    the checkpoint, which is saved after every write, so that a restarted
+    follow resumes after the last written line. Keyboard interrupts are
+    deferred while the tables and checkpoint of a batch are written."""
+
+    if command.output_dir and not command.output_dir.is_dir():
+        raise ValueError(
+            f"output directory does not exist: {command.output_dir}"
+        )
+
+    checkpoint_file: Path = _get_checkpoint_file(command)
+    checkpoint: dict[str, Any] = _read_checkpoint(
+        checkpoint_file, command.source_file
+    )
+    offset: int = checkpoint["offset"]
+
+    table_names: dict[Topic, str] = _get_table_names(config, command.prefix)
+    engine: db.Engine | None = (
+        _create_engine(command) if command.database else None
+    )
+
+    protocol = sirius.build_message_protocol(config.message_maps)
+    statistics = sirius.create_parse_statistics()
+    decimator = sirius.MessageDecimator(config.decimation)
+    decimator.restore(checkpoint.get("decimation", {}))
+
+    # Tables are replaced when following from the start of the source, and
+    # appended to when resuming from a checkpoint
+    written: set[str] = set() if offset == 0 else set(table_names.values())
+
+    logger.info(f"Following {command.source_file} from byte {offset}")
+
+    rows: dict[str, int] = {}
+    try:
+        for lines, offset in io.follow_lines(
+            command.source_file,
+            offset,
+            command.poll_interval,
+            command.idle_timeout,
+        ):
+            # The tables and the checkpoint of a batch are written as a unit, so
+            # that an interrupt does not leave rows that are written again on
+            # resume
+            with _defer_interrupts():
+                groups = sirius.group_messages(
+                    decimator.decimate(lines, statistics.decimated),
+                    protocol,
+                    statistics,
+                )
+                for topic, messages in groups.items():
+                    if topic not in table_names:
+                        raise ValueError(
+                            f"missing table name for message group: {topic}"
+                        )
+
+                    name: str = table_names[topic]
+                    dataframe = sirius.build_message_dataframe(messages)
+
+                    _write_batch(
+                        dataframe,
+                        name,
+                        engine,
+                        command.output_dir,
+                        replace=name not in written,
+                    )
+
+                    written.add(name)
+                    rows[name] = rows.get(name, 0) + len(dataframe)
+
+                _write_checkpoint(
+                    checkpoint_file, command.source_file, offset, decimator
+                )
+    except KeyboardInterrupt:
+        logger.info("Stopped following")
+
+    statistics.log()
+    statistics.publish()
+
+    logger.info("Appended rows to tables:")
+    for name, count in rows.items():
+        logger.info(f" - {name}: {count} rows")
+
+
+@contextmanager
+def _defer_interrupts() -> Iterator[None]:
+    """Defers keyboard interrupts of the main thread until the end of the
+    block, and raises a deferred interrupt when the block ends."""
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    interrupted: list[int] = list()
+    previous: Any = signal.signal(
+        signal.SIGINT, lambda signum, _frame: interrupted.append(signum)
+    )
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGINT, previous)
+
+    if interrupted:
+        raise KeyboardInterrupt
+
+
+def _get_checkpoint_file(command: ParseMessageCommand) -> Path:
+    """Returns the checkpoint file of a follow, which is kept with the CSV
+    files if exported, and next to the source otherwise."""
+    if command.checkpoint_file is not None:
+        return command.checkpoint_file
+
+    name: str = f"{command.source_file.name}.checkpoint.json"
+    if command.output_dir:
+        return command.output_dir / name
+    return command.source_file.with_name(name)
+
+
+def _read_checkpoint(
+    checkpoint_file: Path, source_file: Path
+) -> dict[str, Any]:
+    """Returns the checkpoint of a follow, i.e. the byte offset in the source
+    and the decimator state, or a checkpoint at offset zero if there is
+    none."""
+    if not checkpoint_file.is_file():
+        return {"offset": 0}
+
+    checkpoint: dict[str, Any] = io.read_config(checkpoint_file)
+    if checkpoint.get("source") != str(source_file.resolve()):
+        raise ValueError(
+            f"checkpoint {checkpoint_file} is for another source: "
+            f"{checkpoint.get('source')}"
+        )
+
+    offset: int = int(checkpoint["offset"])
+    if offset > source_file.stat().st_size:
+        raise ValueError(
+            f"source is shorter than its checkpoint offset {offset}: "
+            f"{source_file}"
+        )
+
+    checkpoint["offset"] = offset
+    return checkpoint
+
+
+def _write_checkpoint(
+    checkpoint_file: Path,
+    source_file: Path,
+    offset: int,
+    decimator: sirius.MessageDecimator,
+) -> None:
+    """Writes the byte offset and decimator state of a checkpoint, replacing
+    the previous checkpoint atomically."""
+    staging: Path = checkpoint_file.with_suffix(".tmp.json")
+    io.write_config(
+        {
+            "source": str(source_file.resolve()),
+            "offset": offset,
+            "decimation": decimator.to_dict(),
+        },
+        staging,
+        "wb",
+    )
+    os.replace(staging, checkpoint_file)
+
+
+def _write_batch(
+    dataframe: pd.DataFrame,
+    name: str,
+    engine: db.Engine | None,
+    output_dir: Path | None,
+    replace: bool,
+) -> None:
+    """Writes a batch of rows to a database table and/or a CSV file, and
+    either replaces the table or appends to it."""
+    dataframe = io.format_array_columns(dataframe)
+    if engine is not None:
+        db.load_database_table(
+            engine, name, dataframe, "replace" if replace else "append"
+        )
+
+    if output_dir:
+        destination: Path = output_dir / f"{name}.csv"
+        append: bool = not replace and destination.is_file()
+        dataframe.to_csv(
+            destination,
+            mode="a" if append else "w",
+            header=not append,
+            index=False,
+        )
+
+
+def _get_table_names(
+    config: ParseMessageConfig, prefix: str | None
+) -> dict[Topic, str]:
     table_names = dict(config.table_names)
 
     if prefix is not None:
@@ -70,57 +973,93 @@ def _build_dataframes(
             topic: f"{prefix}_{name}" for topic, name in table_names.items()
         }
 
-    for group in message_groups:
+    return table_names
+
+
+def _build_output_tables(
+    tables: Mapping[Topic, pa.Table],
+    config: ParseMessageConfig,
+    prefix: str | None,
+) -> dict[str, pa.Table]:
+    table_names = _get_table_names(config, prefix)
+
+    for group in tables:
         if group not in table_names:
             raise ValueError(f"missing table name for message group: {group}")
 
-    table_messages: dict[str, list[sirius.Message[Any, Any]]] = {}
-    for group, messages in message_groups.items():
+    table_groups: dict[str, list[pa.Table]] = {}
+    for group, table in tables.items():
         table_name = table_names[group]
-        if table_name not in table_messages:
-            table_messages[table_name] = []
-        table_messages[table_name].extend(messages)
+        if table_name not in table_groups:
+            table_groups[table_name] = []
+        table_groups[table_name].append(table)
 
     return {
-        name: pd.DataFrame([m.to_dict() for m in messages])
-        for name, messages in table_messages.items()
+        name: pa.concat_tables(group) for name, group in table_groups.items()
     }
 
 
-def _insert_dataframes(
-    command: ParseMessageCommand,
-    dataframes: dict[str, pd.DataFrame],
-) -> None:
+def _create_engine(
+    command: ParseMessageCommand | ParseDeploymentsCommand,
+) -> db.Engine:
+    """Returns the registered engine of the database of a command, so that
+    the parses of a process reuse the connections of its pool."""
     assert command.database is not None, "database is required for ingestion"
-    assert command.host is not None, "host is required for ingestion"
-    assert command.port is not None, "port is required for ingestion"
-    engine: db.Engine | str = db.create_engine(
-        database=command.database,
-        host=command.host,
-        port=command.port,
-        username=requireenv("PG_USERNAME"),
-        password=requireenv("PG_PASSWORD"),
+    return db.connect_database(
+        command.database, command.host, command.port, command.driver
     )
 
-    assert isinstance(engine, db.Engine), (
-        f"error while connecting to engine: {engine}"
+
+def _write_database_table(
+    engine: db.Engine, name: str, table: pa.Table
+) -> db.LoadResult:
+    """Replaces a database table with the rows of a table."""
+    return db.load_database_table(
+        engine, name, io.format_array_columns(table.to_pandas()), "replace"
     )
 
+
+def _insert_tables(
+    engine: db.Engine,
+    tables: dict[str, pa.Table],
+    jobs: int,
+) -> None:
+    """Writes tables to the database concurrently, with at most jobs tables
+    in flight. Tables are logged in order as they complete, with the
+    throughput of their loads."""
     logger.info("Writing database tables:")
-    for name, dataframe in dataframes.items():
-        logger.info(f" - {name}: {len(dataframe)}")
-        dataframe.to_sql(name, con=engine, if_exists="replace", index=False)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures: dict[str, Future[db.LoadResult]] = {
+            name: executor.submit(_write_database_table, engine, name, table)
+            for name, table in tables.items()
+        }
+        for name, future in futures.items():
+            result: db.LoadResult = future.result()
+            logger.info(
+                f" - {name}: {result.rows} rows "
+                f"({result.rows_per_second:,.0f} rows/s)"
+            )
 
 
-def _export_dataframes(
+def _export_tables(
     output_dir: Path,
-    dataframes: dict[str, pd.DataFrame],
+    tables: dict[str, pa.Table],
+    output_format: io.TableFormat,
+    jobs: int,
 ) -> None:
+    """Writes tables to files in the output directory concurrently, with at
+    most jobs tables in flight. Tables are logged in order as they
+    complete."""
     if not output_dir.is_dir():
         raise ValueError(f"output directory does not exist: {output_dir}")
 
-    logger.info("Exporting tables to CSV:")
-    for name, dataframe in dataframes.items():
-        dest = output_dir / f"{name}.csv"
-        dataframe.to_csv(dest, index=False)
-        logger.info(f" - {name}: {len(dataframe)} rows -> {dest}")
+    logger.info(f"Exporting tables to {output_format.upper()}:")
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures: dict[str, tuple[Path, Future[None]]] = dict()
+        for name, table in tables.items():
+            dest: Path = io.get_table_path(output_dir, name, output_format)
+            futures[name] = dest, executor.submit(io.write_table, table, dest)
+
+        for name, (dest, future) in futures.items():
+            future.result()
+            logger.info(f" - {name}: {tables[name].num_rows} rows -> {dest}")
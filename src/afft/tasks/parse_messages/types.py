@@ -1,8 +1,19 @@
 """Data types for the message parsing task."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import StrEnum
 from pathlib import Path
 
+from afft.io import TableFormat
+from afft.sirius import DecimationRule
+
+
+class ParseBackend(StrEnum):
+    OBJECTS = "objects"
+    COLUMNAR = "columnar"
+    POLARS = "polars"
+
 
 @dataclass(slots=True, frozen=True)
 class ParseMessageCommand:
@@ -11,11 +22,65 @@ class ParseMessageCommand:
     database: str | None = None
     host: str | None = None
     port: int | None = None
+    driver: str = "postgresql"
     prefix: str | None = None
     output_dir: Path | None = None
+    output_format: TableFormat = TableFormat.CSV
+    output_jobs: int = 4
+    batch_size: int | None = None
+    backend: ParseBackend = ParseBackend.OBJECTS
+    workers: int = 1
+    topics: tuple[str, ...] = ()
+    start: datetime | None = None
+    end: datetime | None = None
+    use_cache: bool = True
+    follow: bool = False
+    poll_interval: float = 0.25
+    idle_timeout: float | None = None
+    checkpoint_file: Path | None = None
+    merge_files: tuple[Path, ...] = ()
+    metrics_file: Path | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class ParseDeploymentsCommand:
+    source: Path
+    config_file: Path
+    pattern: str = "*_messages.txt"
+    database: str | None = None
+    host: str | None = None
+    port: int | None = None
+    driver: str = "postgresql"
+    output_dir: Path | None = None
+    output_format: TableFormat = TableFormat.CSV
+    output_jobs: int = 4
+    backend: ParseBackend = ParseBackend.OBJECTS
+    jobs: int = 1
+    use_cache: bool = True
+
+
+@dataclass(slots=True, frozen=True)
+class ParseDeploymentResult:
+    source_files: tuple[Path, ...]
+    prefix: str
+    rows: dict[str, int] = field(default_factory=dict)
+    skipped: dict[str, int] = field(default_factory=dict)
+    failed: dict[str, int] = field(default_factory=dict)
+    decimated: dict[str, int] = field(default_factory=dict)
+    cached: bool = False
+    error: str | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class IndexMessageCommand:
+    source_file: Path
+    bucket_seconds: float = 60.0
 
 
 @dataclass(slots=True, frozen=True)
 class ParseMessageConfig:
     message_maps: dict[str, str]
     table_names: dict[str, str]
+    # Topics that are decimated while parsing, which are parsed at full rate
+    # if not given
+    decimation: dict[str, DecimationRule] = field(default_factory=dict)
@@ -0,0 +1,86 @@
+"""Shared fixtures of the tests."""
+
+from collections.abc import Callable, Iterator, Sequence
+from pathlib import Path
+
+import pytest
+
+from afft.database import dispose_engines
+
+
+# Epoch second of the first line of the written logs
+_START_TIME: int = 1271816876
+
+_LINES: list[str] = [
+    "RDI: {time}.250000 alt:12.3 r1:12.1 r2:12.4 r3:12.2 r4:12.6 "
+    "h:123.4 p:1.2 r:-0.5 vx:0.5 vy:0.01 vz:-0.02 nx:10.1 ny:2.1 nz:0.0 "
+    "COG:12.2 SOG:0.5 bt_status:3 h_true:124.0 p_gimbal:0.0 sv:1530.0",
+    "NAV: {time}.600000 unsubscribed topic",
+    "PAROSCI: {time}.900000 12.3456",
+]
+
+_CONFIG: str = """
+[message_maps]
+RDI = "TeledyneDVLMessage"
+PAROSCI = "ParosciPressureMessage"
+
+[table_names]
+RDI = "dvl_teledyne"
+PAROSCI = "pressure_parosci"
+"""
+
+
+@pytest.fixture(autouse=True)
+def _dispose_engines() -> Iterator[None]:
+    """Closes the engines that a test connected, so that every test starts
+    with an empty engine registry."""
+    yield
+    dispose_engines()
+
+
+@pytest.fixture
+def message_lines() -> list[str]:
+    """Returns the line templates of a second of a log, i.e. a DVL line, a
+    line of an unsubscribed topic and a pressure line, which are formatted
+    with the epoch second as time."""
+    return list(_LINES)
+
+
+@pytest.fixture
+def rdi_line(message_lines: list[str]) -> str:
+    """Returns the DVL line of the first second of a log."""
+    return message_lines[0].format(time=_START_TIME)
+
+
+@pytest.fixture
+def protocol_config(tmp_path: Path) -> Path:
+    """Returns a protocol config that maps the DVL and pressure topics of the
+    message lines to tables."""
+    path: Path = tmp_path / "protocol.toml"
+    path.write_text(_CONFIG)
+    return path
+
+
+@pytest.fixture
+def write_log(message_lines: list[str]) -> Callable[..., Path]:
+    """Returns a function that writes the line templates for a number of
+    seconds to a log, and returns the path of the log."""
+
+    def write(
+        path: Path,
+        seconds: int,
+        first: int = 0,
+        lines: Sequence[str] | None = None,
+        newline: str = "\n",
+        append: bool = False,
+    ) -> Path:
+        text: str = "".join(
+            f"{line.format(time=_START_TIME + second)}{newline}"
+            for second in range(first, first + seconds)
+            for line in (message_lines if lines is None else lines)
+        )
+        with open(path, "ab" if append else "wb") as filehandle:
+            filehandle.write(text.encode())
+        return path
+
+    return write
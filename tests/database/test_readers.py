@@ -0,0 +1,117 @@
+"""Tests for streaming database tables in chunks."""
+
+from datetime import datetime, time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+import sqlalchemy as sqla
+
+from afft.database import (
+    connect_database,
+    iter_database_table,
+    load_database_table,
+)
+from afft.io import read_table, write_table_chunks
+
+
+_FRAME: pd.DataFrame = pd.DataFrame(
+    {
+        "timestamp": pd.date_range("2010-04-21 02:27:56", periods=10, freq="s"),
+        "depth": [float(index) for index in range(10)],
+        "status": [index if index % 3 else None for index in range(10)],
+    }
+)
+
+
+def test_tables_are_read_in_projected_chunks(tmp_path: Path) -> None:
+    engine = connect_database(str(tmp_path / "tables.db"), drivername="sqlite")
+    load_database_table(engine, "pressure", _FRAME)
+
+    chunks: list[pa.Table] = list(
+        iter_database_table(
+            engine,
+            "pressure",
+            columns=["timestamp", "status"],
+            start=datetime(2010, 4, 21, 2, 27, 58),
+            end=datetime(2010, 4, 21, 2, 28, 3),
+            chunk_rows=4,
+        )
+    )
+
+    assert [chunk.num_rows for chunk in chunks] == [4, 2]
+    assert chunks[0].schema == chunks[1].schema
+    assert chunks[0].schema.field("status").type == pa.float64()
+    assert (
+        pa.concat_tables(chunks)
+        .to_pandas()
+        .equals(_FRAME.loc[2:7, ["timestamp", "status"]].reset_index(drop=True))
+    )
+
+    empty = list(
+        iter_database_table(
+            engine, "pressure", start=datetime(2011, 1, 1), chunk_rows=4
+        )
+    )
+    assert [chunk.num_rows for chunk in empty] == [0]
+
+    with pytest.raises(ValueError, match="missing columns"):
+        next(iter_database_table(engine, "pressure", columns=["depth", "alt"]))
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet", ".arrow"])
+def test_table_chunks_are_written_as_one_table(
+    tmp_path: Path, suffix: str
+) -> None:
+    engine = connect_database(str(tmp_path / "tables.db"), drivername="sqlite")
+    load_database_table(engine, "pressure", _FRAME)
+
+    path = tmp_path / f"pressure{suffix}"
+    rows: int = write_table_chunks(
+        iter_database_table(engine, "pressure", chunk_rows=3), path
+    )
+
+    assert rows == 10
+    pd.testing.assert_frame_equal(
+        read_table(path, ["timestamp"]),
+        _FRAME,
+        check_dtype=False,
+        check_datetimelike_compat=True,
+    )
+
+
+def test_unmapped_column_types_are_read(tmp_path: Path) -> None:
+    engine = connect_database(str(tmp_path / "tables.db"), drivername="sqlite")
+    metadata = sqla.MetaData()
+    events = sqla.Table(
+        "events",
+        metadata,
+        sqla.Column("at", sqla.Time),
+        sqla.Column("payload", sqla.JSON),
+        sqla.Column("name", sqla.String),
+    )
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            events.insert(),
+            [
+                {"at": time(2, 27, 56), "payload": {"depth": 1.5}, "name": "a"},
+                {"at": None, "payload": [1, 2], "name": None},
+            ],
+        )
+
+    chunks: list[pa.Table] = list(
+        iter_database_table(engine, "events", chunk_rows=1)
+    )
+
+    assert [chunk.num_rows for chunk in chunks] == [1, 1]
+    assert chunks[0].schema == chunks[1].schema
+    assert chunks[0].schema.field("at").type == pa.time64("us")
+    assert pa.concat_tables(chunks).to_pylist() == [
+        {"at": time(2, 27, 56), "payload": '{"depth": 1.5}', "name": "a"},
+        {"at": None, "payload": "[1, 2]", "name": None},
+    ]
+
+    path = tmp_path / "events.parquet"
+    assert write_table_chunks(iter_database_table(engine, "events"), path) == 2
@@ -0,0 +1,134 @@
+"""Tests for loading data frames into database tables."""
+
+from io import StringIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sqlalchemy.dialects import postgresql
+
+import afft.database.writers as writers
+
+from afft.database import (
+    connect_database,
+    load_database_table,
+    supports_copy,
+)
+from afft.database.writers import _copy_rows, _iter_copy_chunks
+
+
+_FRAME: pd.DataFrame = pd.DataFrame(
+    {
+        "timestamp": pd.to_datetime(
+            [1271816876.25, 1271816877.25, 1271816878.25], unit="s"
+        ),
+        "depth": [12.3456, np.nan, 12.5],
+        "status": ["ok", None, 'a, "quoted" value'],
+    }
+)
+
+
+class _CopyCursor:
+    """Cursor that records the COPY statements and buffers it is given."""
+
+    def __init__(self) -> None:
+        self.copies: list[tuple[str, str]] = list()
+        self.closed: bool = False
+
+    def copy_expert(self, statement: str, buffer: StringIO) -> None:
+        self.copies.append((statement, buffer.read()))
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class _CopyConnection:
+    """Connection with a PostgreSQL dialect and a recording raw cursor."""
+
+    def __init__(self, cursor: _CopyCursor) -> None:
+        self.dialect = postgresql.dialect()
+        self.connection = self
+        self._cursor = cursor
+
+    def cursor(self) -> _CopyCursor:
+        return self._cursor
+
+
+def test_copy_chunks_are_csv_with_null_markers() -> None:
+    chunks: list[str] = [
+        buffer.getvalue() for buffer in _iter_copy_chunks(_FRAME, 2)
+    ]
+
+    assert chunks == [
+        "2010-04-21 02:27:56.250,12.3456,ok\n2010-04-21 02:27:57.250,\\N,\\N\n",
+        '2010-04-21 02:27:58.250,12.5,"a, ""quoted"" value"\n',
+    ]
+
+
+def test_copy_keeps_empty_strings_apart_from_nulls() -> None:
+    cursor = _CopyCursor()
+    frame = pd.DataFrame({"depth": [1.5, None], "Status": ["", None]})
+
+    connection = _CopyConnection(cursor)
+    _copy_rows(connection, "pressure", frame, 1)  # type: ignore[arg-type]
+
+    statement: str = (
+        'COPY pressure (depth, "Status") FROM STDIN '
+        "WITH (FORMAT csv, NULL '\\N')"
+    )
+    assert cursor.copies == [
+        (statement, "1.5,\n"),
+        (statement, "\\N,\\N\n"),
+    ]
+    assert cursor.closed
+
+
+def test_copied_tables_are_created_before_the_rows_are_streamed(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    engine = connect_database(str(tmp_path / "tables.db"), drivername="sqlite")
+    cursor = _CopyCursor()
+    monkeypatch.setattr(writers, "supports_copy", lambda engine: True)
+    monkeypatch.setattr(
+        writers,
+        "_copy_rows",
+        lambda connection, table, frame, chunk_rows: _copy_rows(
+            _CopyConnection(cursor),  # type: ignore[arg-type]
+            table,
+            frame,
+            chunk_rows,
+        ),
+    )
+
+    result = load_database_table(engine, "pressure", _FRAME, chunk_rows=2)
+
+    assert (result.rows, result.copied) == (3, True)
+    created = pd.read_sql_table("pressure", engine)
+    assert created.columns.tolist() == ["timestamp", "depth", "status"]
+    assert created.empty
+    assert [buffer for _, buffer in cursor.copies] == [
+        buffer.getvalue() for buffer in _iter_copy_chunks(_FRAME, 2)
+    ]
+    assert cursor.copies[0][0] == (
+        "COPY pressure (timestamp, depth, status) FROM STDIN "
+        "WITH (FORMAT csv, NULL '\\N')"
+    )
+
+
+def test_tables_are_inserted_without_copy(tmp_path: Path) -> None:
+    engine = connect_database(str(tmp_path / "tables.db"), drivername="sqlite")
+    assert not supports_copy(engine)
+
+    result = load_database_table(engine, "pressure", _FRAME, chunk_rows=2)
+    assert (result.table, result.rows, result.copied) == ("pressure", 3, False)
+    assert result.rows_per_second > 0.0
+
+    load_database_table(engine, "pressure", _FRAME, "append")
+    loaded = pd.read_sql_table("pressure", engine)
+    assert len(loaded) == 6
+    pd.testing.assert_frame_equal(loaded.head(3), _FRAME)
+
+    with pytest.raises(ValueError, match="already exists"):
+        load_database_table(engine, "pressure", _FRAME)
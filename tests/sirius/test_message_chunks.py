@@ -0,0 +1,168 @@
+"""Tests for parsing Sirius message files in chunks over a process pool."""
+
+import gzip
+
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+
+import pyarrow as pa
+import pytest
+
+import afft.io.file_io as file_io
+
+from afft.io import (
+    iter_topic_lines,
+    read_line_range,
+    read_lines,
+    split_line_ranges,
+)
+from afft.sirius import (
+    parse_message_columns,
+    parse_message_file,
+    parse_message_file_columns,
+    parse_message_lines,
+)
+
+
+# Lines that are written after the DVL line of every second
+_LINES: list[str] = [
+    "VIS: {time}.500000 [{time}.490000] PR_20100421_022756_LC16.tif",
+    "NAV: {time}.600000 unsubscribed topic",
+    "BATT1: {time}.750000 TimeLeft: 1200 PercentCharge: 85 "
+    "Current: -2.50 Voltage: 24.10 Power: 60.25 Charging: 1",
+    "PAROSCI: {time}.900000 truncated",
+    "PAROSCI: {time}.950000 12.3456",
+]
+
+_TOPIC_TYPES: dict[str, str] = {
+    "RDI": "TeledyneDVLMessage",
+    "VIS": "ImageCaptureMessage",
+    "BATT1": "BatteryMessage",
+    "PAROSCI": "ParosciPressureMessage",
+}
+
+
+@pytest.fixture
+def write_chunk_log(
+    write_log: Callable[..., Path], message_lines: list[str]
+) -> Callable[..., Path]:
+    """Returns a function that writes a log with the DVL line and the lines
+    of every topic of the chunk tests for a number of seconds."""
+
+    def write(path: Path, seconds: int, newline: str = "\n") -> Path:
+        return write_log(
+            path, seconds, lines=[message_lines[0], *_LINES], newline=newline
+        )
+
+    return write
+
+
+def test_line_ranges_cover_file_lines(
+    tmp_path: Path, write_chunk_log: Callable[..., Path]
+) -> None:
+    path = write_chunk_log(tmp_path / "messages.RAW.auv", 20, newline="\r\n")
+
+    ranges = split_line_ranges(path, 7)
+
+    assert len(ranges) == 7
+    assert ranges[0][0] == 0 and ranges[-1][1] == path.stat().st_size
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+    assert [
+        line
+        for start, end in ranges
+        for line in read_line_range(path, start, end)
+    ] == read_lines(path)
+
+
+def test_line_ranges_of_small_file(
+    tmp_path: Path, write_chunk_log: Callable[..., Path]
+) -> None:
+    path = write_chunk_log(tmp_path / "messages.RAW.auv", 1)
+    assert len(split_line_ranges(path, 100)) == len(_LINES) + 1
+
+
+def test_topic_lines_skip_unsubscribed_topics(
+    tmp_path: Path, write_chunk_log: Callable[..., Path]
+) -> None:
+    path = write_chunk_log(tmp_path / "messages.RAW.auv", 3, newline="\r\n")
+    skipped: Counter[str] = Counter()
+
+    lines = list(iter_topic_lines(path, {"RDI", "PAROSCI"}, skipped))
+
+    assert lines == [
+        line
+        for line in read_lines(path)
+        if line.startswith(("RDI:", "PAROSCI:"))
+    ]
+    assert skipped == {"VIS": 3, "NAV": 3, "BATT1": 3}
+
+
+def test_topic_lines_keep_lines_without_topic(tmp_path: Path) -> None:
+    path = tmp_path / "messages.RAW.auv"
+    path.write_text("NAV:1.0\nno topic\nNAV: 1.0\n\nRDI: 2.0")
+
+    assert list(iter_topic_lines(path, {"RDI"})) == [
+        "NAV:1.0",
+        "no topic",
+        "",
+        "RDI: 2.0",
+    ]
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".zst"])
+def test_compressed_files_match_uncompressed(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    suffix: str,
+    write_chunk_log: Callable[..., Path],
+) -> None:
+    path = write_chunk_log(tmp_path / "messages.RAW.auv", 20, newline="\r\n")
+    compressed = tmp_path / f"messages.RAW.auv{suffix}"
+    if suffix == ".gz":
+        compressed.write_bytes(gzip.compress(path.read_bytes()))
+    else:
+        with pa.CompressedOutputStream(str(compressed), "zstd") as stream:
+            stream.write(path.read_bytes())
+
+    # Split lines across decompressed chunks
+    monkeypatch.setattr(file_io, "DECOMPRESS_CHUNK_BYTES", 100)
+
+    assert read_lines(compressed) == read_lines(path)
+    assert list(iter_topic_lines(compressed, {"RDI", "PAROSCI"})) == list(
+        iter_topic_lines(path, {"RDI", "PAROSCI"})
+    )
+    assert parse_message_file(compressed, _TOPIC_TYPES) == parse_message_file(
+        path, _TOPIC_TYPES
+    )
+    assert parse_message_file(
+        compressed, _TOPIC_TYPES, workers=2
+    ) == parse_message_file(path, _TOPIC_TYPES)
+
+    with pytest.raises(ValueError):
+        split_line_ranges(compressed, 2)
+
+
+def test_parallel_file_parsing_matches_serial(
+    tmp_path: Path, write_chunk_log: Callable[..., Path]
+) -> None:
+    path = write_chunk_log(tmp_path / "messages.RAW.auv", 50)
+    lines: list[str] = read_lines(path)
+
+    serial = parse_message_lines(lines, _TOPIC_TYPES)
+
+    assert parse_message_file(path, _TOPIC_TYPES, workers=3) == serial
+    assert parse_message_lines(lines, _TOPIC_TYPES, workers=3) == serial
+
+
+def test_parallel_column_parsing_matches_serial(
+    tmp_path: Path, write_chunk_log: Callable[..., Path]
+) -> None:
+    path = write_chunk_log(tmp_path / "messages.RAW.auv", 50)
+    lines: list[str] = read_lines(path)
+
+    serial = parse_message_columns(lines, _TOPIC_TYPES)
+    parallel = parse_message_file_columns(path, _TOPIC_TYPES, workers=3)
+
+    assert list(parallel) == list(serial)
+    assert all(parallel[topic].equals(serial[topic]) for topic in serial)
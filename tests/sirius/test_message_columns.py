@@ -0,0 +1,96 @@
+"""Tests for the columnar Sirius message parser."""
+
+import random
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from afft.sirius import (
+    build_message_dataframe,
+    parse_message_columns,
+    parse_message_lines,
+)
+from afft.sirius.message_columns import (
+    epoch_to_datetime_index,
+    epoch_to_timestamp_array,
+)
+
+
+_TOPIC_TYPES: dict[str, str] = {
+    "RDI": "TeledyneDVLMessage",
+    "VIS": "ImageCaptureMessage",
+    "BATT1": "BatteryMessage",
+    "BATT2": "BatteryMessage",
+    "PAROSCI": "ParosciPressureMessage",
+}
+
+
+@pytest.fixture
+def sample_lines(rdi_line: str) -> list[str]:
+    """Returns lines of every column type, with a DVL timestamp that is not a
+    whole microsecond."""
+    return [
+        rdi_line.replace(".250000", ".250001"),
+        "VIS: 1271816876.500000 [1271816876.490000] PR_20100421_022756_LC16.tif "
+        "exp: 5000",
+        "VIS: 1271816876.600000 [1271816876.590000] PR_20100421_022757_LC16.tif",
+        "BATT1: 1271816876.750000 TimeLeft: 1200 PercentCharge: 85 "
+        "Current: -2.50 Voltage: 24.10 Power: 60.25 Charging: 1",
+        "BATT2: 1271816876.850000 TimeLeft: -1 PercentCharge: 0 "
+        "Current: 0.00 Voltage: 23.10 Power: 0.00 Charging: 0",
+        "PAROSCI: 1271816876.900000 12.3456",
+        "PAROSCI: 1271816876.950000 truncated",
+        "NAV: 1271816877.000000 unsubscribed topic",
+    ]
+
+
+def test_columns_match_message_dicts(sample_lines: list[str]) -> None:
+    tables = parse_message_columns(sample_lines, _TOPIC_TYPES)
+    groups = parse_message_lines(sample_lines, _TOPIC_TYPES)
+
+    assert list(tables) == list(groups)
+    for topic, messages in groups.items():
+        expected = build_message_dataframe(messages)
+        actual = tables[topic].to_pandas()
+        assert list(actual.columns) == list(expected.columns)
+        pd.testing.assert_frame_equal(
+            actual, expected, check_dtype=False, check_index_type=False
+        )
+
+
+def test_columns_are_typed(sample_lines: list[str]) -> None:
+    tables = parse_message_columns(sample_lines, _TOPIC_TYPES)
+    schema = tables["VIS"].schema
+    assert str(schema.field("timestamp").type) == "timestamp[us, tz=UTC]"
+    assert str(schema.field("trigger_time").type) == "timestamp[us, tz=UTC]"
+    assert str(schema.field("exposure_logged").type) == "bool"
+    assert str(schema.field("exposure").type) == "int64"
+    assert str(tables["RDI"].schema.field("altitude").type) == "double"
+
+
+def test_epoch_conversion_rounds_like_fromtimestamp() -> None:
+    generator = random.Random(0)
+    seconds: list[float] = [
+        generator.uniform(1.0e9, 1.7e9) for _ in range(10_000)
+    ] + [1271816876.0000005, 1271816876.9999995, 0.0]
+
+    expected: list[datetime] = [
+        datetime.fromtimestamp(value, tz=timezone.utc) for value in seconds
+    ]
+
+    assert epoch_to_timestamp_array(np.array(seconds)).to_pylist() == expected
+    assert list(epoch_to_datetime_index(np.array(seconds))) == expected
+
+
+def test_message_dataframe_converts_timestamps(sample_lines: list[str]) -> None:
+    messages = parse_message_lines(sample_lines, _TOPIC_TYPES)["VIS"]
+    dataframe = build_message_dataframe(messages)
+
+    assert str(dataframe["timestamp"].dtype) == "datetime64[ns, UTC]"
+    assert str(dataframe["trigger_time"].dtype) == "datetime64[ns, UTC]"
+    assert dataframe["trigger_time"].iloc[0] == pd.Timestamp(
+        "2010-04-21 02:27:56.49", tz="UTC"
+    )
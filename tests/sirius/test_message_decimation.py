@@ -0,0 +1,90 @@
+"""Tests for decimating the message lines of topics before they are parsed."""
+
+from collections import Counter
+
+import pytest
+
+from afft.sirius import (
+    DecimationRule,
+    MessageDecimator,
+    build_decimation_rules,
+)
+
+
+_LINES: list[str] = [
+    f"{topic}: {1271816876 + index * 0.25:.6f} {index}"
+    for index in range(12)
+    for topic in ["RDI", "PAROSCI"]
+]
+
+
+def test_rules_are_validated() -> None:
+    assert build_decimation_rules(
+        {"RDI": {"every": 4}, "PAROSCI": {"rate": 1}}
+    ) == {"RDI": DecimationRule(every=4), "PAROSCI": DecimationRule(rate=1)}
+
+    for config in [
+        {"RDI": {}},
+        {"RDI": {"every": 2, "rate": 1.0}},
+        {"RDI": {"every": 0}},
+        {"RDI": {"every": 1.5}},
+        {"RDI": {"rate": -1.0}},
+        {"RDI": {"step": 2}},
+        {"RDI": 2},
+    ]:
+        with pytest.raises(ValueError, match="RDI"):
+            build_decimation_rules(config)
+
+
+def test_topics_keep_every_nth_line() -> None:
+    decimated: Counter[str] = Counter()
+    decimator = MessageDecimator({"RDI": DecimationRule(every=5)})
+
+    kept: list[str] = list(decimator.decimate(_LINES, decimated))
+
+    assert [line for line in kept if line.startswith("RDI")] == [
+        _LINES[0],
+        _LINES[10],
+        _LINES[20],
+    ]
+    assert [line for line in kept if line.startswith("PAROSCI")] == [
+        line for line in _LINES if line.startswith("PAROSCI")
+    ]
+    assert decimated == {"RDI": 9}
+
+
+def test_topics_keep_one_line_per_rate_interval() -> None:
+    decimated: Counter[str] = Counter()
+    decimator = MessageDecimator({"PAROSCI": DecimationRule(rate=2.0)})
+
+    # Lines without a timestamp are kept for the parser
+    kept: list[str] = list(
+        decimator.decimate([*_LINES, "PAROSCI: truncated"], decimated)
+    )
+    timestamps: list[str] = [
+        line.split()[1] for line in kept if line.startswith("PAROSCI")
+    ]
+
+    assert timestamps == [
+        "1271816876.000000",
+        "1271816876.500000",
+        "1271816877.000000",
+        "1271816877.500000",
+        "1271816878.000000",
+        "1271816878.500000",
+        "truncated",
+    ]
+    assert decimated == {"PAROSCI": 6}
+
+
+def test_state_is_kept_between_batches() -> None:
+    decimator = MessageDecimator({"RDI": DecimationRule(every=3)})
+
+    batches: list[list[str]] = [_LINES[:5], _LINES[5:13], _LINES[13:]]
+    kept: list[str] = [
+        line for batch in batches for line in decimator.decimate(batch)
+    ]
+
+    assert kept == list(
+        MessageDecimator({"RDI": DecimationRule(every=3)}).decimate(_LINES)
+    )
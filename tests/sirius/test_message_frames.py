@@ -0,0 +1,59 @@
+"""Tests for the vectorized polars Sirius message parser."""
+
+import pytest
+
+from afft.sirius import parse_message_columns, parse_message_frames
+
+
+_TOPIC_TYPES: dict[str, str] = {
+    "RDI": "TeledyneDVLMessage",
+    "VIS": "ImageCaptureMessage",
+    "THR_PORT": "ThrusterMessage",
+    "BATT1": "BatteryMessage",
+    "PAROSCI": "ParosciPressureMessage",
+}
+
+
+@pytest.fixture
+def sample_lines(rdi_line: str, message_lines: list[str]) -> list[str]:
+    """Returns lines of every parsed field type, with a DVL line that has an
+    empty status and a timestamp that is not a whole microsecond."""
+    return [
+        rdi_line.replace(".250000", ".250001").replace(
+            "bt_status:3", "bt_status:"
+        ),
+        "PAROSCI: 1271816876.950000 truncated",
+        "VIS: 1271816876.500000 [1271816876.490000] PR_20100421_022756_LC16.tif "
+        "exp: 5000",
+        "VIS: 1271816876.600000 [1271816876.590000] PR_20100421_022757_LC16.tif",
+        "THR_PORT: 1271816876.700000 RPM: 1200.0 A: 1.5 V: 24.0 T: 30.5",
+        "BATT1: 1271816876.750000 TimeLeft: 1200 PercentCharge: 85 "
+        "Current: -2.50 Voltage: 24.10 Power: 60.25 Charging: 1",
+        "NAV: 1271816877.000000 unsubscribed topic",
+        message_lines[0].format(time=1271816877),
+        "PAROSCI: 1271816877.900000 12.3456",
+    ]
+
+
+def test_frames_match_columns(sample_lines: list[str]) -> None:
+    frames = parse_message_frames(sample_lines, _TOPIC_TYPES)
+    tables = parse_message_columns(sample_lines, _TOPIC_TYPES)
+
+    assert (
+        list(frames)
+        == list(tables)
+        == [
+            "VIS",
+            "THR_PORT",
+            "BATT1",
+            "RDI",
+            "PAROSCI",
+        ]
+    )
+    for topic, table in tables.items():
+        assert frames[topic].to_arrow().to_pylist() == table.to_pylist()
+
+
+def test_frames_reject_line_without_header(sample_lines: list[str]) -> None:
+    with pytest.raises(ValueError, match="failed to parse header"):
+        parse_message_frames([*sample_lines, "garbage"], _TOPIC_TYPES)
@@ -0,0 +1,104 @@
+"""Tests for the byte-offset index of Sirius message files."""
+
+import os
+
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from afft.io import read_lines
+from afft.sirius import (
+    build_message_index,
+    iter_indexed_lines,
+    read_message_index,
+    write_message_index,
+)
+
+
+_LQMODEM_LINE: str = (
+    "LQMODEM: {time}.400000 time:1.0 Lat:-33.8 Lon:151.2 hdg:10.0 "
+    "roll:0.1 pitch:0.2 bear:45.0 rng:100.0"
+)
+
+
+@pytest.fixture
+def write_index_log(
+    write_log: Callable[..., Path], message_lines: list[str]
+) -> Callable[[Path, int], Path]:
+    """Returns a function that writes a log with modem lines and CRLF line
+    endings."""
+    lines: list[str] = [message_lines[0], _LQMODEM_LINE, *message_lines[1:]]
+
+    def write(path: Path, seconds: int) -> Path:
+        return write_log(path, seconds, lines=lines, newline="\r\n")
+
+    return write
+
+
+def test_index_round_trips_through_sidecar(
+    tmp_path: Path, write_index_log: Callable[[Path, int], Path]
+) -> None:
+    path = write_index_log(tmp_path / "messages.RAW.auv", 100)
+    index = build_message_index(path, bucket_seconds=10.0)
+
+    assert index.list_topics() == ["RDI", "LQMODEM", "NAV", "PAROSCI"]
+    assert len(index.topic_offsets["RDI"]) == 100
+    assert len(index.bucket_keys) == 11
+
+    write_message_index(index, path)
+    loaded = read_message_index(path)
+
+    assert loaded is not None
+    assert loaded.list_topics() == index.list_topics()
+    assert all(
+        np.array_equal(loaded.topic_offsets[topic], offsets)
+        for topic, offsets in index.topic_offsets.items()
+    )
+    assert np.array_equal(loaded.bucket_starts, index.bucket_starts)
+
+
+def test_index_is_invalidated_by_modification(
+    tmp_path: Path, write_index_log: Callable[[Path, int], Path]
+) -> None:
+    path = write_index_log(tmp_path / "messages.RAW.auv", 10)
+    write_message_index(build_message_index(path), path)
+
+    assert read_message_index(path) is not None
+
+    os.utime(path, ns=(0, 0))
+    assert read_message_index(path) is None
+
+    write_message_index(build_message_index(path), path)
+    with open(path, "ab") as filehandle:
+        filehandle.write(b"NAV: 1271816999.000000 appended\n")
+    os.utime(path, ns=(0, 0))
+    assert read_message_index(path) is None
+
+
+def test_indexed_lines_select_topics_and_times(
+    tmp_path: Path, write_index_log: Callable[[Path, int], Path]
+) -> None:
+    path = write_index_log(tmp_path / "messages.RAW.auv", 300)
+    index = build_message_index(path, bucket_seconds=60.0)
+    start: float = 1271816876 + 100.0
+    end: float = 1271816876 + 130.5
+
+    lines = list(
+        iter_indexed_lines(
+            path, index, topics=["LQMODEM", "RDI"], start=start, end=end
+        )
+    )
+
+    expected: list[str] = [
+        line
+        for line in read_lines(path)
+        if line.startswith(("RDI:", "LQMODEM:"))
+        and start <= float(line.split()[1]) <= end
+    ]
+    assert lines == expected
+    assert len(lines) == 2 * 31
+
+    assert list(iter_indexed_lines(path, index)) == read_lines(path)
+    assert list(iter_indexed_lines(path, index, start=0.0, end=1.0)) == []
@@ -0,0 +1,154 @@
+"""Tests that the layout tokenizers agree with the message regexes."""
+
+import random
+
+import pytest
+
+from afft.sirius.message_parsers import (
+    BATTERY_FORMAT,
+    EVOLOGICS_MODEM_FORMAT,
+    LQ_MODEM_FORMAT,
+    MICRON_SECTOR_FORMAT,
+    MICRON_TRACE_FORMAT,
+    TELEDYNE_DVL_FORMAT,
+    THRUSTER_FORMAT,
+    MessageFormat,
+)
+
+
+# Samples of the formats with layouts, besides the DVL line of the fixtures
+_SAMPLES: list[tuple[MessageFormat, str]] = [
+    (
+        LQ_MODEM_FORMAT,
+        "LQMODEM: 1271816876.300000 time:42.5 Lat:-33.841234 Lon:151.254321 "
+        "hdg:12.0 roll:0.5 pitch:-1.5 bear:270.5 rng:150.25",
+    ),
+    (
+        EVOLOGICS_MODEM_FORMAT,
+        "EVOLOGICS_FIX: 1271816876.400000 target_lat:-33.84 target_lon:151.25 "
+        "target_depth:45.2 accuracy:1.5 ship_lat:-33.85 ship_lon:151.26 "
+        "ship_roll:0.1 ship_pitch:-0.2 ship_heading:90.0 target_x:10.5 "
+        "target_y:-4.25 target_z:45.0",
+    ),
+    (
+        THRUSTER_FORMAT,
+        "THR_PORT: 1271816876.500000 RPM: 1200.0 A: 1.5 V: 24.0 T: 30.5",
+    ),
+    (
+        BATTERY_FORMAT,
+        "BATT1: 1271816876.600000 TimeLeft: 1200 PercentCharge: 85 "
+        "Current: -2.50 Voltage: 24.10 Power: 60.25 Charging: 1",
+    ),
+    (
+        MICRON_TRACE_FORMAT,
+        "MICRON_TRACE: 1271816876.700000 Angle:123.75 Range:20.00 Gain:0.40 "
+        "Bins:0 3 17 255 128 64",
+    ),
+    (
+        MICRON_SECTOR_FORMAT,
+        "MICRON_SECTOR: 1271816876.800000 Start:90.00 End:91.80 Range:20.00 "
+        "Gain:0.40 Traces:2 Bins:0 3 17 255 128 64",
+    ),
+]
+
+_VARIANTS: list[tuple[str, str]] = [
+    ("1271816876.250000 ", "1271816876.250000   "),
+    ("alt:12.3", "alt: 12.3"),
+    ("bt_status:3", "bt_status:"),
+    ("bt_status:3", "bt_status:03"),
+    ("r1:12.1", "r1:12"),
+    ("r1:12.1", "r1:."),
+    ("r1:12.1", "r1:-.5"),
+    ("sv:1530.0", "sv:1530.0 extra:1.0"),
+    ("ship_lat:-33.85", "ship_lat: -33.85"),
+    ("ship_lon:151.26", "ship_lon:-151.26"),
+    ("Lat:-33.841234", "Lat:+33.841234"),
+    ("RPM: 1200.0", "RPM:1200.0"),
+    ("T: 30.5", "T: 30.5\t"),
+    ("Charging: 1", "Charging: 10"),
+    ("TimeLeft: 1200", "TimeLeft: -1"),
+    ("Current: -2.50", "Current: -2."),
+    ("BATT1:", "BATT-1:"),
+    ("THR_PORT:", "THR_PORT:x:"),
+    ("RDI:", " RDI:"),
+    ("1271816876.", "1271816876,"),
+]
+
+
+_SAMPLE_FORMATS: list[MessageFormat] = [
+    TELEDYNE_DVL_FORMAT,
+    *[message_format for message_format, _ in _SAMPLES],
+]
+
+
+@pytest.fixture
+def samples(rdi_line: str) -> list[tuple[MessageFormat, str]]:
+    """Returns a sample line of every format with a layout."""
+    return [(TELEDYNE_DVL_FORMAT, rdi_line), *_SAMPLES]
+
+
+def _regex_values(message_format: MessageFormat, line: str) -> tuple | None:
+    match = message_format.pattern.match(line)
+    return None if match is None else match.group(*message_format.groups)
+
+
+@pytest.mark.parametrize(
+    "index",
+    range(len(_SAMPLE_FORMATS)),
+    ids=[
+        message_format.message_type.__name__
+        for message_format in _SAMPLE_FORMATS
+    ],
+)
+def test_tokenizer_matches_regex_on_sample(
+    index: int, samples: list[tuple[MessageFormat, str]]
+) -> None:
+    message_format, line = samples[index]
+    assert message_format.tokenizer is not None
+    values = message_format.tokenizer(line)
+    assert values is not None
+    assert values == _regex_values(message_format, line)
+    assert message_format.build_values(values) == message_format.build(
+        message_format.pattern.match(line)
+    )
+
+
+def test_tokenizer_agrees_with_regex_on_variants(
+    samples: list[tuple[MessageFormat, str]],
+) -> None:
+    for message_format, sample in samples:
+        assert message_format.tokenizer is not None
+        for old, new in _VARIANTS:
+            line = sample.replace(old, new)
+            values = message_format.tokenizer(line)
+            if values is not None:
+                assert values == _regex_values(message_format, line), line
+            assert message_format.match_values(line) == _regex_values(
+                message_format, line
+            ), line
+
+
+def test_tokenizer_agrees_with_regex_on_mutations(
+    samples: list[tuple[MessageFormat, str]],
+) -> None:
+    generator = random.Random(0)
+    alphabet: str = " \t:.-+0123456789abT_"
+
+    for message_format, sample in samples:
+        assert message_format.tokenizer is not None
+        for _ in range(2000):
+            characters = list(sample)
+            for _ in range(generator.randint(1, 3)):
+                position = generator.randrange(len(characters))
+                match generator.randrange(3):
+                    case 0:
+                        del characters[position]
+                    case 1:
+                        characters.insert(position, generator.choice(alphabet))
+                    case _:
+                        characters[position] = generator.choice(alphabet)
+            line = "".join(characters)
+
+            values = message_format.tokenizer(line)
+            if values is not None:
+                assert values == _regex_values(message_format, line), line
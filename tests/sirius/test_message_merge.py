@@ -0,0 +1,65 @@
+"""Tests for merging the lines of several message files in time order."""
+
+from collections.abc import Callable
+from pathlib import Path
+
+from afft.io import read_lines
+from afft.sirius import (
+    get_line_timestamp,
+    iter_merged_topic_lines,
+    merge_message_lines,
+    parse_message_file,
+    parse_message_lines,
+)
+
+
+_TOPIC_TYPES: dict[str, str] = {
+    "RDI": "TeledyneDVLMessage",
+    "PAROSCI": "ParosciPressureMessage",
+}
+
+
+def test_line_timestamps() -> None:
+    assert get_line_timestamp("PAROSCI: 1271816876.900000 12.3456") == (
+        1271816876.9
+    )
+    assert get_line_timestamp("PAROSCI: truncated") is None
+    assert get_line_timestamp("no topic") is None
+    assert get_line_timestamp("NAV: nan") is None
+
+
+def test_merge_keeps_untimed_lines_after_previous_line() -> None:
+    first: list[str] = ["A: 1.0 a", "continued", "A: 3.0 c"]
+    second: list[str] = ["B: 0.5 x", "B: 2.0 y", "B: 3.0 z"]
+
+    assert list(merge_message_lines([first, second])) == [
+        "B: 0.5 x",
+        "A: 1.0 a",
+        "continued",
+        "B: 2.0 y",
+        "A: 3.0 c",
+        "B: 3.0 z",
+    ]
+
+
+def test_merged_files_parse_as_one_file(
+    tmp_path: Path, write_log: Callable[..., Path]
+) -> None:
+    whole = write_log(tmp_path / "whole.RAW.auv", 20)
+    lines: list[str] = read_lines(whole)
+
+    # Interleave the topics of the deployment over two files
+    paths: list[Path] = [tmp_path / "a.RAW.auv", tmp_path / "b.RAW.auv"]
+    for index, path in enumerate(paths):
+        path.write_text(
+            "".join(f"{line}\n" for line in lines[index::2]),
+        )
+
+    merged = list(iter_merged_topic_lines(paths, set(_TOPIC_TYPES)))
+
+    assert merged == [
+        line for line in read_lines(whole) if not line.startswith("NAV:")
+    ]
+    assert parse_message_lines(merged, _TOPIC_TYPES) == parse_message_file(
+        whole, _TOPIC_TYPES
+    )
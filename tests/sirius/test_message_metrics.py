@@ -0,0 +1,101 @@
+"""Tests for the per-topic metrics of measured parses."""
+
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import pytest
+
+from afft.io import read_config
+from afft.sirius import (
+    ParseStatistics,
+    parse_message_columns,
+    parse_message_frames,
+    parse_message_lines,
+    subscribe_parse_statistics,
+    unsubscribe_parse_statistics,
+)
+
+
+_TOPIC_TYPES: dict[str, str] = {
+    "RDI": "TeledyneDVLMessage",
+    "PAROSCI": "ParosciPressureMessage",
+}
+
+
+@pytest.fixture
+def sample_lines(message_lines: list[str]) -> list[str]:
+    """Returns a second of log lines with a truncated pressure line, and a
+    pressure line of the next second."""
+    return [
+        *[line.format(time=1271816876) for line in message_lines],
+        "PAROSCI: 1271816876.950000 truncated",
+        "PAROSCI: 1271816877.900000 12.3457",
+    ]
+
+
+def _collect(parse: Callable[[], Any]) -> ParseStatistics:
+    metrics = ParseStatistics(measured=True)
+    subscribe_parse_statistics(metrics.update)
+    try:
+        parse()
+    finally:
+        unsubscribe_parse_statistics(metrics.update)
+    return metrics
+
+
+@pytest.mark.parametrize(
+    "parse",
+    [parse_message_lines, parse_message_columns, parse_message_frames],
+    ids=["objects", "columnar", "polars"],
+)
+def test_metrics_count_lines_per_topic(
+    parse: Callable[..., Any], sample_lines: list[str]
+) -> None:
+    metrics = _collect(lambda: parse(sample_lines, _TOPIC_TYPES))
+
+    records = {record["topic"]: record for record in metrics.to_records()}
+    assert list(records)[-1] == "NAV"
+    assert records["PAROSCI"]["lines"] == 3
+    assert records["PAROSCI"]["parsed"] == 2
+    assert records["PAROSCI"]["failed"] == 1
+    assert records["PAROSCI"]["bytes"] == sum(
+        len(line) + 1 for line in sample_lines if line.startswith("PAROSCI")
+    )
+    assert records["RDI"]["parsed"] == 1
+    assert records["RDI"]["seconds"] > 0.0
+    assert records["NAV"] == {
+        "topic": "NAV",
+        "lines": 1,
+        "parsed": 0,
+        "failed": 0,
+        "skipped": 1,
+        "decimated": 0,
+        "bytes": 0,
+        "seconds": 0.0,
+        "mean_seconds": 0.0,
+    }
+
+
+def test_parses_are_not_measured_without_hooks(sample_lines: list[str]) -> None:
+    metrics = ParseStatistics(measured=True)
+    parse_message_lines(sample_lines, _TOPIC_TYPES)
+    assert not metrics.to_records()
+
+
+def test_metrics_reports_round_trip(
+    tmp_path: Path, sample_lines: list[str]
+) -> None:
+    metrics = _collect(lambda: parse_message_lines(sample_lines, _TOPIC_TYPES))
+
+    metrics.write_report(tmp_path / "metrics.json")
+    metrics.write_report(tmp_path / "metrics.csv")
+
+    assert read_config(tmp_path / "metrics.json")["topics"] == (
+        metrics.to_records()
+    )
+    report = pd.read_csv(tmp_path / "metrics.csv")
+    pd.testing.assert_frame_equal(
+        report, pd.DataFrame.from_records(metrics.to_records())
+    )
@@ -0,0 +1,220 @@
+"""Tests for the compiled Sirius message protocol."""
+
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from afft.sirius import (
+    ParseStatistics,
+    iter_message_batches,
+    iter_message_lines,
+    parse_message_lines,
+)
+from afft.sirius.concrete_messages import (
+    BatteryMessage,
+    ImageCaptureMessage,
+    TeledyneDVLMessage,
+)
+from afft.sirius.message_parsers import (
+    parse_battery_message,
+    parse_image_message,
+    parse_teledyne_dvl_message,
+)
+from afft.sirius.message_protocol import (
+    build_message_protocol,
+    group_messages,
+)
+
+
+_VIS_LINE: str = (
+    "VIS: 1271816876.500000 [1271816876.490000] PR_20100421_022756_LC16.tif "
+    "exp: 5000"
+)
+_BATT_LINE: str = (
+    "BATT1: 1271816876.750000 TimeLeft: 1200 PercentCharge: 85 "
+    "Current: -2.50 Voltage: 24.10 Power: 60.25 Charging: 1"
+)
+
+_TOPIC_TYPES: dict[str, str] = {
+    "RDI": "TeledyneDVLMessage",
+    "VIS": "ImageCaptureMessage",
+    "BATT1": "BatteryMessage",
+}
+
+
+def test_parse_teledyne_dvl_message(rdi_line: str) -> None:
+    message = parse_teledyne_dvl_message(rdi_line)
+    assert isinstance(message, TeledyneDVLMessage)
+    assert message.header.topic == "RDI"
+    assert message.header.timestamp == 1271816876.25
+    assert message.body.altitude == 12.3
+    assert message.body.roll == -0.5
+    assert message.body.bottom_track_status == 3
+    assert message.body.sound_velocity == 1530.0
+
+
+def test_message_dict_does_not_mutate_header(rdi_line: str) -> None:
+    message = parse_battery_message(_BATT_LINE)
+    data = message.to_dict()
+
+    assert not hasattr(message, "__dict__")
+    assert list(data) == ["topic", "timestamp", *message.body.to_dict()]
+    assert tuple(data.values()) == message.to_tuple()
+    assert message.header.to_dict() == {
+        "topic": "BATT1",
+        "timestamp": 1271816876.75,
+    }
+
+    dvl = parse_teledyne_dvl_message(rdi_line)
+    assert dvl.to_tuple()[:3] == ("RDI", 1271816876.25, 12.3)
+
+
+def test_parse_image_message_derived_fields() -> None:
+    message = parse_image_message(_VIS_LINE)
+    assert isinstance(message, ImageCaptureMessage)
+    assert message.body.label == "PR_20100421_022756_LC16"
+    assert message.body.filename == "PR_20100421_022756_LC16.tif"
+    assert message.body.trigger_time == 1271816876.49
+    assert message.body.exposure_logged
+    assert message.body.exposure == 5000
+
+
+def test_parse_image_message_without_exposure() -> None:
+    message = parse_image_message(_VIS_LINE.removesuffix(" exp: 5000"))
+    assert not message.body.exposure_logged
+    assert message.body.exposure == 0
+
+
+def test_parse_battery_message_label() -> None:
+    message = parse_battery_message(_BATT_LINE)
+    assert isinstance(message, BatteryMessage)
+    assert message.body.label == "battery_01"
+    assert message.body.charging is True
+    assert message.body.time_left == 1200
+
+
+def test_parser_rejects_malformed_line(rdi_line: str) -> None:
+    with pytest.raises(ValueError, match="failed to parse"):
+        parse_teledyne_dvl_message(rdi_line[:40])
+
+
+def test_build_message_protocol_skips_unknown_types() -> None:
+    protocol = build_message_protocol(
+        {"RDI": "TeledyneDVLMessage", "FOO": "UnknownMessage"}
+    )
+    assert protocol.list_topics() == ["RDI"]
+
+
+def test_match_line_dispatches_on_topic(rdi_line: str) -> None:
+    protocol = build_message_protocol(_TOPIC_TYPES)
+
+    topic, item, match = protocol.match_line(rdi_line)
+    assert topic == "RDI"
+    assert item is not None and item.message_type is TeledyneDVLMessage
+    assert match is not None
+
+    topic, item, match = protocol.match_line("NAV: 1271816876.0 foo bar")
+    assert topic == "NAV"
+    assert item is None and match is None
+
+
+def test_match_values_prefilters_unsubscribed_topics() -> None:
+    protocol = build_message_protocol(_TOPIC_TYPES)
+
+    assert protocol.match_values("NAV: 1271816876.0 foo bar") == (
+        "NAV",
+        None,
+        None,
+    )
+    assert protocol.match_values("NAV: no timestamp") == ("NAV", None, None)
+
+    # Topics with colons are left to the header pattern
+    topic, item, values = protocol.match_values("NAV:A: 1271816876.0 foo")
+    assert topic == "NAV:A" and item is None and values is None
+
+    with pytest.raises(ValueError):
+        protocol.match_values("NAV 1271816876.0 foo")
+
+
+def test_group_messages_counts_skipped_topics(rdi_line: str) -> None:
+    lines: list[str] = [
+        "NAV: 1271816876.300000 unsubscribed topic",
+        rdi_line,
+        "NAV: 1271816876.400000 unsubscribed topic",
+        "NAV:A: 1271816876.500000 unsubscribed topic",
+    ]
+    statistics = ParseStatistics()
+    protocol = build_message_protocol(_TOPIC_TYPES)
+    groups = group_messages(lines, protocol, statistics)
+
+    assert list(groups) == ["RDI"]
+    assert statistics.skipped == {"NAV": 2, "NAV:A": 1}
+
+
+def test_parse_message_lines_groups_skips_and_fails(rdi_line: str) -> None:
+    lines: list[str] = [
+        rdi_line,
+        "NAV: 1271816876.300000 unsubscribed topic",
+        _VIS_LINE,
+        rdi_line[:60],
+        _BATT_LINE,
+        rdi_line,
+    ]
+    groups = parse_message_lines(lines, _TOPIC_TYPES)
+
+    assert list(groups) == ["RDI", "VIS", "BATT1"]
+    assert len(groups["RDI"]) == 2
+    assert len(groups["VIS"]) == 1
+    assert len(groups["BATT1"]) == 1
+
+
+def test_parse_message_lines_matches_individual_parsers(rdi_line: str) -> None:
+    groups = parse_message_lines([rdi_line, _VIS_LINE], _TOPIC_TYPES)
+    assert groups["RDI"][0] == parse_teledyne_dvl_message(rdi_line)
+    assert groups["VIS"][0] == parse_image_message(_VIS_LINE)
+
+
+def test_iter_message_lines_matches_parse_message_lines(
+    tmp_path: Path, rdi_line: str, write_log: Callable[..., Path]
+) -> None:
+    lines: list[str] = [rdi_line, _VIS_LINE, "NAV: 1.5 foo", _BATT_LINE]
+    path = write_log(tmp_path / "messages.RAW.auv", 1, lines=lines)
+    protocol = build_message_protocol(_TOPIC_TYPES)
+    statistics = ParseStatistics()
+
+    streamed = list(iter_message_lines(path, protocol, statistics))
+    groups = parse_message_lines(lines, _TOPIC_TYPES)
+
+    assert [topic for topic, _ in streamed] == ["RDI", "VIS", "BATT1"]
+    assert [message for _, message in streamed] == [
+        message for messages in groups.values() for message in messages
+    ]
+    assert statistics.skipped == {"NAV": 1}
+    assert not statistics.failed
+
+
+def test_iter_message_batches_bounds_batch_size(
+    tmp_path: Path, rdi_line: str, write_log: Callable[..., Path]
+) -> None:
+    lines: list[str] = [rdi_line] * 5 + [_VIS_LINE] * 2
+    path = write_log(tmp_path / "messages.RAW.auv", 1, lines=lines)
+    protocol = build_message_protocol(_TOPIC_TYPES)
+
+    batches = list(iter_message_batches(path, protocol, batch_size=2))
+
+    assert [(topic, len(batch)) for topic, batch in batches] == [
+        ("RDI", 2),
+        ("RDI", 2),
+        ("VIS", 2),
+        ("RDI", 1),
+    ]
+
+
+def test_iter_message_batches_rejects_invalid_size(
+    tmp_path: Path, rdi_line: str, write_log: Callable[..., Path]
+) -> None:
+    path = write_log(tmp_path / "messages.RAW.auv", 1, lines=[rdi_line])
+    protocol = build_message_protocol(_TOPIC_TYPES)
+    with pytest.raises(ValueError, match="invalid batch size"):
+        list(iter_message_batches(path, protocol, batch_size=0))
@@ -0,0 +1,94 @@
+"""Tests for parsing Micron sonar traces into array columns."""
+
+import numpy as np
+import pytest
+
+from afft.sirius import (
+    build_message_dataframe,
+    get_trace_matrix,
+    parse_message_columns,
+    parse_message_frames,
+    parse_message_lines,
+)
+
+
+_LINES: list[str] = [
+    "MICRON_TRACE: 1271816876.250000 Angle:12.50 Range:20.00 Gain:0.40 "
+    "Bins:0 12 255 7",
+    "MICRON_SECTOR: 1271816876.300000 Start:10.00 End:11.80 Range:20.00 "
+    "Gain:0.40 Traces:2 Bins:1 2 3 4 5 6",
+    "MICRON_TRACE: 1271816876.350000 Angle:14.30 Range:20.00 Gain:0.40 "
+    "Bins: 1\t2  3 4",
+    "MICRON_TRACE: 1271816876.450000 Angle:16.10 Range:20.00 Gain:0.40 "
+    "Bins:1 256 3 4",
+    "MICRON_TRACE: 1271816876.550000 Angle:17.90 Range:20.00 Gain:0.40 Bins:",
+]
+
+_TOPIC_TYPES: dict[str, str] = {
+    "MICRON_TRACE": "MicronTraceMessage",
+    "MICRON_SECTOR": "MicronSectorMessage",
+}
+
+
+def test_traces_are_parsed_as_byte_arrays() -> None:
+    groups = parse_message_lines(_LINES, _TOPIC_TYPES)
+
+    traces = [message.body.intensities for message in groups["MICRON_TRACE"]]
+    assert [trace.dtype for trace in traces] == [np.uint8, np.uint8]
+    assert [trace.tolist() for trace in traces] == [
+        [0, 12, 255, 7],
+        [1, 2, 3, 4],
+    ]
+
+    sector = groups["MICRON_SECTOR"][0].body
+    assert sector.intensities.reshape(sector.trace_count, -1).shape == (2, 3)
+
+
+def test_backends_build_the_same_trace_columns() -> None:
+    groups = parse_message_lines(_LINES, _TOPIC_TYPES)
+    tables = parse_message_columns(_LINES, _TOPIC_TYPES)
+    frames = parse_message_frames(_LINES, _TOPIC_TYPES)
+
+    assert list(tables) == list(frames) == list(groups)
+    for topic, table in tables.items():
+        assert (
+            str(table.schema.field("intensities").type) == "list<item: uint8>"
+        )
+        assert frames[topic].to_arrow().to_pylist() == table.to_pylist()
+
+        expected = build_message_dataframe(groups[topic])
+        actual = table.to_pandas()
+        assert [trace.tolist() for trace in actual["intensities"]] == [
+            trace.tolist() for trace in expected["intensities"]
+        ]
+
+
+def test_trace_matrix_has_a_trace_per_row() -> None:
+    tables = parse_message_columns(_LINES, _TOPIC_TYPES)
+
+    matrix = get_trace_matrix(tables["MICRON_TRACE"]["intensities"])
+    assert matrix.dtype == np.uint8
+    assert matrix.tolist() == [[0, 12, 255, 7], [1, 2, 3, 4]]
+
+    with pytest.raises(ValueError, match="different numbers of bins"):
+        get_trace_matrix(
+            parse_message_columns(
+                [*_LINES, _LINES[0].replace(" 7", "")], _TOPIC_TYPES
+            )["MICRON_TRACE"]["intensities"]
+        )
+
+
+def test_sectors_with_uneven_traces_are_rejected() -> None:
+    lines = [
+        _LINES[1],
+        _LINES[1].replace("Traces:2", "Traces:4"),
+        _LINES[1].replace("Traces:2", "Traces:0"),
+    ]
+
+    groups = parse_message_lines(lines, _TOPIC_TYPES)
+    tables = parse_message_columns(lines, _TOPIC_TYPES)
+    frames = parse_message_frames(lines, _TOPIC_TYPES)
+
+    assert len(groups["MICRON_SECTOR"]) == 1
+    assert tables["MICRON_SECTOR"].num_rows == 1
+    assert frames["MICRON_SECTOR"].height == 1
@@ -0,0 +1,102 @@
+"""Tests for following growing message files."""
+
+import os
+import signal
+
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import pytest
+
+import afft.tasks.parse_messages.runner as runner
+
+from afft.io import follow_lines
+from afft.tasks.parse_messages import ParseMessageCommand, run_parse_messages
+
+
+def test_follow_lines_waits_for_complete_lines(tmp_path: Path) -> None:
+    path = tmp_path / "messages.RAW.auv"
+    path.write_text("RDI: 1.0\nPAROSCI: 2.0\nPARTIAL: 3")
+
+    follow = follow_lines(path, poll_interval=0.01, idle_timeout=0.1)
+    assert list(follow) == [(["RDI: 1.0", "PAROSCI: 2.0"], 22)]
+
+    with open(path, "a") as filehandle:
+        filehandle.write(".0\n")
+
+    follow = follow_lines(path, 22, poll_interval=0.01, idle_timeout=0.1)
+    assert list(follow) == [(["PARTIAL: 3.0"], 35)]
+
+
+def test_follow_resumes_from_checkpoint(
+    tmp_path: Path, protocol_config: Path, write_log: Callable[..., Path]
+) -> None:
+    source = tmp_path / "messages.RAW.auv"
+    output_dir = tmp_path / "tables"
+    output_dir.mkdir()
+
+    command = ParseMessageCommand(
+        source_file=source,
+        config_file=protocol_config,
+        output_dir=output_dir,
+        follow=True,
+        poll_interval=0.01,
+        idle_timeout=0.1,
+    )
+
+    write_log(source, 5)
+    with open(source, "a") as filehandle:
+        filehandle.write("RDI: 1271816999.0 alt")
+    run_parse_messages(command)
+
+    with open(source, "a") as filehandle:
+        filehandle.write(":12.3\n")
+    write_log(source, 5, first=5, append=True)
+    run_parse_messages(command)
+
+    assert (output_dir / "messages.RAW.auv.checkpoint.json").is_file()
+
+    pressure = pd.read_csv(output_dir / "pressure_parosci.csv")
+    dvl = pd.read_csv(output_dir / "dvl_teledyne.csv")
+
+    assert len(pressure) == 10
+    assert pressure["timestamp"].is_monotonic_increasing
+    assert len(dvl) == 10
+
+
+def test_interrupted_batch_is_not_written_again(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    protocol_config: Path,
+    write_log: Callable[..., Path],
+) -> None:
+    source = write_log(tmp_path / "messages.RAW.auv", 5)
+    command = ParseMessageCommand(
+        source_file=source,
+        config_file=protocol_config,
+        output_dir=tmp_path,
+        follow=True,
+        poll_interval=0.01,
+        idle_timeout=0.1,
+    )
+    run_parse_messages(command)
+
+    # Interrupt the follow after the first table of the next batch
+    write_batch: Callable[..., None] = runner._write_batch
+
+    def interrupt_batch(*args: Any, **kwargs: Any) -> None:
+        write_batch(*args, **kwargs)
+        os.kill(os.getpid(), signal.SIGINT)
+
+    write_log(source, 5, first=5, append=True)
+    with monkeypatch.context() as patch:
+        patch.setattr(runner, "_write_batch", interrupt_batch)
+        run_parse_messages(command)
+    run_parse_messages(command)
+
+    for name in ["dvl_teledyne", "pressure_parosci"]:
+        table = pd.read_csv(tmp_path / f"{name}.csv")
+        assert len(table) == 10
+        assert table["timestamp"].is_unique
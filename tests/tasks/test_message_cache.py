@@ -0,0 +1,95 @@
+"""Tests for the cache of parsed message tables."""
+
+import os
+
+from collections.abc import Callable
+from pathlib import Path
+
+import pyarrow as pa
+import pytest
+
+from afft.tasks.parse_messages import ParseMessageCommand, run_parse_messages
+from afft.tasks.parse_messages.cache import MessageTableCache
+from afft.utils.log import logger
+
+
+def _tables(rows: int) -> dict[str, pa.Table]:
+    return {
+        "RDI": pa.table({"altitude": [float(row) for row in range(rows)]}),
+        "BATT1": pa.table({"charging": [True] * rows}),
+    }
+
+
+def test_cache_round_trips_tables(tmp_path: Path) -> None:
+    cache = MessageTableCache(tmp_path)
+    assert cache.read("key") is None
+
+    cache.write("key", _tables(10), {"skipped": {"NAV": 3}})
+    tables = cache.read("key")
+
+    assert tables is not None
+    assert list(tables) == ["RDI", "BATT1"]
+    assert all(tables[topic].equals(_tables(10)[topic]) for topic in tables)
+    assert cache.read_counters("key") == {"skipped": {"NAV": 3}}
+    assert cache.read_counters("missing") == {}
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = MessageTableCache(tmp_path)
+    for number, key in enumerate(["first", "second", "third"]):
+        cache.write(key, _tables(1000))
+        os.utime(tmp_path / key / "manifest.json", (number, number))
+
+    # Reading an entry marks it as recently used
+    assert cache.read("first") is not None
+
+    size: int = sum(
+        path.stat().st_size for path in (tmp_path / "first").iterdir()
+    )
+    cache.max_bytes = 2 * size
+    cache.write("fourth", _tables(1000))
+
+    assert cache.read("first") is not None
+    assert cache.read("second") is None
+    assert cache.read("third") is None
+    assert cache.read("fourth") is not None
+
+
+def test_cached_parse_reports_line_counts(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    protocol_config: Path,
+    message_lines: list[str],
+    write_log: Callable[..., Path],
+) -> None:
+    monkeypatch.setenv("AFFT_CACHE_DIR", str(tmp_path / "cache"))
+    source = write_log(
+        tmp_path / "messages.RAW.auv",
+        3,
+        lines=[*message_lines, "PAROSCI: {time}.950000 truncated"],
+    )
+    command = ParseMessageCommand(
+        source_file=source, config_file=protocol_config, output_dir=tmp_path
+    )
+
+    reports: list[list[str]] = list()
+    for _ in range(2):
+        warnings: list[str] = list()
+        sink: int = logger.add(
+            lambda message: warnings.append(message.record["message"]),
+            level="WARNING",
+        )
+        try:
+            run_parse_messages(command)
+        finally:
+            logger.remove(sink)
+        reports.append(warnings)
+
+    (entry,) = (tmp_path / "cache").iterdir()
+    assert MessageTableCache(tmp_path / "cache").read_counters(entry.name) == {
+        "skipped": {"NAV": 3},
+        "failed": {"PAROSCI": 3},
+        "decimated": {},
+    }
+    assert reports[1] == reports[0]
+    assert len(reports[0]) == 2
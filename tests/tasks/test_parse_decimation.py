@@ -0,0 +1,149 @@
+"""Tests for decimating topics while parsing messages."""
+
+from collections.abc import Callable
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from afft.sirius import (
+    ParseStatistics,
+    subscribe_parse_statistics,
+    unsubscribe_parse_statistics,
+)
+from afft.tasks.parse_messages import (
+    ParseBackend,
+    ParseMessageCommand,
+    run_parse_messages,
+)
+
+
+_DECIMATION: str = """
+[decimation]
+RDI = {{ every = {every} }}
+PAROSCI = {{ rate = {rate} }}
+"""
+
+
+def _decimate(config: Path, every: int, rate: float) -> Path:
+    with open(config, "a") as filehandle:
+        filehandle.write(_DECIMATION.format(every=every, rate=rate))
+    return config
+
+
+@pytest.mark.parametrize(
+    ("backend", "workers", "batch_size"),
+    [
+        (ParseBackend.OBJECTS, 1, None),
+        (ParseBackend.OBJECTS, 1, 7),
+        (ParseBackend.COLUMNAR, 2, None),
+        (ParseBackend.POLARS, 1, None),
+    ],
+)
+def test_decimated_topics_are_parsed_at_lower_rates(
+    tmp_path: Path,
+    backend: ParseBackend,
+    workers: int,
+    batch_size: int | None,
+    protocol_config: Path,
+    write_log: Callable[..., Path],
+) -> None:
+    source = write_log(tmp_path / "messages.RAW.auv", 50)
+
+    run_parse_messages(
+        ParseMessageCommand(
+            source_file=source,
+            config_file=_decimate(protocol_config, every=10, rate=0.5),
+            output_dir=tmp_path,
+            backend=backend,
+            workers=workers,
+            batch_size=batch_size,
+            use_cache=False,
+        )
+    )
+
+    dvl = pd.read_csv(tmp_path / "dvl_teledyne.csv")
+    pressure = pd.read_csv(tmp_path / "pressure_parosci.csv")
+    assert len(dvl) == 5
+    assert len(pressure) == 25
+    assert pressure["timestamp"].is_monotonic_increasing
+
+
+@pytest.mark.parametrize(
+    ("backend", "workers"),
+    [
+        (ParseBackend.OBJECTS, 1),
+        (ParseBackend.COLUMNAR, 2),
+        (ParseBackend.POLARS, 1),
+    ],
+)
+def test_decimated_parse_publishes_one_report(
+    tmp_path: Path,
+    backend: ParseBackend,
+    workers: int,
+    protocol_config: Path,
+    write_log: Callable[..., Path],
+) -> None:
+    source = write_log(tmp_path / "messages.RAW.auv", 50)
+    published: list[ParseStatistics] = list()
+
+    subscribe_parse_statistics(published.append)
+    try:
+        run_parse_messages(
+            ParseMessageCommand(
+                source_file=source,
+                config_file=_decimate(protocol_config, every=10, rate=0.5),
+                output_dir=tmp_path,
+                backend=backend,
+                workers=workers,
+                use_cache=False,
+            )
+        )
+    finally:
+        unsubscribe_parse_statistics(published.append)
+
+    assert len(published) == 1
+    assert published[0].decimated == {"RDI": 45, "PAROSCI": 25}
+    assert published[0].skipped == {"NAV": 50}
+    assert published[0].parsed == {"RDI": 5, "PAROSCI": 25}
+
+
+def test_decimated_topics_must_be_in_the_protocol(
+    tmp_path: Path, protocol_config: Path
+) -> None:
+    config = _decimate(protocol_config, every=2, rate=1.0)
+    with open(config, "a") as filehandle:
+        filehandle.write("NAV = { every = 2 }\n")
+
+    with pytest.raises(ValueError, match="NAV"):
+        run_parse_messages(
+            ParseMessageCommand(
+                source_file=tmp_path / "messages.RAW.auv",
+                config_file=config,
+                use_cache=False,
+            )
+        )
+
+
+def test_resumed_follow_continues_decimation(
+    tmp_path: Path, protocol_config: Path, write_log: Callable[..., Path]
+) -> None:
+    source = tmp_path / "messages.RAW.auv"
+    command = ParseMessageCommand(
+        source_file=source,
+        config_file=_decimate(protocol_config, every=3, rate=1.0),
+        output_dir=tmp_path,
+        follow=True,
+        poll_interval=0.01,
+        idle_timeout=0.1,
+    )
+
+    write_log(source, 4)
+    run_parse_messages(command)
+
+    write_log(source, 6, first=4, append=True)
+    run_parse_messages(command)
+
+    dvl = pd.read_csv(tmp_path / "dvl_teledyne.csv")
+    seconds = pd.to_datetime(dvl["timestamp"]).astype("int64") // 10**9
+    assert (seconds - 1271816876).tolist() == [0, 3, 6, 9]
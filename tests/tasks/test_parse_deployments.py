@@ -0,0 +1,142 @@
+"""Tests for parsing the message files of many deployments."""
+
+from collections.abc import Callable
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from afft.tasks.parse_messages import (
+    ParseBackend,
+    ParseDeploymentsCommand,
+    run_parse_deployments,
+)
+
+
+_TRUNCATED_LINE: str = "PAROSCI: {time}.950000 truncated"
+
+
+@pytest.fixture
+def write_deployment_log(
+    write_log: Callable[..., Path], message_lines: list[str]
+) -> Callable[[Path, int], Path]:
+    """Returns a function that writes a log with a truncated pressure line
+    every second."""
+
+    def write(path: Path, seconds: int) -> Path:
+        return write_log(path, seconds, lines=[*message_lines, _TRUNCATED_LINE])
+
+    return write
+
+
+@pytest.mark.parametrize(
+    "backend", [ParseBackend.OBJECTS, ParseBackend.COLUMNAR]
+)
+def test_deployments_are_parsed_with_prefixes(
+    tmp_path: Path,
+    backend: ParseBackend,
+    protocol_config: Path,
+    write_deployment_log: Callable[[Path, int], Path],
+) -> None:
+    source_dir = tmp_path / "messages"
+    output_dir = tmp_path / "tables"
+    source_dir.mkdir()
+    output_dir.mkdir()
+
+    write_deployment_log(
+        source_dir / "qd61g27j_20100421_022145_messages.txt", 5
+    )
+    write_deployment_log(
+        source_dir / "qdc5ghs3_20100430_024508_messages.txt", 7
+    )
+    (source_dir / "broken_messages.txt").write_bytes(b"\xff\xfe\n")
+
+    results = run_parse_deployments(
+        ParseDeploymentsCommand(
+            source=source_dir,
+            config_file=protocol_config,
+            output_dir=output_dir,
+            backend=backend,
+            jobs=2,
+            use_cache=False,
+        )
+    )
+
+    assert [result.prefix for result in results] == [
+        "broken",
+        "qd61g27j_20100421_022145",
+        "qdc5ghs3_20100430_024508",
+    ]
+    assert results[0].error is not None
+    assert results[2].rows == {
+        "qdc5ghs3_20100430_024508_dvl_teledyne": 7,
+        "qdc5ghs3_20100430_024508_pressure_parosci": 7,
+    }
+    assert results[2].skipped == {"NAV": 7}
+    assert results[2].failed == {"PAROSCI": 7}
+
+    pressure = pd.read_csv(
+        output_dir / "qd61g27j_20100421_022145_pressure_parosci.csv"
+    )
+    assert len(pressure) == 5
+
+
+def test_deployment_list_sets_prefixes(
+    tmp_path: Path,
+    protocol_config: Path,
+    write_deployment_log: Callable[[Path, int], Path],
+) -> None:
+    output_dir = tmp_path / "tables"
+    output_dir.mkdir()
+
+    write_deployment_log(tmp_path / "first.RAW.auv", 2)
+    write_deployment_log(tmp_path / "second.RAW.auv", 3)
+    write_deployment_log(tmp_path / "third.RAW.auv", 4)
+    deployments = tmp_path / "deployments.txt"
+    deployments.write_text(
+        "# campaign\nfirst.RAW.auv\n\nsecond.RAW.auv dive_02  # renamed\n"
+        "third.RAW.auv dive_02\n"
+    )
+
+    results = run_parse_deployments(
+        ParseDeploymentsCommand(
+            source=deployments,
+            config_file=protocol_config,
+            output_dir=output_dir,
+            use_cache=False,
+        )
+    )
+
+    assert [result.prefix for result in results] == ["dive_02", "first"]
+    assert (output_dir / "first_dvl_teledyne.csv").is_file()
+
+    # Parts of a deployment are merged in time order
+    dvl = pd.read_csv(output_dir / "dive_02_dvl_teledyne.csv")
+    assert len(dvl) == 7
+    assert dvl["timestamp"].is_monotonic_increasing
+
+
+def test_cached_deployments_report_line_counts(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    protocol_config: Path,
+    write_deployment_log: Callable[[Path, int], Path],
+) -> None:
+    monkeypatch.setenv("AFFT_CACHE_DIR", str(tmp_path / "cache"))
+    output_dir = tmp_path / "tables"
+    output_dir.mkdir()
+    source = write_deployment_log(tmp_path / "first.RAW.auv", 3)
+
+    command = ParseDeploymentsCommand(
+        source=source.parent,
+        pattern="*.RAW.auv",
+        config_file=protocol_config,
+        output_dir=output_dir,
+    )
+    parsed, cached = [run_parse_deployments(command)[0] for _ in range(2)]
+
+    assert not parsed.cached
+    assert cached.cached
+    assert cached.rows == parsed.rows
+    assert cached.skipped == parsed.skipped == {"NAV": 3}
+    assert cached.failed == parsed.failed == {"PAROSCI": 3}
@@ -0,0 +1,71 @@
+"""Tests for ingesting and exporting tables concurrently."""
+
+from pathlib import Path
+
+import pandas as pd
+
+from afft.io import TableFormat, read_table, write_table
+from afft.tasks.export_tables import ExportTablesCommand, run_export_tables
+from afft.tasks.ingest_tables import IngestTablesCommand, run_ingest_tables
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range(
+                "2010-04-21 02:27:56", periods=rows, freq="s"
+            ),
+            "depth": [0.5 * index for index in range(rows)],
+        }
+    )
+
+
+def test_tables_are_ingested_and_exported_concurrently(
+    tmp_path: Path,
+) -> None:
+    source_dir = tmp_path / "tables"
+    output_dir = tmp_path / "export"
+    source_dir.mkdir()
+    output_dir.mkdir()
+    database: str = str(tmp_path / "tables.db")
+
+    for index in range(6):
+        write_table(_frame(10 * index + 1), source_dir / f"table_{index}.csv")
+    (source_dir / "broken.csv").write_text('"unterminated\n')
+
+    ingested = run_ingest_tables(
+        IngestTablesCommand(
+            source_dir=source_dir,
+            database=database,
+            host="",
+            port=0,
+            driver="sqlite",
+            jobs=3,
+        )
+    )
+
+    assert [result.table for result in ingested] == [
+        "broken",
+        *(f"table_{index}" for index in range(6)),
+    ]
+    assert ingested[0].error is not None
+    assert [result.rows for result in ingested[1:]] == [1, 11, 21, 31, 41, 51]
+
+    exported = run_export_tables(
+        ExportTablesCommand(
+            output_dir=output_dir,
+            database=database,
+            driver="sqlite",
+            tables=("table_2", "table_5", "table_0"),
+            output_format=TableFormat.PARQUET,
+            chunk_rows=8,
+            jobs=2,
+        )
+    )
+
+    assert [result.error for result in exported] == [None, None, None]
+    for index in [0, 2, 5]:
+        pd.testing.assert_frame_equal(
+            read_table(output_dir / f"table_{index}.parquet"),
+            _frame(10 * index + 1),
+        )
@@ -0,0 +1,55 @@
+"""Tests for exporting parsed message tables in different file formats."""
+
+from collections.abc import Callable
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from afft.io import TableFormat, read_table
+from afft.tasks.parse_messages import ParseMessageCommand, run_parse_messages
+
+
+def _export_tables(
+    source: Path, config: Path, output_format: TableFormat, output_jobs: int
+) -> Path:
+    output_dir = source.parent / str(output_format)
+    output_dir.mkdir()
+    run_parse_messages(
+        ParseMessageCommand(
+            source_file=source,
+            config_file=config,
+            output_dir=output_dir,
+            output_format=output_format,
+            output_jobs=output_jobs,
+            use_cache=False,
+        )
+    )
+    return output_dir
+
+
+@pytest.mark.parametrize(
+    "output_format", [TableFormat.PARQUET, TableFormat.ARROW]
+)
+def test_binary_tables_match_csv_tables(
+    tmp_path: Path,
+    output_format: TableFormat,
+    protocol_config: Path,
+    write_log: Callable[..., Path],
+) -> None:
+    source = write_log(tmp_path / "messages.RAW.auv", 10)
+    csv_dir = _export_tables(source, protocol_config, TableFormat.CSV, 1)
+    binary_dir = _export_tables(source, protocol_config, output_format, 2)
+
+    for name in ["dvl_teledyne", "pressure_parosci"]:
+        expected: pd.DataFrame = read_table(
+            csv_dir / f"{name}.csv", ["timestamp"]
+        )
+        actual: pd.DataFrame = read_table(
+            binary_dir / f"{name}.{output_format}"
+        )
+
+        assert len(actual) == 10
+        pd.testing.assert_frame_equal(
+            actual, expected, check_dtype=False, check_datetimelike_compat=True
+        )